@@ -1,19 +1,14 @@
 import streamlit as st
-import base64
-import os
+from core.assets import get_logo_b64
+from core.jobs import start_warmup
 
 st.set_page_config(page_title="Portal RMC", page_icon="🏗️")
 
-# Función simple para cargar logo
-def get_image_base64(path):
-    if os.path.exists(path):
-        with open(path, "rb") as img:
-            return f"data:image/png;base64,{base64.b64encode(img.read()).decode()}"
-    return ""
+# Levanta y calienta los procesos de render mientras se elige el formulario
+start_warmup()
 
-# Ruta al logo (estamos en la raíz, así que es directo)
-logo_path = os.path.join(os.path.dirname(__file__), "assets", "logo.png")
-logo_b64 = get_image_base64(logo_path)
+# Logo reducido para pantalla (se genera una vez y queda en caché)
+logo_b64 = get_logo_b64("web")
 
 # --- PORTADA ---
 if logo_b64:
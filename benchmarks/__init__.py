@@ -0,0 +1 @@
+# Scripts de medición. Ejecutar desde la raíz: python -m benchmarks.<script>
@@ -0,0 +1,79 @@
+"""Analítica de resultados con años de documentos sintéticos.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_analytics [--anios 5] [--docs-mes 300]
+
+Llena un RMC_STATE_DIR temporal con documentos de checklist de arnés
+(40 ítems, ~5% rechazados) repartidos en 6 proyectos, y mide: agregar un
+documento (parquet + totales en SQLite), compactar los meses cerrados,
+lo que hace la página de tendencias (leer los totales de un formulario y
+agrupar por mes, categoría y proyecto) contra recalcular lo mismo desde
+todos los parquet, y leer el detalle de un solo mes.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+
+def _filas(rng):
+    return [{"tabla": "items", "fila": i, "categoria": f"{i // 8 + 1}. CATEGORÍA", "item": f"Ítem {i}",
+             "resultado": "R" if rng.random() < 0.05 else "A", "cantidad": 1} for i in range(40)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--anios", type=int, default=5)
+    parser.add_argument("--docs-mes", type=int, default=300)
+    args = parser.parse_args()
+
+    os.environ["RMC_STATE_DIR"] = tempfile.mkdtemp(prefix="rmc-analitica-")  # antes de importar core
+    from core.analytics import ANALYTICS_DIR, append_results, compact_closed_months, load_aggregates, load_rows
+
+    rng = random.Random(1)
+    hoy = date.today()
+    meses = [(hoy.year - args.anios + (hoy.month + m) // 12, (hoy.month + m) % 12 + 1)
+             for m in range(args.anios * 12)]
+    tiempos = []
+    for anio, mes in meses:
+        for n in range(args.docs_mes):
+            registro = {"form": "arnes", "fecha": date(anio, mes, 1 + n % 28).isoformat(),
+                        "lugar": f"Proyecto {rng.randrange(6)}", "trabajador": f"T{n}"}
+            t0 = time.perf_counter()
+            append_results(f"{anio}{mes:02d}{n:06d}".ljust(64, "0"), registro, _filas(rng))
+            tiempos.append(time.perf_counter() - t0)
+    total_docs = len(tiempos)
+    print(f"{total_docs} documentos en {len(meses)} meses")
+    print(f"agregar documento: p50 {statistics.median(tiempos) * 1000:.1f} ms, máx {max(tiempos) * 1000:.1f} ms")
+
+    t0 = time.perf_counter()
+    archivos = compact_closed_months()
+    print(f"compactar meses cerrados: {archivos} archivos en {time.perf_counter() - t0:.1f}s")
+
+    def agrupar(df):
+        revisados = df[df["resultado"].isin(["A", "R"])]
+        return [revisados.groupby(["mes", "resultado"])["n"].sum(),
+                revisados.groupby(["categoria", "resultado"])["n"].sum(),
+                revisados.groupby(["lugar", "resultado"])["n"].sum()]
+
+    t0 = time.perf_counter()
+    agrupar(load_aggregates("arnes"))
+    print(f"página de tendencias (totales): {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    t0 = time.perf_counter()
+    agrupar(load_rows(form="arnes").assign(n=1))
+    print(f"lo mismo desde los parquet: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    mes = f"{meses[-1][0]}-{meses[-1][1]:02d}"
+    t0 = time.perf_counter()
+    detalle = load_rows(mes, mes, "arnes")
+    print(f"detalle de {mes}: {len(detalle)} filas en {(time.perf_counter() - t0) * 1000:.0f} ms")
+    tamano = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(ANALYTICS_DIR) for f in fs)
+    print(f"parquet en disco: {tamano / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
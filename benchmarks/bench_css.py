@@ -0,0 +1,62 @@
+"""Renders repetidos de una misma plantilla: CSS parseado en cada render
+contra las hojas y la FontConfiguration reutilizadas de core.render.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_css [--repeticiones 10]
+
+"antes" vuelve a parsear templates/css/<plantilla>.css y crea una
+FontConfiguration nueva en cada write_pdf, como cuando los estilos iban en
+un <style> dentro del HTML. "ahora" usa get_stylesheets()/get_font_config().
+"""
+import argparse
+import os
+import statistics
+import time
+
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from benchmarks.samples import TEMPLATES
+from core.config import TEMPLATES_DIR
+from core.fetcher import get_url_fetcher
+from core.render import CSS_DIR, get_font_config, get_stylesheets, render_html
+
+
+def sin_cache(nombre, html):
+    font_config = FontConfiguration()
+    hoja = CSS(filename=os.path.join(CSS_DIR, os.path.splitext(nombre)[0] + ".css"),
+               url_fetcher=get_url_fetcher(), font_config=font_config)
+    return HTML(string=html, base_url=TEMPLATES_DIR + os.sep, url_fetcher=get_url_fetcher()).write_pdf(
+        stylesheets=[hoja], font_config=font_config)
+
+
+def con_cache(nombre, html):
+    return HTML(string=html, base_url=TEMPLATES_DIR + os.sep, url_fetcher=get_url_fetcher()).write_pdf(
+        stylesheets=get_stylesheets(nombre), font_config=get_font_config())
+
+
+def medir(funcion, nombre, html, repeticiones):
+    funcion(nombre, html)  # Calentamiento: fetcher, fuentes del sistema
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion(nombre, html)
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'plantilla':<16}{'antes':>10}{'ahora':>10}{'ahorro':>9}")
+    for nombre, context in TEMPLATES.items():
+        html = render_html(nombre, context)
+        antes = medir(sin_cache, nombre, html, args.repeticiones)
+        ahora = medir(con_cache, nombre, html, args.repeticiones)
+        print(f"{nombre:<16}{antes * 1000:>8.0f}ms{ahora * 1000:>8.0f}ms{1 - ahora / antes:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Latencia de render con y sin la caché de recursos (fuentes, imágenes, CSS).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_fetch [--repeticiones 5] [--offline]
+
+"sin caché" usa el URLFetcher por defecto de WeasyPrint (lee los archivos y
+sale a la red en cada render); "con caché" usa core.fetcher.
+"""
+import argparse
+import statistics
+import time
+
+from weasyprint.urls import URLFetcher
+
+from benchmarks.samples import TEMPLATES
+from core.fetcher import get_url_fetcher
+from core.render import render_pdf
+
+
+def medir(nombre, context, crear_fetcher, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        render_pdf(nombre, context, url_fetcher=crear_fetcher())
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--offline", action="store_true",
+                        help="falla si algún recurso no está en caché o en assets/")
+    args = parser.parse_args()
+
+    # Primer render fuera de la medición: calienta fontconfig y la caché
+    for nombre, context in TEMPLATES.items():
+        render_pdf(nombre, context, url_fetcher=get_url_fetcher(offline=args.offline))
+
+    print(f"{'plantilla':<16}{'sin caché':>12}{'con caché':>12}")
+    for nombre, context in TEMPLATES.items():
+        t_sin = medir(nombre, context, URLFetcher, args.repeticiones)
+        t_con = medir(nombre, context, lambda: get_url_fetcher(offline=args.offline), args.repeticiones)
+        print(f"{nombre:<16}{t_sin * 1000:>10.0f}ms{t_con * 1000:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
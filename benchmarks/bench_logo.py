@@ -0,0 +1,61 @@
+"""Compara el logo original (860 KB) contra la variante de impresión en caché.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_logo [--repeticiones 3]
+
+Para cada plantilla reporta el tamaño del PDF y el tiempo de write_pdf()
+con el camino antiguo (PNG completo en base64) y con get_logo_b64().
+"""
+import argparse
+import base64
+import time
+
+from jinja2 import Environment, FileSystemLoader
+from weasyprint import HTML
+
+from benchmarks.samples import TEMPLATES
+from core.assets import get_logo_b64
+from core.config import LOGO_PATH, TEMPLATES_DIR
+from core.render import get_font_config, get_stylesheets
+
+
+def logo_original():
+    # Camino anterior: se leía y codificaba el PNG completo en cada clic
+    with open(LOGO_PATH, "rb") as img:
+        return f"data:image/png;base64,{base64.b64encode(img.read()).decode()}"
+
+
+def medir(template, context, logo, repeticiones):
+    html = template.render(logo_b64=logo, **context)
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        pdf = HTML(string=html).write_pdf(stylesheets=get_stylesheets(template.name), font_config=get_font_config())
+        tiempos.append(time.perf_counter() - t0)
+    return len(pdf), min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    t0 = time.perf_counter()
+    logo_nuevo = get_logo_b64()
+    print(f"Variante 'print': {len(logo_nuevo) / 1024:.1f} KB en base64 "
+          f"(generada/cargada en {time.perf_counter() - t0:.2f}s)")
+    logo_antes = logo_original()
+    print(f"Logo original:    {len(logo_antes) / 1024:.1f} KB en base64\n")
+
+    print(f"{'plantilla':<16}{'PDF antes':>12}{'PDF ahora':>12}{'t antes':>10}{'t ahora':>10}")
+    for nombre, context in TEMPLATES.items():
+        template = env.get_template(nombre)
+        size_a, t_a = medir(template, context, logo_antes, args.repeticiones)
+        size_n, t_n = medir(template, context, logo_nuevo, args.repeticiones)
+        print(f"{nombre:<16}{size_a / 1024:>10.0f}KB{size_n / 1024:>10.0f}KB"
+              f"{t_a:>9.2f}s{t_n:>9.2f}s  (-{size_a - size_n:,} bytes, -{t_a - t_n:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Tamaño antes/después y costo de core.optimize por tipo de documento.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_optimize [--dpi 150] [--logo-original]
+    python -m benchmarks.bench_optimize --archivo [--limite 200]
+
+Por defecto renderiza cada plantilla con las firmas de ejemplo (con
+--logo-original, con el PNG completo como antes de las variantes). Con
+--archivo usa los PDF ya generados de .rmc/archivo, agrupados por
+formulario.
+"""
+import argparse
+from collections import defaultdict
+
+from benchmarks.bench_signatures import firma_sintetica
+from core.optimize import PRINT_DPI, optimize_pdf
+from core.signatures import process_signature
+
+
+def documentos_renderizados(usar_logo_original):
+    from benchmarks.bench_logo import logo_original
+    from benchmarks.samples import TEMPLATES
+    from core.render import render_pdf
+
+    firma = process_signature(firma_sintetica(), "png")
+    campos_firma = {"checklist.html": ["firma_b64"], "ast_final.html": ["firma_sup_b64", "firma_charla_b64"],
+                    "arnes.html": ["firma_user", "firma_sup"], "epp.html": ["firma_b64"]}
+    for nombre, context in TEMPLATES.items():
+        context = dict(context, **{c: firma for c in campos_firma[nombre]})
+        if usar_logo_original:
+            context["logo_b64"] = logo_original()
+        yield nombre, render_pdf(nombre, context, optimize=False)
+
+
+def documentos_archivados(limite):
+    from core.archive import read_document, search
+
+    filas, _ = search(limit=limite)
+    for fila in filas:
+        try:
+            yield fila["form"], read_document(fila["sha256"])
+        except FileNotFoundError:
+            continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dpi", type=int, default=PRINT_DPI)
+    parser.add_argument("--archivo", action="store_true", help="usar los PDF de .rmc/archivo")
+    parser.add_argument("--limite", type=int, default=200, help="documentos del archivo a medir")
+    parser.add_argument("--logo-original", action="store_true", help="renderizar con el logo completo (860 KB)")
+    args = parser.parse_args()
+
+    docs = documentos_archivados(args.limite) if args.archivo else documentos_renderizados(args.logo_original)
+    por_tipo = defaultdict(list)
+    for tipo, pdf in docs:
+        por_tipo[tipo].append(optimize_pdf(pdf, args.dpi)[1])
+
+    print(f"{'tipo':<16}{'docs':>6}{'antes':>11}{'después':>11}{'ahorro':>9}{'reducidas':>11}{'dupl.':>7}{'ms/doc':>9}")
+    for tipo, reportes in sorted(por_tipo.items()):
+        antes = sum(r["antes"] for r in reportes)
+        despues = sum(r["despues"] for r in reportes)
+        ms = 1000 * sum(r["segundos"] for r in reportes) / len(reportes)
+        print(f"{tipo:<16}{len(reportes):>6}{antes / 1024:>9.0f}KB{despues / 1024:>9.0f}KB"
+              f"{1 - despues / antes:>9.0%}{sum(r['reducidas'] for r in reportes):>11}"
+              f"{sum(r['duplicadas'] for r in reportes):>7}{ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cola de correo (core.outbox) contra un servidor SMTP local de aiosmtpd.
+
+Uso (desde la raíz del repo; requiere `pip install aiosmtpd`):
+    python -m benchmarks.bench_outbox [--mensajes 200] [--kb 150] [--fallas 5]
+
+Con un RMC_STATE_DIR temporal encola --mensajes correos con un PDF de
+--kb KB y mide cuánto tarda el hilo de envío en vaciar la cola y cuántas
+conexiones SMTP abrió. El servidor rechaza con 451 los primeros --fallas
+mensajes: deben quedar pendientes y salir en el reintento. Al final
+verifica que un secreto faltante (sin receiver_email) cuenta como intento
+fallido y no detiene el hilo.
+"""
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Receptor:
+    """Handler de aiosmtpd: cuenta mensajes y conexiones, rechaza los primeros."""
+
+    def __init__(self, fallas):
+        self.fallas = fallas
+        self.recibidos = 0
+        self.conexiones = set()
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.conexiones.add(session.peer)
+            if self.fallas:
+                self.fallas -= 1
+                return "451 Intente más tarde"
+            self.recibidos += 1
+        return "250 OK"
+
+
+def _esperar(condicion, timeout):
+    fin = time.perf_counter() + timeout
+    while time.perf_counter() < fin:
+        if condicion():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mensajes", type=int, default=200)
+    parser.add_argument("--kb", type=int, default=150, help="tamaño del PDF adjunto")
+    parser.add_argument("--fallas", type=int, default=5, help="mensajes que el servidor rechaza con 451")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    os.environ["RMC_STATE_DIR"] = tempfile.mkdtemp(prefix="rmc-outbox-")  # antes de importar core
+    from core import outbox
+
+    outbox.BACKOFF_BASE = 0.5  # Los reintentos salen en la misma corrida
+    receptor = Receptor(args.fallas)
+    puerto = _puerto_libre()
+    servidor = Controller(receptor, hostname="127.0.0.1", port=puerto)
+    servidor.start()
+    settings = {"smtp_server": "127.0.0.1", "smtp_port": puerto, "starttls": False,
+                "sender_email": "rmc@example.com", "receiver_email": "sigop@example.com"}
+    sender = outbox.start_sender(settings)
+    try:
+        pdf = os.urandom(args.kb * 1024)
+        t0 = time.perf_counter()
+        ids = [outbox.enqueue(f"Documento {n}", "Adjunto PDF", pdf, f"doc_{n}.pdf", key=f"bench-{n}")
+               for n in range(args.mensajes)]
+        encolar = time.perf_counter() - t0
+        vacia = _esperar(lambda: outbox.queue_counts().get(outbox.ENVIADO, 0) == len(ids), args.timeout)
+        total = time.perf_counter() - t0
+        estados = outbox.queue_counts()
+        reintentados = sum(1 for i in ids if outbox.delivery_status(i)["intentos"] > 1)
+        print(f"encolar {len(ids)} mensajes: {encolar * 1000:.0f} ms ({encolar / len(ids) * 1000:.2f} ms c/u)")
+        print(f"cola vacía: {'sí' if vacia else 'NO'} en {total:.2f}s, {len(ids) / total:.1f} mensajes/s")
+        print(f"recibidos {receptor.recibidos}, conexiones SMTP {len(receptor.conexiones)}, "
+              f"reintentados {reintentados}, estados {estados}")
+        ok = vacia and receptor.recibidos == len(ids) and reintentados == args.fallas
+
+        # Sin receiver_email: intento fallido con backoff, el hilo sigue vivo
+        sin_destino = {k: v for k, v in settings.items() if k != "receiver_email"}
+        sender = outbox.start_sender(sin_destino)
+        msg_id = outbox.enqueue("Sin destinatario", "", key="bench-sin-destino")
+        fallo = _esperar(lambda: outbox.delivery_status(msg_id)["intentos"] > 0, 10)
+        estado = outbox.delivery_status(msg_id)
+        print(f"sin receiver_email: {estado['estado']}, intentos {estado['intentos']}, "
+              f"error {estado['ultimo_error']!r}, hilo vivo: {sender.is_alive()}")
+        ok = ok and fallo and estado["estado"] == outbox.PENDIENTE and sender.is_alive()
+    finally:
+        sender.stop()
+        servidor.stop()
+    print("OK" if ok else "FALLÓ")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Tiempo de codificación y bytes por firma: PNG completo vs recorte/paleta/SVG.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_signatures [--repeticiones 200] [--pdf]
+
+Simula una firma en un canvas de 300x100 (como en las páginas). Con --pdf
+también reporta cuántos bytes agrega cada formato al PDF de checklist.html.
+"""
+import argparse
+import base64
+import io
+import math
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from benchmarks.samples import CHECKLIST
+from core.signatures import process_signature
+
+
+def firma_sintetica(ancho=300, alto=100, fondo=(255, 255, 255, 255)):
+    # Un trazo tipo rúbrica: la misma polilínea en imagen RGBA y en JSON de Fabric.js
+    puntos = [(40 + t * 2.2, 50 + 22 * math.sin(t / 9) + 8 * math.sin(t / 2.5)) for t in range(100)]
+    # Se dibuja a 4x y se reduce: bordes con antialiasing como en el navegador
+    im = Image.new("RGBA", (ancho * 4, alto * 4), fondo)
+    ImageDraw.Draw(im).line([(x * 4, y * 4) for x, y in puntos], fill=(0, 0, 0, 255), width=8, joint="curve")
+    im = im.resize((ancho, alto), Image.Resampling.LANCZOS)
+    path = [["M", *puntos[0]]] + [["L", x, y] for x, y in puntos[1:]]
+    json_data = {"objects": [{"type": "path", "stroke": "#000", "strokeWidth": 2, "path": path}]}
+    return SimpleNamespace(image_data=np.asarray(im), json_data=json_data)
+
+
+def firma_original(canvas_result):
+    # Camino anterior: el canvas completo como PNG RGBA
+    im = Image.fromarray(canvas_result.image_data.astype("uint8"))
+    buffered = io.BytesIO()
+    im.save(buffered, format="PNG")
+    return f"data:image/png;base64,{base64.b64encode(buffered.getvalue()).decode()}"
+
+
+FORMATOS = {
+    "original": firma_original,
+    "png": lambda c: process_signature(c, "png"),
+    "png1": lambda c: process_signature(c, "png1"),
+    "svg": lambda c: process_signature(c, "svg"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--pdf", action="store_true", help="medir también bytes en el PDF (requiere WeasyPrint)")
+    args = parser.parse_args()
+
+    canvas = firma_sintetica()
+    uris = {}
+    print(f"{'formato':<10}{'data URI':>12}{'codificar':>12}")
+    for nombre, fn in FORMATOS.items():
+        t0 = time.perf_counter()
+        for _ in range(args.repeticiones):
+            uri = fn(canvas)
+        t = (time.perf_counter() - t0) / args.repeticiones
+        uris[nombre] = uri
+        print(f"{nombre:<10}{len(uri):>10,} B{t * 1000:>10.2f}ms")
+
+    if args.pdf:
+        from core.render import render_pdf
+
+        base = len(render_pdf("checklist.html", dict(CHECKLIST, firma_b64=None)))
+        print(f"\nPDF checklist.html sin firma: {base:,} B")
+        for nombre, uri in uris.items():
+            size = len(render_pdf("checklist.html", dict(CHECKLIST, firma_b64=uri)))
+            print(f"{nombre:<10}+{size - base:>8,} B por firma")
+
+
+if __name__ == "__main__":
+    main()
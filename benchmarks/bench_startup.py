@@ -0,0 +1,168 @@
+"""Arranque en frío: tiempo de importación de los módulos de las páginas y
+primer PDF de un proceso nuevo, con y sin calentamiento.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.bench_startup [--repeticiones 3] [--espera 5]
+    python -m benchmarks.bench_startup --comparar .cache/bench/startup-abc1234.json
+
+Cada medición corre en un intérprete nuevo (python -c), así que incluye
+todo lo que se importa y se inicializa por primera vez:
+
+- import/<módulo>: importar el módulo después de streamlit, como lo hace
+  una página. Falla si arrastra WeasyPrint, que solo deben cargar los
+  procesos de render.
+- render/frio: importar core.render y generar el primer PDF.
+- render/segundo: el PDF siguiente en ese mismo proceso.
+- render/calentado: el primer PDF después de core.render.warm_up().
+- pool/sin_calentar y pool/calentado: el primer PDF pedido a core.jobs en
+  un servidor recién iniciado, sin calentamiento (RMC_WARMUP=0) o con
+  start_warmup() llamado --espera segundos antes, como al abrir la portada.
+
+Los resultados se guardan en JSON con el formato de benchmarks.suite; con
+--comparar se marcan los casos más lentos que la línea base.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks.suite import BENCH_DIR, TOLERANCIA, _revision, comparar
+from core.config import ROOT_DIR
+
+# Módulos que importan las páginas de Streamlit
+MODULOS = ["core.form_page", "core.ui", "core.jobs", "core.preview", "core.archive", "core.analytics"]
+# Importaciones pesadas que una página no debería pagar al abrirse
+PESADOS = ["weasyprint", "pymupdf", "streamlit_drawable_canvas", "email.mime.multipart"]
+
+_IMPORT = """
+import json, sys, time
+import streamlit
+t0 = time.perf_counter()
+import {modulo}
+print(json.dumps({{"segundos": time.perf_counter() - t0,
+                   "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+_RENDER = """
+import json, time
+t0 = time.perf_counter()
+from benchmarks.samples import con_filas
+from core.render import render_pdf, warm_up
+calentar = {calentar}
+if calentar:
+    warm_up()
+contexto = con_filas("checklist.html", 10)
+t1 = time.perf_counter()
+render_pdf("checklist.html", contexto)
+t2 = time.perf_counter()
+render_pdf("checklist.html", contexto)
+t3 = time.perf_counter()
+print(json.dumps({{"importar": t1 - t0, "primero": t2 - t1, "segundo": t3 - t2}}))
+"""
+
+_POOL = """
+import json, time
+from benchmarks.samples import con_filas
+from core.jobs import job_result, start_warmup, submit_render
+start_warmup()
+time.sleep({espera})  # El usuario llena el formulario
+t0 = time.perf_counter()
+job_result(submit_render("checklist.html", con_filas("checklist.html", 10)))  # Espera el PDF
+print(json.dumps({{"primero": time.perf_counter() - t0}}))
+"""
+
+
+def _correr(codigo, **env):
+    proc = subprocess.run([sys.executable, "-c", codigo], cwd=ROOT_DIR, capture_output=True, text=True,
+                          env=dict(os.environ, **env), check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "sin salida")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _mediana(corridas, clave):
+    return {"segundos_mediana": statistics.median(c[clave] for c in corridas),
+            "segundos_min": min(c[clave] for c in corridas)}
+
+
+def medir(repeticiones, espera):
+    casos = {}
+    for modulo in MODULOS:
+        corridas = [_correr(_IMPORT.format(modulo=modulo, pesados=PESADOS)) for _ in range(repeticiones)]
+        casos[f"import/{modulo}"] = dict(_mediana(corridas, "segundos"), pesados=corridas[0]["pesados"])
+
+    for calentar in (False, True):
+        try:
+            corridas = [_correr(_RENDER.format(calentar=calentar)) for _ in range(repeticiones)]
+        except RuntimeError as e:
+            casos["render/calentado" if calentar else "render/frio"] = {"error": str(e)}
+            continue
+        if calentar:
+            casos["render/calentado"] = _mediana(corridas, "primero")
+        else:
+            casos["render/frio"] = _mediana([{"s": c["importar"] + c["primero"]} for c in corridas], "s")
+            casos["render/segundo"] = _mediana(corridas, "segundo")
+
+    for nombre, env, pausa in (("pool/sin_calentar", {"RMC_WARMUP": "0"}, 0), ("pool/calentado", {}, espera)):
+        try:
+            corridas = [_correr(_POOL.format(espera=pausa), RMC_RENDER_WORKERS="1", **env)
+                        for _ in range(repeticiones)]
+            casos[nombre] = _mediana(corridas, "primero")
+        except RuntimeError as e:
+            casos[nombre] = {"error": str(e)}
+    return casos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--espera", type=float, default=5.0,
+                        help="segundos entre start_warmup() y el primer PDF (pool/calentado)")
+    parser.add_argument("--salida", help=f"JSON de resultados (default: {BENCH_DIR}/startup-<revisión>.json)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior (línea base)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="empeoramiento aceptado (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    revision = _revision()
+    resultado = {
+        "revision": revision, "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones, "casos": medir(args.repeticiones, args.espera),
+    }
+
+    print(f"{'caso':<28}{'mediana':>10}{'mín':>10}  pesados")
+    for nombre, r in resultado["casos"].items():
+        if "error" in r:
+            print(f"{nombre:<28}  ERROR {r['error']}")
+        else:
+            print(f"{nombre:<28}{r['segundos_mediana'] * 1000:>8.0f}ms{r['segundos_min'] * 1000:>8.0f}ms"
+                  f"  {', '.join(r.get('pesados', [])) or '—'}")
+
+    salida = args.salida or os.path.join(BENCH_DIR, f"startup-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados -> {salida}")
+
+    codigo = 0
+    con_weasyprint = [n for n, r in resultado["casos"].items() if "weasyprint" in r.get("pesados", [])]
+    if con_weasyprint:
+        print(f"WeasyPrint se importa al abrir una página: {', '.join(con_weasyprint)}")
+        codigo = 1
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultado, base, args.tolerancia)
+        print(f"Comparado con {base.get('revision', args.comparar)}: {len(regresiones)} regresión(es)")
+        for nombre, metrica, antes, ahora in regresiones:
+            print(f"  {nombre} {metrica}: {antes:,.4g} -> {ahora:,.4g} (+{(ahora / antes - 1):.0%})")
+        codigo = codigo or (1 if regresiones else 0)
+    return codigo
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
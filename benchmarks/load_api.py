@@ -0,0 +1,152 @@
+"""Prueba de carga de la API de render (core.api): N clientes simultáneos.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.load_api [--clientes 8] [--segundos 30] [--workers 2] [--filas 10]
+    python -m benchmarks.load_api --url http://render.interno:8600 --clientes 16
+
+Sin --url levanta `python -m core.api` en un puerto libre, espera a que
+/health responda 200 (workers calientes) y lo detiene al final. Cada
+cliente es un hilo con su propia conexión keep-alive que envía, durante
+--segundos, contextos de benchmarks.samples de los cuatro formularios. Cada
+envío lleva un número distinto, así que ningún PDF sale de la caché (con
+--repetidos todos son iguales y se mide la caché). Se reportan documentos
+por segundo sostenidos, percentiles de latencia por formulario y las
+respuestas con error (503 = cola llena).
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+from benchmarks.samples import con_filas
+from core.batch import FORMS
+from core.config import ROOT_DIR
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, round(p / 100 * (len(valores) - 1)))]
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_salud(url, timeout):
+    destino = urlparse(url)
+    fin = time.perf_counter() + timeout
+    while time.perf_counter() < fin:
+        try:
+            conn = http.client.HTTPConnection(destino.hostname, destino.port, timeout=5)
+            conn.request("GET", "/health")
+            respuesta = conn.getresponse()
+            respuesta.read()
+            conn.close()
+            if respuesta.status == 200:
+                return True
+        except OSError:
+            pass  # Todavía no escucha
+        time.sleep(0.2)
+    return False
+
+
+def cliente(n, url, forms, filas, repetidos, fin, resultados):
+    """Envía contextos hasta `fin` y agrega (form, estado, segundos) a resultados."""
+    destino = urlparse(url)
+    conn = http.client.HTTPConnection(destino.hostname, destino.port, timeout=300)
+    cuerpos = {form: con_filas(FORMS[form], filas) for form in forms}
+    i = 0
+    while time.perf_counter() < fin:
+        form = forms[(n + i) % len(forms)]
+        contexto = cuerpos[form] if repetidos else dict(cuerpos[form], carga=f"{n}-{i}")
+        cuerpo = json.dumps(contexto, ensure_ascii=False).encode("utf-8")
+        t0 = time.perf_counter()
+        try:
+            conn.request("POST", f"/render/{form}", cuerpo, {"Content-Type": "application/json"})
+            respuesta = conn.getresponse()
+            respuesta.read()
+            estado = respuesta.status
+            if respuesta.getheader("Connection") == "close":
+                conn.close()
+        except (OSError, http.client.HTTPException) as e:
+            estado = type(e).__name__
+            conn.close()
+        resultados.append((form, estado, time.perf_counter() - t0))
+        i += 1
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="API ya corriendo (por defecto se levanta una local)")
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=30)
+    parser.add_argument("--filas", type=int, default=10, help="filas de cada tabla dinámica")
+    parser.add_argument("--forms", help="ids separados por coma (por defecto los cuatro)")
+    parser.add_argument("--repetidos", action="store_true", help="el mismo contexto siempre (mide la caché)")
+    parser.add_argument("--workers", type=int, help="workers de la API local (default: núcleos)")
+    parser.add_argument("--cupos", type=int, help="cupos de render de la API local (default: workers)")
+    args = parser.parse_args()
+
+    forms = args.forms.split(",") if args.forms else list(FORMS)
+    servidor = None
+    url = args.url
+    if url is None:
+        puerto = _puerto_libre()
+        comando = [sys.executable, "-m", "core.api", "--host", "127.0.0.1", "--puerto", str(puerto)]
+        if args.workers:
+            comando += ["--workers", str(args.workers)]
+        if args.cupos:
+            comando += ["--cupos", str(args.cupos)]
+        servidor = subprocess.Popen(comando, cwd=ROOT_DIR)
+        url = f"http://127.0.0.1:{puerto}"
+    try:
+        t0 = time.perf_counter()
+        if not _esperar_salud(url, 120):
+            print(f"{url}/health no respondió 200")
+            return 1
+        print(f"{url} listo en {time.perf_counter() - t0:.1f}s; {args.clientes} clientes durante {args.segundos:.0f}s, "
+              f"forms: {', '.join(forms)}")
+
+        resultados = []  # list.append es atómico entre hilos
+        t0 = time.perf_counter()
+        fin = t0 + args.segundos
+        hilos = [threading.Thread(target=cliente, args=(n, url, forms, args.filas, args.repetidos, fin, resultados))
+                 for n in range(args.clientes)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        total = time.perf_counter() - t0
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait(timeout=30)
+
+    ok = [r for r in resultados if r[1] == 200]
+    print(f"\n{'form':<12}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}")
+    for form in forms + ["(todos)"]:
+        lat = [s for f, _, s in ok if form in ("(todos)", f)]
+        if lat:
+            print(f"{form:<12}{len(lat):>6}{_percentil(lat, 50):>8.2f}s{_percentil(lat, 95):>8.2f}s"
+                  f"{_percentil(lat, 99):>8.2f}s{max(lat):>8.2f}s")
+    errores = {}
+    for _, estado, _ in resultados:
+        if estado != 200:
+            errores[estado] = errores.get(estado, 0) + 1
+    print(f"\nTotal {total:.1f}s, {len(ok) / total:.2f} docs/s sostenidos, "
+          f"latencia media {statistics.mean(s for *_, s in ok) if ok else 0:.2f}s, errores {errores or 0}")
+    return 0 if ok and not errores else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""Prueba de carga: N usuarios simultáneos llenando y enviando formularios.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.load_test [--usuarios 20] [--rampa 2] [--cupos 2] [--forms checklist,ast]
+
+Cada usuario es una sesión de Streamlit (AppTest) en su propio hilo, como
+las sesiones de un mismo servidor: comparten el pool de render y la cola
+de admisión de core.jobs. Cada uno abre pages/9_Formularios.py con su
+formulario, completa los campos de texto, pulsa el botón de generar y
+espera el PDF. Se reportan percentiles de latencia por formulario y la
+cola máxima observada.
+
+AppTest no admite ejecuciones simultáneas, así que las corridas del script
+de cada sesión se turnan (en el servidor real también compiten por el GIL);
+los renders sí corren en paralelo en el pool.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PAGINA = "pages/9_Formularios.py"
+_script = threading.Lock()
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, round(p / 100 * (len(valores) - 1)))]
+
+
+def _correr(at):
+    with _script:
+        return at.run()
+
+
+def usuario(n, form_id, esperar, timeout):
+    """Una sesión completa. Devuelve dict con form, segundos de página y de PDF, o error."""
+    from streamlit.testing.v1 import AppTest
+
+    from core.config import ROOT_DIR
+    from core.schema import fields, load_schema
+
+    at = AppTest.from_file(os.path.join(ROOT_DIR, PAGINA), default_timeout=timeout)
+    at.query_params["form"] = form_id
+    t0 = time.perf_counter()
+    _correr(at)
+    carga = time.perf_counter() - t0
+    # Todos los textos (no solo los requeridos) llevan el número de usuario
+    # para que ningún PDF salga de la caché de otro
+    for c in fields(load_schema(form_id), "texto"):
+        at.text_input(key=f"{form_id}.{c['nombre']}").input(f"Carga {n}")
+    boton = next(b for b in at.button if b.label != "Reanudar" and not b.disabled)
+
+    t0 = time.perf_counter()
+    _correr(boton.click())
+    clic = time.perf_counter() - t0
+    while not at.exception and not at.get("download_button"):
+        if time.perf_counter() - t0 > timeout:
+            return {"form": form_id, "error": "timeout"}
+        time.sleep(esperar)
+        _correr(at)
+    if at.exception:
+        return {"form": form_id, "error": at.exception[0].message}
+    return {"form": form_id, "carga": carga, "clic": clic, "pdf": time.perf_counter() - t0}
+
+
+def _vigilar_cola(fin, muestras):
+    from core.jobs import queue_stats
+    while not fin.is_set():
+        muestras.append(queue_stats())
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--rampa", type=float, default=2.0, help="segundos en que entran todos los usuarios")
+    parser.add_argument("--cupos", type=int, help="RMC_RENDER_SLOTS para esta corrida")
+    parser.add_argument("--forms", help="ids separados por coma (por defecto todos los esquemas)")
+    parser.add_argument("--poll", type=float, default=0.25, help="segundos entre refrescos de cada usuario")
+    parser.add_argument("--timeout", type=float, default=180)
+    args = parser.parse_args()
+
+    if args.cupos:
+        os.environ["RMC_RENDER_SLOTS"] = str(args.cupos)  # antes de importar core.jobs
+    from core.jobs import RENDER_SLOTS, RENDER_WORKERS
+    from core.schema import list_schemas
+
+    forms = args.forms.split(",") if args.forms else list(list_schemas())
+    print(f"{args.usuarios} usuarios, {RENDER_WORKERS} workers, {RENDER_SLOTS} cupos de render, forms: {', '.join(forms)}")
+
+    fin, cola = threading.Event(), []
+    vigia = threading.Thread(target=_vigilar_cola, args=(fin, cola), daemon=True)
+    vigia.start()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.usuarios) as ex:
+        futuros = []
+        for n in range(args.usuarios):
+            futuros.append(ex.submit(usuario, n, forms[n % len(forms)], args.poll, args.timeout))
+            time.sleep(args.rampa / args.usuarios)
+        resultados = [f.result() for f in futuros]
+    total = time.perf_counter() - t0
+    fin.set()
+
+    errores = [r for r in resultados if "error" in r]
+    ok = [r for r in resultados if "error" not in r]
+    print(f"\n{'form':<12}{'n':>4}{'carga p50':>11}{'clic p95':>10}{'pdf p50':>9}{'pdf p95':>9}{'pdf p99':>9}{'pdf máx':>9}")
+    for form in forms + ["(todos)"]:
+        filas = [r for r in ok if form in ("(todos)", r["form"])]
+        if not filas:
+            continue
+        pdf = [r["pdf"] for r in filas]
+        print(f"{form:<12}{len(filas):>4}{statistics.median(r['carga'] for r in filas):>10.2f}s"
+              f"{_percentil([r['clic'] for r in filas], 95):>9.2f}s{_percentil(pdf, 50):>8.2f}s"
+              f"{_percentil(pdf, 95):>8.2f}s{_percentil(pdf, 99):>8.2f}s{max(pdf):>8.2f}s")
+    print(f"\nTotal {total:.1f}s, {len(ok) / total:.2f} docs/s, cola máxima {max((m['en_espera'] for m in cola), default=0)}, "
+          f"errores {len(errores)}")
+    for r in errores[:5]:
+        print(f"  {r['form']}: {r['error']}")
+
+
+if __name__ == "__main__":
+    main()
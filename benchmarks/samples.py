@@ -0,0 +1,69 @@
+# Contextos de ejemplo para renderizar cada plantilla sin pasar por Streamlit.
+
+CHECKLIST = {
+    "codigo": "99300-SIGOP-R6529", "revision": "1", "fecha_rev": "06/11/24",
+    "proyecto": "Minera X - Montaje Y", "inspector": "Juan Perez",
+    "fecha_chequeo": "01/01/2025",
+    "items": [{"nombre": "Estado general de brocas", "estado": "A", "obs": ""}] * 9,
+    "observaciones_generales": "", "firma_b64": None,
+}
+
+AST = {
+    "trabajo": "Mantenimiento Preventivo", "lugar": "Taller Central", "fecha": "01/01/2025",
+    "empresa": "Ingeniería y Servicios RMC Ltda.", "hora_ini": "08:00", "hora_fin": "18:00",
+    "resp_cliente": "", "resp_rmc": "", "supervisor": "Juan Perez", "firma_sup_b64": None,
+    "epps": "Casco, Lentes, Zapatos, Guantes", "maquinas": "Camioneta 4x4",
+    "riesgos_rows": [[{"label": "Trabajo en altura (> 1,8 mt)", "checked": True},
+                      {"label": "Izaje y aparejos", "checked": False}]] * 7,
+    "pasos": [{"Etapa": "Ingreso", "Riesgo": "Caída", "Control": "Caminar atento",
+               "E": False, "S": False, "I": False, "A": True, "EPP": True}],
+    "emergencias": [{"Emergencia": "Incendio", "Pasos": "1. Usar extintor. 2. Evacuar."}],
+    "charla_por": "Juan Perez", "charla_cargo": "Supervisor", "charla_fecha": "01/01/2025",
+    "charla_hora_ini": "08:00", "charla_hora_fin": "08:15", "firma_charla_b64": None,
+    "charla_temas": "• Revisión de EPPs.",
+    "colaboradores": [{"Nombre": "Juan Perez", "RUT": "11.111.111-1"}],
+    "revision_1": "Sin Comentarios", "revision_2": "Sin Comentarios",
+}
+
+ARNES = {
+    "id_equipo": "ARN-001", "fecha": "01/01/2025", "colaborador": "Juan Perez", "cargo": "Rigger",
+    "items": [{"CAT": "1. CONDICIÓN DEL TEJIDO", "ITEM": "1.1 Estiramiento excesivo", "A/R": "A", "OBS": ""}] * 19,
+    "firma_user": None, "firma_sup": None,
+}
+
+EPP = {
+    "nombre": "Juan Perez", "rut": "11.111.111-1", "cargo": "Rigger", "fecha": "01/01/2025",
+    "items": [{"EPP/ROPA": "Casco de Seguridad", "TALLA": "Est.", "CANT": 1, "REPOSICIÓN": False}] * 3,
+    "firma_b64": None,
+}
+
+TEMPLATES = {
+    "checklist.html": CHECKLIST,
+    "ast_final.html": AST,
+    "arnes.html": ARNES,
+    "epp.html": EPP,
+}
+
+
+# --- CONTEXTOS CON N FILAS ---
+# Las tablas dinámicas (st.data_editor) pueden crecer sin límite; estas son
+# las listas que hacen crecer el layout de cada plantilla.
+FILAS = {
+    "checklist.html": {"items": lambda i: {"nombre": f"Ítem de inspección {i}", "estado": "AR"[i % 7 == 0], "obs": ""}},
+    "ast_final.html": {
+        "pasos": lambda i: {"Etapa": f"Etapa {i}", "Riesgo": "Caída a distinto nivel", "Control": "Uso de arnés y línea de vida",
+                            "E": False, "S": i % 2 == 0, "I": False, "A": True, "EPP": True},
+        "emergencias": lambda i: {"Emergencia": f"Emergencia {i}", "Pasos": "1. Dar aviso. 2. Evacuar. 3. Punto de encuentro."},
+        "colaboradores": lambda i: {"Nombre": f"Colaborador {i}", "RUT": f"{10 + i}.111.111-1"},
+    },
+    "arnes.html": {"items": lambda i: {"CAT": f"{i // 5 + 1}. CATEGORÍA", "ITEM": f"{i}. Revisión de costuras", "A/R": "A", "OBS": ""}},
+    "epp.html": {"items": lambda i: {"EPP/ROPA": f"EPP {i}", "TALLA": "M", "CANT": 1, "REPOSICIÓN": i % 3 == 0}},
+}
+
+
+def con_filas(template_name, n):
+    """Copia del contexto de ejemplo con n filas en cada tabla dinámica."""
+    context = dict(TEMPLATES[template_name])
+    for campo, fila in FILAS[template_name].items():
+        context[campo] = [fila(i) for i in range(1, n + 1)]
+    return context
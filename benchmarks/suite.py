@@ -0,0 +1,186 @@
+"""Suite de benchmarks de generación de documentos (sin Streamlit).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.suite [--filas 1,10,50,200] [--repeticiones 3] [--solo render]
+    python -m benchmarks.suite --comparar .cache/bench/abc1234.json
+
+Mide cada plantilla con tablas de N filas, la codificación de firmas, el
+logo y la construcción del MIME del correo. Cada caso corre en un proceso
+nuevo para que el pico de RSS sea solo suyo. Los resultados (tiempo,
+pico de RSS y bytes de salida) se guardan en JSON; con --comparar se
+marcan los casos más lentos o pesados que la línea base.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from core.config import CACHE_DIR, ROOT_DIR
+
+BENCH_DIR = os.path.join(CACHE_DIR, "bench")
+FILAS_DEFAULT = (1, 10, 50, 200)
+TOLERANCIA = 0.15
+
+
+def _rss_pico_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo reporta en KB, macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+# --- CASOS ---
+# Cada caso devuelve una función sin argumentos que produce bytes (o str);
+# la preparación queda fuera del tiempo medido.
+
+def _caso_render(template_name, n):
+    from benchmarks.samples import con_filas
+    from core.render import render_pdf
+
+    context = con_filas(template_name, n)
+    return lambda: render_pdf(template_name, context)
+
+
+def _caso_firma(formato):
+    from benchmarks.bench_signatures import firma_sintetica
+    from core.signatures import process_signature
+
+    canvas = firma_sintetica()
+    return lambda: process_signature(canvas, formato)
+
+
+def _caso_logo(modo):
+    from core.assets import build_variant, get_logo_b64
+    from core.config import LOGO_PATH
+
+    if modo == "frio":
+        return lambda: build_variant(LOGO_PATH, "print")  # sin caché: redimensionar y comprimir
+    return get_logo_b64
+
+
+def _caso_mime(kb):
+    from core.outbox import build_message
+
+    settings = {"sender_email": "bench@example.com", "receiver_email": "bench@example.com"}
+    pdf = os.urandom(kb * 1024)
+    return lambda: build_message(settings, "Benchmark", "Cuerpo", pdf, "bench.pdf").as_bytes()
+
+
+CASOS = {"render": _caso_render, "firma": _caso_firma, "logo": _caso_logo, "mime": _caso_mime}
+
+
+def _ejecutar(tipo, args, repeticiones):
+    # Corre en un proceso propio: la primera llamada (imports, fuentes) no se cuenta
+    fn = CASOS[tipo](*args)
+    salida = fn()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        salida = fn()
+        tiempos.append(time.perf_counter() - t0)
+    return {
+        "segundos_min": min(tiempos),
+        "segundos_mediana": statistics.median(tiempos),
+        "rss_pico_mb": _rss_pico_mb(),
+        "bytes": len(salida),
+    }
+
+
+def listar_casos(filas):
+    from benchmarks.samples import TEMPLATES
+
+    casos = [(f"render/{t}/{n}", "render", (t, n)) for t in TEMPLATES for n in filas]
+    casos += [(f"firma/{f}", "firma", (f,)) for f in ("png", "png1", "svg")]
+    casos += [(f"logo/{m}", "logo", (m,)) for m in ("frio", "caliente")]
+    casos += [(f"mime/{kb}kb", "mime", (kb,)) for kb in (100, 1024)]
+    return casos
+
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+
+
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    """Lista de (caso, métrica, antes, ahora) que empeoraron más que la tolerancia."""
+    regresiones = []
+    for nombre, r in actual["casos"].items():
+        b = base["casos"].get(nombre)
+        if not b or "error" in r or "error" in b:
+            continue
+        for metrica in ("segundos_mediana", "rss_pico_mb", "bytes"):
+            antes, ahora = b.get(metrica), r.get(metrica)
+            if antes and ahora and ahora > antes * (1 + tolerancia):
+                regresiones.append((nombre, metrica, antes, ahora))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", default=",".join(map(str, FILAS_DEFAULT)),
+                        help="filas por tabla dinámica (default: 1,10,50,200)")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--solo", default="", help="solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--salida", help=f"JSON de resultados (default: {BENCH_DIR}/<revisión>.json)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior (línea base)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="empeoramiento aceptado (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    filas = [int(n) for n in args.filas.split(",") if n.strip()]
+    casos = [c for c in listar_casos(filas) if args.solo in c[0]]
+    revision = _revision()
+    resultado = {
+        "revision": revision, "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones, "casos": {},
+    }
+
+    print(f"{'caso':<32}{'mediana':>10}{'mín':>10}{'RSS pico':>11}{'bytes':>12}")
+    ctx = multiprocessing.get_context("spawn")
+    for nombre, tipo, caso_args in casos:
+        # Un proceso por caso: ru_maxrss es monótono dentro de un proceso
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            try:
+                r = pool.submit(_ejecutar, tipo, caso_args, args.repeticiones).result()
+            except Exception as e:
+                r = {"error": f"{type(e).__name__}: {e}"}
+        resultado["casos"][nombre] = r
+        if "error" in r:
+            print(f"{nombre:<32}  ERROR {r['error']}")
+        else:
+            rss = f"{r['rss_pico_mb']:.0f}MB" if r["rss_pico_mb"] is not None else "—"
+            print(f"{nombre:<32}{r['segundos_mediana'] * 1000:>8.1f}ms{r['segundos_min'] * 1000:>8.1f}ms"
+                  f"{rss:>11}{r['bytes']:>12,}")
+
+    salida = args.salida or os.path.join(BENCH_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados -> {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultado, base, args.tolerancia)
+        print(f"Comparado con {base.get('revision', args.comparar)}: {len(regresiones)} regresión(es)")
+        for nombre, metrica, antes, ahora in regresiones:
+            print(f"  {nombre} {metrica}: {antes:,.4g} -> {ahora:,.4g} (+{(ahora / antes - 1):.0%})")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
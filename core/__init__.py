@@ -0,0 +1 @@
+# Módulos compartidos por las páginas del portal (sin dependencia de Streamlit).
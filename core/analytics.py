@@ -0,0 +1,246 @@
+import argparse
+import glob
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.config import STATE_DIR
+
+# --- ANALÍTICA DE RESULTADOS ---
+# Las filas de resultados de cada documento (A/R por ítem de los checklists,
+# riesgos marcados en la AST, EPP entregados; ver "analitica" en
+# schemas/*.json) se agregan como un parquet por documento en
+# .rmc/analitica/mes=AAAA-MM/. Los archivos no se modifican: los meses
+# cerrados se compactan en un solo archivo. Los totales por formulario,
+# mes, lugar, categoría, ítem y resultado se suman en SQLite al agregar cada
+# documento, así que la página de tendencias no recorre los parquet.
+
+ANALYTICS_DIR = os.path.join(STATE_DIR, "analitica")
+ANALYTICS_DB = os.path.join(STATE_DIR, "analitica.db")
+COMPACT_EVERY = 24 * 3600  # segundos entre compactaciones de meses cerrados
+
+COLUMNAS = pa.schema([
+    ("sha256", pa.string()),
+    ("form", pa.string()),
+    ("fecha", pa.string()),
+    ("mes", pa.string()),
+    ("lugar", pa.string()),
+    ("trabajador", pa.string()),
+    ("id_equipo", pa.string()),
+    ("tabla", pa.string()),
+    ("fila", pa.int32()),
+    ("categoria", pa.string()),
+    ("item", pa.string()),
+    ("resultado", pa.string()),
+    ("cantidad", pa.int32()),
+])
+CLAVE_FILA = ["sha256", "tabla", "fila"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    sha256 TEXT PRIMARY KEY,
+    form TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    lugar TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_docs_mes ON documentos (form, mes, lugar);
+CREATE TABLE IF NOT EXISTS agregados (
+    form TEXT NOT NULL,
+    mes TEXT NOT NULL,
+    lugar TEXT NOT NULL,
+    tabla TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    item TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (form, mes, lugar, tabla, categoria, item, resultado)
+);
+"""
+
+_lock = threading.Lock()
+_ultima_compactacion = 0.0
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(ANALYTICS_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _mes_dir(mes):
+    return os.path.join(ANALYTICS_DIR, f"mes={mes}")
+
+
+def _escribir_parquet(tabla, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    pq.write_table(tabla, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def _sumar(conn, filas):
+    # Agrupa las filas antes de ir a SQLite: un UPSERT por combinación
+    totales = Counter()
+    for f in filas:
+        clave = (f["form"], f["mes"], f["lugar"], f["tabla"], f["categoria"], f["item"], f["resultado"])
+        totales[clave, "n"] += 1
+        totales[clave, "cantidad"] += f["cantidad"]
+    claves = {clave for clave, _ in totales}
+    conn.executemany(
+        "INSERT INTO agregados (form, mes, lugar, tabla, categoria, item, resultado, n, cantidad)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (form, mes, lugar, tabla, categoria, item, resultado)"
+        " DO UPDATE SET n = n + excluded.n, cantidad = cantidad + excluded.cantidad",
+        [(*clave, totales[clave, "n"], totales[clave, "cantidad"]) for clave in claves],
+    )
+
+
+def append_results(sha256, registro, filas):
+    """Agrega las filas de resultados de un documento archivado.
+
+    registro es el de core.schema.archive_record y filas las de
+    core.schema.analytics_rows. Cada documento (sha256) cuenta una sola
+    vez. Devuelve False si no había filas o el documento ya estaba.
+    """
+    if not filas:
+        return False
+    fecha = registro.get("fecha") or date.today().isoformat()
+    comunes = {
+        "sha256": sha256, "form": registro["form"], "fecha": fecha, "mes": fecha[:7],
+        "lugar": registro.get("lugar") or "", "trabajador": registro.get("trabajador") or "",
+        "id_equipo": registro.get("id_equipo") or "",
+    }
+    filas = [dict(comunes, **f) for f in filas]
+    # El nombre es el sha: reintentar el mismo documento reescribe el mismo archivo
+    _escribir_parquet(pa.Table.from_pylist(filas, schema=COLUMNAS),
+                      os.path.join(_mes_dir(comunes["mes"]), f"{sha256}.parquet"))
+    with _connect() as conn:
+        nuevo = conn.execute(
+            "INSERT OR IGNORE INTO documentos (sha256, form, mes, lugar) VALUES (?, ?, ?, ?)",
+            (sha256, comunes["form"], comunes["mes"], comunes["lugar"]),
+        ).rowcount
+        if nuevo:
+            _sumar(conn, filas)
+    _compactar_en_fondo()
+    return bool(nuevo)
+
+
+# --- CONSULTAS ---
+
+def load_aggregates(form=None):
+    """Totales como DataFrame (form, mes, lugar, tabla, categoria, item, resultado, n, cantidad)."""
+    sql = "SELECT form, mes, lugar, tabla, categoria, item, resultado, n, cantidad FROM agregados"
+    with _connect() as conn:
+        if form:
+            return pd.read_sql_query(sql + " WHERE form = ?", conn, params=(form,))
+        return pd.read_sql_query(sql, conn)
+
+
+def document_counts():
+    """Documentos por (form, mes, lugar) como DataFrame con la columna "documentos"."""
+    with _connect() as conn:
+        return pd.read_sql_query(
+            "SELECT form, mes, lugar, COUNT(*) AS documentos FROM documentos GROUP BY form, mes, lugar", conn)
+
+
+def load_rows(desde=None, hasta=None, form=None):
+    """Filas de detalle de los meses entre desde y hasta ("AAAA-MM", inclusive).
+
+    Solo se leen las carpetas de esos meses. Si una compactación estaba a
+    medio camino, las filas repetidas se descartan.
+    """
+    archivos = []
+    for carpeta in sorted(glob.glob(os.path.join(ANALYTICS_DIR, "mes=*"))):
+        mes = os.path.basename(carpeta)[4:]
+        if (desde is None or mes >= desde) and (hasta is None or mes <= hasta):
+            archivos.extend(sorted(glob.glob(os.path.join(carpeta, "*.parquet"))))
+    if not archivos:
+        return COLUMNAS.empty_table().to_pandas()
+    tablas = []
+    for path in archivos:
+        try:
+            tablas.append(pq.read_table(path, schema=COLUMNAS,
+                                        filters=[("form", "=", form)] if form else None))
+        except FileNotFoundError:
+            pass  # Lo borró una compactación: sus filas están en el compactado
+    df = pa.concat_tables(tablas).to_pandas() if tablas else COLUMNAS.empty_table().to_pandas()
+    return df.drop_duplicates(CLAVE_FILA, ignore_index=True)
+
+
+# --- COMPACTACIÓN ---
+
+def compact_month(mes):
+    """Junta los parquet del mes en uno solo. Devuelve cuántos archivos reemplazó."""
+    archivos = sorted(glob.glob(os.path.join(_mes_dir(mes), "*.parquet")))
+    if len(archivos) < 2:
+        return 0
+    tabla = pa.concat_tables([pq.read_table(p, schema=COLUMNAS) for p in archivos])
+    tabla = pa.Table.from_pandas(tabla.to_pandas().drop_duplicates(CLAVE_FILA), schema=COLUMNAS,
+                                 preserve_index=False)
+    _escribir_parquet(tabla, os.path.join(_mes_dir(mes), f"compacto-{time.time_ns()}.parquet"))
+    for path in archivos:
+        os.remove(path)
+    return len(archivos)
+
+
+def compact_closed_months(hoy=None):
+    """Compacta los meses anteriores al actual (el mes en curso sigue recibiendo archivos)."""
+    actual = (hoy or date.today()).isoformat()[:7]
+    total = 0
+    for carpeta in glob.glob(os.path.join(ANALYTICS_DIR, "mes=*")):
+        mes = os.path.basename(carpeta)[4:]
+        if mes < actual:
+            total += compact_month(mes)
+    return total
+
+
+def _compactar_en_fondo():
+    # Como mucho una vez al día y en un hilo: append_results no espera
+    global _ultima_compactacion
+    with _lock:
+        if time.time() - _ultima_compactacion < COMPACT_EVERY:
+            return
+        _ultima_compactacion = time.time()
+    threading.Thread(target=compact_closed_months, name="rmc-analitica", daemon=True).start()
+
+
+def rebuild_aggregates():
+    """Recalcula documentos y totales desde los parquet (p. ej. tras borrar analitica.db)."""
+    df = load_rows()
+    filas = df.to_dict("records")
+    documentos = df.drop_duplicates("sha256")[["sha256", "form", "mes", "lugar"]]
+    with _connect() as conn:
+        conn.execute("DELETE FROM agregados")
+        conn.execute("DELETE FROM documentos")
+        conn.executemany("INSERT INTO documentos (sha256, form, mes, lugar) VALUES (?, ?, ?, ?)",
+                         documentos.itertuples(index=False))
+        _sumar(conn, filas)
+    return len(documentos), len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de la analítica de resultados (.rmc/analitica).")
+    parser.add_argument("--compactar", action="store_true", help="junta los parquet de los meses cerrados")
+    parser.add_argument("--reconstruir", action="store_true", help="recalcula los totales desde los parquet")
+    args = parser.parse_args()
+    if args.compactar:
+        print(f"{compact_closed_months()} archivos compactados")
+    if args.reconstruir:
+        documentos, filas = rebuild_aggregates()
+        print(f"{documentos} documentos, {filas} filas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""API HTTP de render: los mismos PDF SIGOP, sin pasar por Streamlit.
+
+Uso (desde la raíz del repo):
+    python -m core.api [--puerto 8600] [--workers 4] [--cupos 4]
+
+    curl -X POST --data @contexto.json http://localhost:8600/render/checklist -o checklist.pdf
+    curl http://localhost:8600/health
+
+POST /render/<form> recibe el contexto de la plantilla en JSON (el mismo
+que arma cada página; ver benchmarks/samples.py) y devuelve el PDF. <form>
+es checklist, ast, arnes o epp (core.batch.FORMS) o el nombre de la
+plantilla. GET /health responde 200 cuando los workers están calientes
+(503 mientras arrancan) con el estado de la cola, y GET /metrics el texto
+Prometheus de core.metrics.
+
+Los renders usan el pool de core.jobs: los workers se crean y calientan
+(core.render.warm_up) al arrancar, hay como máximo RMC_RENDER_SLOTS renders
+a la vez y un contexto repetido sale de la caché de PDFs. Los contextos
+vienen de otros sistemas, así que el render solo lee recursos de assets/ y
+templates/ (solo_propios en core.fetcher).
+"""
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.batch import FORMS
+from core.metrics import Traza, prometheus_text
+
+# --- CONFIGURACIÓN ---
+# Tamaño máximo del JSON (las firmas vienen en base64), solicitudes
+# esperando cupo antes de responder 503 y segundos máximos por PDF.
+API_PORT = int(os.environ.get("RMC_API_PORT", 8600))
+API_MAX_BYTES = int(os.environ.get("RMC_API_MAX_BYTES", 2 * 1024 * 1024))
+API_MAX_QUEUE = int(os.environ.get("RMC_API_MAX_QUEUE", 64))
+API_TIMEOUT = float(os.environ.get("RMC_API_TIMEOUT", 120))
+# Los PDF ya se entregaron en la respuesta: los trabajos terminados se
+# guardan poco (la caché de PDFs de core.memo sigue sirviendo repetidos)
+API_JOB_TTL = float(os.environ.get("RMC_API_JOB_TTL", 60))
+
+PLANTILLAS = set(FORMS.values())
+
+_calentamiento = []  # futures de core.jobs.start_warmup()
+
+
+def _plantilla(form):
+    if form in FORMS:
+        return FORMS[form]
+    return form if form in PLANTILLAS else None
+
+
+class _Servidor(ThreadingHTTPServer):
+    # Un hilo por conexión; los hilos solo esperan al pool de render
+    daemon_threads = True
+    request_queue_size = 128  # conexiones pendientes de aceptar bajo carga
+
+
+class _RenderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: los clientes reutilizan la conexión
+    timeout = 30  # segundos sin recibir datos antes de cerrar (clientes lentos o inactivos)
+
+    def _responder(self, codigo, cuerpo, tipo="application/json", **headers):
+        if isinstance(cuerpo, dict):
+            cuerpo = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in headers.items():
+            self.send_header(nombre.replace("_", "-"), str(valor))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, codigo, mensaje, **headers):
+        self._responder(codigo, {"error": mensaje}, **headers)
+
+    def do_GET(self):
+        from core.jobs import RENDER_WORKERS, queue_stats
+
+        ruta = self.path.split("?")[0]
+        if ruta == "/health":
+            listos = sum(1 for f in _calentamiento if f.done())
+            estado = "ok" if listos == len(_calentamiento) else "calentando"
+            self._responder(200 if estado == "ok" else 503,
+                            dict(queue_stats(), estado=estado, workers=RENDER_WORKERS, formularios=list(FORMS)))
+        elif ruta == "/metrics":
+            self._responder(200, prometheus_text().encode(), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._error(404, "Ruta no encontrada")
+
+    def do_POST(self):
+        from core.jobs import QueueFull, job_info, job_result, submit_render
+
+        partes = self.path.split("?")[0].strip("/").split("/")
+        template_name = _plantilla(partes[1]) if len(partes) == 2 and partes[0] == "render" else None
+        try:
+            largo = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            largo = None
+
+        # El cuerpo se lee entero o se cierra la conexión (keep-alive)
+        if largo is None or largo < 0 or largo > API_MAX_BYTES:
+            self.close_connection = True
+            if largo is None or largo < 0:
+                self._error(411, "Falta Content-Length")
+            else:
+                self._error(413, f"El JSON supera {API_MAX_BYTES} bytes (RMC_API_MAX_BYTES)")
+            return
+        cuerpo = self.rfile.read(largo)
+        if template_name is None:
+            self._error(404, f"Formulario desconocido; use /render/<{'|'.join(FORMS)}>")
+            return
+        try:
+            contexto = json.loads(cuerpo)
+        except ValueError as e:
+            self._error(400, f"JSON inválido: {e}")
+            return
+        if not isinstance(contexto, dict):
+            self._error(400, "El JSON debe ser un objeto con el contexto de la plantilla")
+            return
+
+        traza = Traza("api", partes[1], self.headers.get("X-Request-Id"))
+        try:
+            # El límite se revisa en core.jobs con su lock: dos hilos no pasan a la vez
+            job_id = submit_render(template_name, contexto, solo_propios=True, max_espera=API_MAX_QUEUE)
+        except QueueFull:
+            self._error(503, "Cola de render llena", Retry_After=1)
+            return
+        try:
+            pdf = job_result(job_id, API_TIMEOUT)
+        except TimeoutError:
+            self._error(504, f"El PDF no terminó en {API_TIMEOUT:.0f}s", X_Request_Id=traza.id)
+            return
+        except Exception as e:
+            self._error(500, f"Error al generar PDF: {type(e).__name__}: {e}", X_Request_Id=traza.id)
+            return
+
+        info = job_info(job_id) or {"tiempos": {}, "segundos": 0.0, "clave": ""}
+        for etapa, segundos in info["tiempos"].items():
+            traza.add(etapa, segundos)
+        traza.add("total", info["segundos"])
+        traza.bytes["pdf"] = len(pdf)
+        traza.emit(clave=info["clave"])
+        self._responder(200, pdf, "application/pdf", X_Request_Id=traza.id,
+                        X_Render_Seconds=f"{info['segundos']:.3f}",
+                        X_Cache="miss" if info["tiempos"] else "hit",
+                        Content_Disposition=f'inline; filename="{partes[1]}.pdf"')
+
+    def log_message(self, *args):
+        pass  # Cada PDF queda en el log de core.metrics
+
+
+def serve(host="0.0.0.0", port=API_PORT):
+    """Levanta los workers de render y atiende hasta SIGINT/SIGTERM."""
+    from core.jobs import RENDER_SLOTS, RENDER_WORKERS, start_warmup
+
+    servidor = _Servidor((host, port), _RenderHandler)
+    _calentamiento.extend(start_warmup())
+    t0 = time.perf_counter()
+    print(f"API de render en http://{host}:{port} ({RENDER_WORKERS} workers, {RENDER_SLOTS} cupos)", flush=True)
+
+    def listo(_):
+        if all(f.done() for f in _calentamiento):
+            print(f"Workers listos en {time.perf_counter() - t0:.1f}s", flush=True)
+    for f in _calentamiento:
+        f.add_done_callback(listo)
+
+    # shutdown() espera a serve_forever: se llama desde otro hilo
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=servidor.shutdown).start())
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP para generar PDFs SIGOP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--puerto", type=int, default=API_PORT, help=f"default: RMC_API_PORT o {API_PORT}")
+    parser.add_argument("--workers", type=int, help="procesos de render (RMC_RENDER_WORKERS, default: núcleos)")
+    parser.add_argument("--cupos", type=int, help="renders a la vez (RMC_RENDER_SLOTS, default: workers)")
+    args = parser.parse_args(argv)
+
+    # Antes de importar core.jobs, que lee la configuración al cargarse
+    if args.workers:
+        os.environ["RMC_RENDER_WORKERS"] = str(args.workers)
+    if args.cupos:
+        os.environ["RMC_RENDER_SLOTS"] = str(args.cupos)
+    os.environ.setdefault("RMC_JOB_TTL", str(API_JOB_TTL))
+    serve(args.host, args.puerto)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
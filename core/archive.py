@@ -0,0 +1,146 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+from core.config import STATE_DIR
+
+# --- ARCHIVO LOCAL DE DOCUMENTOS ---
+# Los PDF se guardan por contenido (sha256) en .rmc/archivo/ab/abcd....pdf y
+# sus metadatos en una tabla SQLite indexada para consultas por equipo,
+# lugar, trabajador o tipo de formulario.
+
+ARCHIVE_DIR = os.path.join(STATE_DIR, "archivo")
+ARCHIVE_DB = os.path.join(STATE_DIR, "archivo.db")
+PAGE_SIZE = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256 TEXT NOT NULL UNIQUE,
+    form TEXT NOT NULL,
+    fecha TEXT NOT NULL,            -- ISO (YYYY-MM-DD): ordena bien como texto
+    lugar TEXT NOT NULL DEFAULT '',
+    trabajador TEXT NOT NULL DEFAULT '',
+    id_equipo TEXT NOT NULL DEFAULT '',
+    rechazos INTEGER NOT NULL DEFAULT 0,
+    archivo TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    creado TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_doc_fecha ON documentos (fecha, id);
+CREATE INDEX IF NOT EXISTS idx_doc_form ON documentos (form, fecha, id);
+CREATE INDEX IF NOT EXISTS idx_doc_equipo ON documentos (id_equipo, fecha, id);
+CREATE INDEX IF NOT EXISTS idx_doc_lugar ON documentos (lugar, fecha, id);
+CREATE INDEX IF NOT EXISTS idx_doc_trabajador ON documentos (trabajador, fecha, id);
+"""
+
+COLUMNS = ["id", "sha256", "form", "fecha", "lugar", "trabajador", "id_equipo", "rechazos", "archivo", "bytes", "creado"]
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(ARCHIVE_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def document_path(sha256):
+    return os.path.join(ARCHIVE_DIR, sha256[:2], f"{sha256}.pdf")
+
+
+def store_document(pdf_bytes, form, fecha, archivo, lugar="", trabajador="", id_equipo="", rechazos=0):
+    """Guarda el PDF (una sola copia por contenido) y lo indexa. Devuelve el sha256."""
+    sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+    path = document_path(sha256)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp, path)
+
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO documentos"
+            " (sha256, form, fecha, lugar, trabajador, id_equipo, rechazos, archivo, bytes, creado)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (sha256, form, fecha, lugar or "", trabajador or "", id_equipo or "", int(rechazos),
+             archivo, len(pdf_bytes), datetime.now().isoformat(timespec="seconds")),
+        )
+    return sha256
+
+
+def read_document(sha256):
+    with open(document_path(sha256), "rb") as f:
+        return f.read()
+
+
+def _filtros(form=None, id_equipo=None, lugar=None, trabajador=None, desde=None, hasta=None, solo_rechazos=False):
+    # Igualdad exacta en los campos indexados; así SQLite usa el índice
+    where, params = [], []
+    for campo, valor in (("form", form), ("id_equipo", id_equipo), ("lugar", lugar), ("trabajador", trabajador)):
+        if valor:
+            where.append(f"{campo} = ?")
+            params.append(valor)
+    if desde:
+        where.append("fecha >= ?")
+        params.append(desde)
+    if hasta:
+        where.append("fecha <= ?")
+        params.append(hasta)
+    if solo_rechazos:
+        where.append("rechazos > 0")
+    return where, params
+
+
+def search(cursor=None, limit=PAGE_SIZE, **filtros):
+    """Una página de resultados, del más reciente al más antiguo.
+
+    Paginación por cursor (fecha, id) del último registro de la página
+    anterior: cada página cuesta lo mismo sin importar cuán atrás esté.
+    Devuelve (filas como dicts, cursor siguiente o None).
+    """
+    where, params = _filtros(**filtros)
+    if cursor is not None:
+        where.append("(fecha < ? OR (fecha = ? AND id < ?))")
+        params += [cursor[0], cursor[0], cursor[1]]
+    sql = f"SELECT {', '.join(COLUMNS)} FROM documentos"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY fecha DESC, id DESC LIMIT ?"
+
+    with _connect() as conn:
+        filas = [dict(zip(COLUMNS, r)) for r in conn.execute(sql, params + [limit + 1])]
+    siguiente = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        siguiente = (filas[-1]["fecha"], filas[-1]["id"])
+    return filas, siguiente
+
+
+def count(**filtros):
+    where, params = _filtros(**filtros)
+    sql = "SELECT COUNT(*) FROM documentos"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with _connect() as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+
+def last_inspection(id_equipo):
+    """Última inspección del equipo (o None): ¿cuándo fue y hubo rechazos?"""
+    filas, _ = search(id_equipo=id_equipo, limit=1)
+    return filas[0] if filas else None
+
+
+def distinct_values(campo, limit=500):
+    """Valores distintos de form/lugar/trabajador/id_equipo para los filtros."""
+    if campo not in ("form", "lugar", "trabajador", "id_equipo"):
+        raise ValueError(campo)
+    with _connect() as conn:
+        filas = conn.execute(
+            f"SELECT DISTINCT {campo} FROM documentos WHERE {campo} != '' ORDER BY {campo} LIMIT ?", (limit,)
+        )
+        return [r[0] for r in filas]
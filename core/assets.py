@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import io
+import os
+import threading
+
+from PIL import Image
+
+from core.config import CACHE_DIR, LOGO_PATH
+
+# --- VARIANTES DE IMPRESIÓN ---
+# El logo original mide 13934x4096 px. La caja más grande de las plantillas es
+# de 140px CSS (epp.html), unos 3,7 cm: a 300 DPI bastan ~450 px de ancho.
+# "web" se usa en la portada (200px en pantalla, x2 para pantallas HiDPI).
+VARIANTS = {
+    "print": {"width": 450, "format": "PNG"},
+    "print_jpeg": {"width": 450, "format": "JPEG"},
+    "web": {"width": 400, "format": "PNG"},
+}
+
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg"}
+
+ASSETS_CACHE_DIR = os.path.join(CACHE_DIR, "assets")
+
+# Caché de proceso: la comparten todas las páginas y sesiones de Streamlit
+_lock = threading.Lock()
+_hashes = {}    # (ruta, mtime_ns, tamaño) -> sha256 del contenido
+_data_uris = {}  # (sha256, variante) -> "data:image/...;base64,..."
+
+
+def file_hash(path):
+    """sha256 del archivo, recalculado solo si cambian mtime o tamaño."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _hashes[key] = digest
+    return digest
+
+
+def build_variant(path, variant):
+    """Redimensiona y comprime la imagen según VARIANTS[variant]; devuelve bytes."""
+    spec = VARIANTS[variant]
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+        # reducing_gap usa reduce() antes del filtro: mucho más rápido en imágenes enormes
+        im.thumbnail((spec["width"], spec["width"] * 10), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    buffered = io.BytesIO()
+    if spec["format"] == "JPEG":
+        # JPEG no tiene transparencia: aplanamos sobre blanco (fondo del PDF)
+        fondo = Image.new("RGB", im.size, "white")
+        fondo.paste(im, mask=im.getchannel("A"))
+        fondo.save(buffered, format="JPEG", quality=85, optimize=True)
+    else:
+        # PNG con paleta de 256 colores (mantiene el canal alfa)
+        im = im.quantize(256, method=Image.Quantize.FASTOCTREE)
+        im.save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
+
+
+def _variant_bytes(path, digest, variant):
+    # Primero el disco: sobrevive a reinicios del servidor
+    ext = VARIANTS[variant]["format"].lower()
+    cache_file = os.path.join(ASSETS_CACHE_DIR, f"{digest[:16]}-{variant}.{ext}")
+    if os.path.exists(cache_file):
+        with open(cache_file, "rb") as f:
+            return f.read()
+
+    data = build_variant(path, variant)
+    try:
+        os.makedirs(ASSETS_CACHE_DIR, exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # Sin disco escribible seguimos solo con la caché en memoria
+    return data
+
+
+def get_asset_b64(path, variant="print"):
+    """Data URI de la variante pedida; "" si la imagen no existe."""
+    try:
+        digest = file_hash(path)
+    except FileNotFoundError:
+        return ""
+
+    key = (digest, variant)
+    uri = _data_uris.get(key)
+    if uri is None:
+        with _lock:
+            uri = _data_uris.get(key)
+            if uri is None:
+                data = _variant_bytes(path, digest, variant)
+                mime = MIME_TYPES[VARIANTS[variant]["format"]]
+                uri = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+                _data_uris[key] = uri
+    return uri
+
+
+def get_logo_b64(variant="print"):
+    return get_asset_b64(LOGO_PATH, variant)
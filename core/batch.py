@@ -0,0 +1,184 @@
+"""Generación masiva de documentos sin Streamlit.
+
+Uso (desde la raíz del repo):
+    python -m core.batch epp registros.xlsx --salida out/ --nombre "EPP_{nombre}_{fecha}.pdf"
+    python -m core.batch checklist registros.csv --base base.json --procesos 4
+
+Cada fila (CSV/XLSX) o línea (JSONL) es el contexto de la plantilla. Las
+celdas con JSON (p. ej. la lista "items") se decodifican, y --base aporta
+los campos comunes a todas las filas. Se escribe un PDF por registro y un
+manifiesto.jsonl con el resultado de cada uno. Con --subir, los PDF se suben
+en paralelo al destino de core.sinks configurado con RMC_SINK (carpeta por
+formulario y fecha de hoy) y el manifiesto incluye la URI de cada uno.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+from core.render import render_pdf
+
+FORMS = {
+    "checklist": "checklist.html",
+    "ast": "ast_final.html",
+    "arnes": "arnes.html",
+    "epp": "epp.html",
+}
+
+
+# --- LECTURA DE REGISTROS ---
+
+def _valor(v):
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return ""
+    if isinstance(v, (datetime, date)):
+        return v.strftime("%d/%m/%Y")
+    if hasattr(v, "item"):
+        v = v.item()  # numpy -> tipo de Python (picklable y serializable)
+    if isinstance(v, str) and v[:1] in "[{":
+        try:
+            return json.loads(v)
+        except ValueError:
+            pass
+    return v
+
+
+def read_records(path):
+    """Lista de contextos desde un CSV, XLSX o JSONL."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(linea) for linea in f if linea.strip()]
+
+    import pandas as pd
+
+    if ext in (".xlsx", ".xls"):
+        df = pd.read_excel(path)
+    elif ext == ".csv":
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError(f"Formato no soportado: {ext} (use .csv, .xlsx o .jsonl)")
+    return [{k: _valor(v) for k, v in fila.items()} for fila in df.to_dict("records")]
+
+
+def _nombre_archivo(patron, indice, form, contexto):
+    campos = {k: v for k, v in contexto.items() if isinstance(v, (str, int, float))}
+    try:
+        nombre = patron.format(n=indice, form=form, **campos)
+    except (KeyError, IndexError, ValueError):
+        nombre = f"{form}_{indice:05d}.pdf"
+    nombre = re.sub(r'[\\/:*?"<>|]+', "-", nombre)
+    return nombre if nombre.lower().endswith(".pdf") else f"{nombre}.pdf"
+
+
+# --- RENDER EN EL POOL ---
+
+def _render_uno(tarea):
+    # Corre en un proceso del pool: escribe el PDF y devuelve solo metadatos
+    indice, template_name, contexto, destino, optimizar = tarea
+    t0 = time.perf_counter()
+    try:
+        pdf = render_pdf(template_name, contexto, optimize=optimizar or None)
+        with open(destino, "wb") as f:
+            f.write(pdf)
+        return {"n": indice, "archivo": os.path.basename(destino), "bytes": len(pdf),
+                "sha256": hashlib.sha256(pdf).hexdigest(), "segundos": time.perf_counter() - t0}
+    except Exception as e:
+        return {"n": indice, "archivo": None, "error": f"{type(e).__name__}: {e}",
+                "segundos": time.perf_counter() - t0}
+
+
+def run_batch(form, registros, salida, base=None, patron="{form}_{n:05d}.pdf", procesos=None, optimizar=False):
+    """Renderiza todos los registros y devuelve (resultados, segundos)."""
+    template_name = FORMS.get(form, form)
+    os.makedirs(salida, exist_ok=True)
+
+    tareas = []
+    usados = set()
+    for i, registro in enumerate(registros, start=1):
+        contexto = dict(base or {}, **registro)
+        nombre = _nombre_archivo(patron, i, form, contexto)
+        if nombre in usados:  # Dos filas con los mismos datos: no sobrescribir
+            nombre = f"{nombre[:-4]}_{i:05d}.pdf"
+        usados.add(nombre)
+        tareas.append((i, template_name, contexto, os.path.join(salida, nombre), optimizar))
+
+    procesos = procesos or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        # chunksize: menos viajes entre procesos cuando hay cientos de filas
+        chunksize = max(1, len(tareas) // (procesos * 8))
+        resultados = list(pool.map(_render_uno, tareas, chunksize=chunksize))
+    return resultados, time.perf_counter() - t0
+
+
+def subir_lote(settings, form, salida, resultados):
+    """Sube los PDF generados en paralelo y anota "uri" (o "error_subida") en cada resultado."""
+    from core.sinks import make_sink, route, upload_many
+
+    hoy = date.today().isoformat()
+    ok = [r for r in resultados if r.get("archivo")]
+    archivos = [(route(settings, form, hoy, r["archivo"]), os.path.join(salida, r["archivo"])) for r in ok]
+    t0 = time.perf_counter()
+    subidas = upload_many(make_sink(settings), archivos, int(settings.get("hilos", 4)))
+    for r, (_, uri, error) in zip(ok, subidas):
+        if error:
+            r["error_subida"] = error
+        else:
+            r["uri"] = uri
+    print(f"{sum(1 for _, uri, _ in subidas if uri)}/{len(subidas)} subidos en {time.perf_counter() - t0:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera PDFs SIGOP en lote desde CSV/XLSX/JSONL.")
+    parser.add_argument("form", help=f"formulario: {', '.join(FORMS)} (o nombre de plantilla)")
+    parser.add_argument("registros", help="archivo .csv, .xlsx o .jsonl")
+    parser.add_argument("--salida", default="lote_pdf", help="carpeta de salida (default: lote_pdf)")
+    parser.add_argument("--base", help="JSON con campos comunes a todos los registros")
+    parser.add_argument("--nombre", default="{form}_{n:05d}.pdf",
+                        help="patrón del nombre de archivo; admite {n}, {form} y campos del registro")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de render (default: núcleos)")
+    parser.add_argument("--optimizar", action="store_true", help="post-procesar cada PDF con core.optimize")
+    parser.add_argument("--subir", action="store_true", help="subir los PDF al destino RMC_SINK (core.sinks)")
+    args = parser.parse_args(argv)
+
+    destino = None
+    if args.subir:
+        from core.sinks import settings_from_env
+
+        destino = settings_from_env()
+        if destino is None:
+            parser.error("--subir requiere RMC_SINK=local|s3 (ver core/sinks.py)")
+
+    base = None
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+
+    registros = read_records(args.registros)
+    resultados, segundos = run_batch(args.form, registros, args.salida, base, args.nombre, args.procesos,
+                                     args.optimizar)
+    if destino is not None:
+        subir_lote(destino, args.form, args.salida, resultados)
+
+    manifiesto = os.path.join(args.salida, "manifiesto.jsonl")
+    with open(manifiesto, "w", encoding="utf-8") as f:
+        for r in resultados:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    ok = sum(1 for r in resultados if r.get("archivo"))
+    print(f"{ok}/{len(resultados)} documentos en {segundos:.1f}s "
+          f"({ok / segundos if segundos else 0:.2f} docs/s) -> {args.salida}")
+    for r in resultados:
+        if r.get("error") or r.get("error_subida"):
+            print(f"  fila {r['n']}: {r.get('error') or r['error_subida']}")
+    return 0 if ok == len(resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+import pymupdf
+
+from core.archive import read_document
+from core.schema import load_schema
+
+# --- PAQUETE DE TURNO ---
+# Une los PDF ya generados de un turno (AST, checklist, arneses, EPP) en un
+# solo archivo con índice y marcadores. Las páginas se copian tal cual desde
+# el archivo local (no se vuelve a renderizar nada) y al guardar se fusionan
+# los objetos repetidos: el logo y las fuentes idénticas quedan una sola vez.
+
+TOC_LINEAS_POR_PAGINA = 38
+A4 = pymupdf.paper_rect("a4")
+
+
+def _esquema(form):
+    try:
+        return load_schema(form)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def form_label(form):
+    return _esquema(form).get("titulo_pagina", form)
+
+
+def _orden(doc):
+    # Mismo orden que los formularios (campo "orden" de cada esquema)
+    return (_esquema(doc["form"]).get("orden", 99), doc["form"], doc["fecha"], doc["id"])
+
+
+def _descripcion(doc):
+    partes = [doc.get("trabajador"), doc.get("id_equipo"), doc.get("lugar")]
+    return " · ".join(p for p in partes if p) or doc["archivo"]
+
+
+def _escribir_indice(out, titulo, entradas):
+    # entradas: (nivel, texto, página destino 0-based)
+    y0, alto_linea = 72, 18
+    for i, (nivel, texto, destino) in enumerate(entradas):
+        pagina = out[i // TOC_LINEAS_POR_PAGINA]
+        if i % TOC_LINEAS_POR_PAGINA == 0:
+            pagina.insert_text((56, 48), titulo, fontsize=14, fontname="hebo")
+        y = y0 + (i % TOC_LINEAS_POR_PAGINA) * alto_linea
+        x = 56 if nivel == 1 else 76
+        fuente = "hebo" if nivel == 1 else "helv"
+        pagina.insert_text((x, y), texto[:90], fontsize=10, fontname=fuente)
+        pagina.insert_text((A4.width - 80, y), str(destino + 1), fontsize=10, fontname=fuente)
+        pagina.insert_link({"kind": pymupdf.LINK_GOTO, "page": destino,
+                            "from": pymupdf.Rect(x, y - 12, A4.width - 56, y + 4)})
+
+
+def build_bundle(documentos, titulo="Paquete de turno", leer=read_document):
+    """PDF único con índice y marcadores a partir de filas de core.archive.
+
+    documentos: dicts con sha256, form, fecha, archivo, trabajador, ...
+    Devuelve los bytes del paquete.
+    """
+    documentos = sorted(documentos, key=_orden)
+    n_entradas = len(documentos) + len({d["form"] for d in documentos})
+    n_indice = max(1, -(-n_entradas // TOC_LINEAS_POR_PAGINA))
+
+    out = pymupdf.open()
+    for _ in range(n_indice):
+        out.new_page(width=A4.width, height=A4.height)
+
+    toc = [[1, "Índice", 1]]
+    entradas = []
+    form_actual = None
+    for doc in documentos:
+        with pymupdf.open(stream=leer(doc["sha256"]), filetype="pdf") as src:
+            inicio = out.page_count
+            out.insert_pdf(src, links=True, annots=True)
+        if doc["form"] != form_actual:
+            form_actual = doc["form"]
+            toc.append([1, form_label(form_actual), inicio + 1])
+            entradas.append((1, form_label(form_actual), inicio))
+        texto = f"{doc['fecha']} · {_descripcion(doc)}"
+        toc.append([2, texto, inicio + 1])
+        entradas.append((2, texto, inicio))
+
+    _escribir_indice(out, titulo, entradas)
+    out.set_toc(toc)
+    out.set_metadata({"title": titulo, "producer": "Sistema Digital RMC"})
+    # garbage=4 fusiona objetos con el mismo contenido (logo, fuentes
+    # idénticas); deflate recomprime los streams sin comprimir
+    datos = out.tobytes(garbage=4, deflate=True, use_objstms=1)
+    out.close()
+    return datos
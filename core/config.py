@@ -0,0 +1,17 @@
+import os
+
+# --- RUTAS DEL PROYECTO ---
+# core/ vive en la raíz, así que subimos un nivel
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(ROOT_DIR, "assets")
+TEMPLATES_DIR = os.path.join(ROOT_DIR, "templates")
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+LOGO_PATH = os.path.join(ASSETS_DIR, "logo.png")
+
+# Caché local (variantes de imágenes, plantillas compiladas, etc.).
+# Se puede mover con la variable de entorno RMC_CACHE_DIR.
+CACHE_DIR = os.environ.get("RMC_CACHE_DIR", os.path.join(ROOT_DIR, ".cache"))
+
+# Datos locales que no se pueden regenerar (registro de entregas, etc.).
+# Se puede mover con la variable de entorno RMC_STATE_DIR.
+STATE_DIR = os.environ.get("RMC_STATE_DIR", os.path.join(ROOT_DIR, ".rmc"))
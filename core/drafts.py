@@ -0,0 +1,279 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, time as dt_time
+
+import pandas as pd
+
+from core.config import STATE_DIR
+
+# --- BORRADORES DE FORMULARIOS ---
+# Lo que se va escribiendo en un formulario se guarda como cambios
+# incrementales: uno por campo (fila NULL) o por fila de tabla (fila >= 0;
+# fila -1 guarda la cantidad de filas). record() solo deja el cambio en
+# memoria; un hilo los escribe agrupados cada DEBOUNCE segundos, así que
+# guardar en cada edición no agrega latencia a la página.
+
+DRAFTS_DB = os.path.join(STATE_DIR, "borradores.db")
+DEBOUNCE = float(os.environ.get("RMC_DRAFT_DEBOUNCE", 1.0))
+DRAFT_TTL = float(os.environ.get("RMC_DRAFT_TTL", 7 * 24 * 3600))
+COMPACT_EVERY = 10 * 60  # segundos entre compactaciones
+COMPACT_MIN = 50         # cambios de un borrador a partir de los cuales se compacta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS borradores (
+    id TEXT PRIMARY KEY,
+    form TEXT NOT NULL,
+    resumen TEXT NOT NULL DEFAULT '',
+    creado REAL NOT NULL,
+    actualizado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_borradores_form ON borradores (form, actualizado);
+CREATE TABLE IF NOT EXISTS cambios (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    borrador TEXT NOT NULL,
+    campo TEXT NOT NULL,
+    fila INTEGER,
+    valor TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cambios_borrador ON cambios (borrador, campo, fila, seq);
+"""
+
+CAMPO = None   # fila de un cambio de campo simple
+CONTEO = -1    # fila que guarda la cantidad de filas de una tabla
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(DRAFTS_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def new_draft_id():
+    return uuid.uuid4().hex[:10]
+
+
+# --- ESCRITURA CON DEBOUNCE ---
+
+_lock = threading.Lock()
+_escritura = threading.Lock()  # un flush() o un discard() a la vez
+_pendientes = {}  # borrador -> {"form", "resumen", "cambios": {(campo, fila): valor}}
+_despertar = threading.Event()
+_writer = None
+
+
+def record(draft_id, form, cambios, resumen=None):
+    """Deja los cambios [(campo, fila, valor)] para el próximo guardado.
+
+    Cambios repetidos de un mismo campo/fila se fusionan: solo se escribe
+    el último valor.
+    """
+    with _lock:
+        pendiente = _pendientes.setdefault(draft_id, {"form": form, "resumen": None, "cambios": {}})
+        for campo, fila, valor in cambios:
+            pendiente["cambios"][(campo, fila)] = valor
+        if resumen is not None:
+            pendiente["resumen"] = resumen
+    start_writer()
+
+
+def _escribir(lote):
+    ahora = time.time()
+    n = 0
+    with _connect() as conn:
+        for draft_id, pendiente in lote.items():
+            conn.execute(
+                "INSERT INTO borradores (id, form, resumen, creado, actualizado) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET actualizado = excluded.actualizado,"
+                " resumen = CASE WHEN ? IS NULL THEN borradores.resumen ELSE excluded.resumen END",
+                (draft_id, pendiente["form"], pendiente["resumen"] or "", ahora, ahora, pendiente["resumen"]),
+            )
+            filas = [(draft_id, campo, fila, json.dumps(valor, ensure_ascii=False, default=str))
+                     for (campo, fila), valor in pendiente["cambios"].items()]
+            conn.executemany("INSERT INTO cambios (borrador, campo, fila, valor) VALUES (?, ?, ?, ?)", filas)
+            n += len(filas)
+    return n
+
+
+def flush():
+    """Escribe todo lo pendiente en una sola transacción.
+
+    Si SQLite falla, los cambios vuelven a quedar pendientes (debajo de los
+    que hayan llegado mientras tanto) y se reintentan en la próxima vuelta.
+    """
+    with _escritura:
+        with _lock:
+            lote = dict(_pendientes)
+            _pendientes.clear()
+        if not lote:
+            return 0
+        try:
+            return _escribir(lote)
+        except sqlite3.Error:
+            with _lock:
+                for draft_id, anterior in lote.items():
+                    nuevo = _pendientes.get(draft_id)
+                    if nuevo is not None:
+                        anterior["cambios"].update(nuevo["cambios"])
+                        anterior["resumen"] = nuevo["resumen"] or anterior["resumen"]
+                    _pendientes[draft_id] = anterior
+            raise
+
+
+atexit.register(lambda: _pendientes and flush())
+
+
+class DraftWriter(threading.Thread):
+
+    def __init__(self):
+        super().__init__(name="rmc-borradores", daemon=True)
+        self._ultima_compactacion = 0.0
+
+    def run(self):
+        while True:
+            _despertar.wait(COMPACT_EVERY)
+            time.sleep(DEBOUNCE)  # Agrupa las ediciones que llegan seguidas
+            _despertar.clear()
+            try:
+                flush()
+                if time.time() - self._ultima_compactacion > COMPACT_EVERY:
+                    self._ultima_compactacion = time.time()
+                    compact_and_expire()
+            except sqlite3.Error:
+                pass  # flush() dejó los cambios pendientes; se reintenta en la próxima vuelta
+
+
+def start_writer():
+    global _writer
+    _despertar.set()
+    if _writer is None or not _writer.is_alive():
+        with _lock:
+            if _writer is None or not _writer.is_alive():
+                _writer = DraftWriter()
+                _writer.start()
+
+
+# --- LECTURA ---
+
+def load(draft_id):
+    """Estado del borrador: {"form", "campos": {campo: valor}, "tablas": {tabla: [filas]}}.
+
+    Los cambios pendientes en memoria se escriben antes de leer.
+    """
+    flush()
+    with _connect() as conn:
+        borrador = conn.execute("SELECT form FROM borradores WHERE id = ?", (draft_id,)).fetchone()
+        if borrador is None:
+            return None
+        ultimos = conn.execute(
+            "SELECT c.campo, c.fila, c.valor FROM cambios c"
+            " JOIN (SELECT campo, fila, MAX(seq) AS seq FROM cambios WHERE borrador = ?"
+            "       GROUP BY campo, fila) u ON c.seq = u.seq",
+            (draft_id,),
+        ).fetchall()
+
+    campos, filas_tabla, conteos = {}, {}, {}
+    for campo, fila, valor in ultimos:
+        valor = json.loads(valor)
+        if fila is None:
+            campos[campo] = valor
+        elif fila == CONTEO:
+            conteos[campo] = valor
+        else:
+            filas_tabla.setdefault(campo, {})[fila] = valor
+    tablas = {
+        tabla: [filas_tabla.get(tabla, {}).get(i) or {} for i in range(n)]
+        for tabla, n in conteos.items()
+    }
+    return {"form": borrador[0], "campos": campos, "tablas": tablas}
+
+
+def recent(form, limit=10):
+    """Borradores más recientes del formulario: [(id, resumen, actualizado)]."""
+    with _connect() as conn:
+        return conn.execute(
+            "SELECT id, resumen, actualizado FROM borradores WHERE form = ? ORDER BY actualizado DESC LIMIT ?",
+            (form, limit),
+        ).fetchall()
+
+
+def discard(draft_id):
+    # Espera al flush() en curso (que ya pudo sacar los cambios de este
+    # borrador de _pendientes) para que no lo vuelva a escribir después
+    with _escritura:
+        with _lock:
+            _pendientes.pop(draft_id, None)
+        with _connect() as conn:
+            conn.execute("DELETE FROM cambios WHERE borrador = ?", (draft_id,))
+            conn.execute("DELETE FROM borradores WHERE id = ?", (draft_id,))
+
+
+# --- COMPACTACIÓN Y VENCIMIENTO ---
+
+def compact_and_expire(now=None):
+    """Borra los borradores sin cambios hace más de DRAFT_TTL y, en los
+    demás, los cambios que ya fueron reemplazados por uno posterior."""
+    now = time.time() if now is None else now
+    with _connect() as conn:
+        vencidos = [r[0] for r in conn.execute(
+            "SELECT id FROM borradores WHERE actualizado < ?", (now - DRAFT_TTL,))]
+        conn.executemany("DELETE FROM cambios WHERE borrador = ?", [(v,) for v in vencidos])
+        conn.executemany("DELETE FROM borradores WHERE id = ?", [(v,) for v in vencidos])
+
+        largos = [r[0] for r in conn.execute(
+            "SELECT borrador FROM cambios GROUP BY borrador HAVING COUNT(*) >= ?", (COMPACT_MIN,))]
+        for draft_id in largos:
+            conn.execute(
+                "DELETE FROM cambios WHERE borrador = ? AND seq NOT IN"
+                " (SELECT MAX(seq) FROM cambios WHERE borrador = ? GROUP BY campo, fila)",
+                (draft_id, draft_id),
+            )
+    return len(vencidos), len(largos)
+
+
+# --- VALORES ---
+# Conversión entre los valores de los widgets y lo que se guarda en JSON.
+
+def encode_value(tipo, valor):
+    if tipo in ("fecha", "hora") and valor is not None:
+        return valor.isoformat()
+    return valor
+
+
+def decode_value(tipo, valor):
+    if valor is None:
+        return None
+    if tipo == "fecha":
+        return date.fromisoformat(valor)
+    if tipo == "hora":
+        return dt_time.fromisoformat(valor)
+    return valor
+
+
+def row_hashes(df):
+    """Huella de cada fila (sin el índice), calculada de una vez para toda la tabla."""
+    return pd.util.hash_pandas_object(df, index=False).tolist()
+
+
+def encode_row(df, i):
+    return json.loads(df.iloc[[i]].to_json(orient="records"))[0]
+
+
+def table_frame(inicial, filas):
+    """DataFrame con las filas guardadas y las columnas/tipos de la tabla inicial."""
+    df = pd.DataFrame(filas, columns=inicial.columns)
+    if len(df) == len(inicial):
+        df.index = inicial.index
+    for columna, dtype in inicial.dtypes.items():
+        try:
+            df[columna] = df[columna].astype(dtype)
+        except (TypeError, ValueError):
+            pass  # Celdas vacías en una columna numérica: se deja como objeto
+    return df
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from urllib.request import url2pathname
+
+from weasyprint.urls import URLFetcher, URLFetcherResponse, path2url
+
+from core.config import ASSETS_DIR, CACHE_DIR, TEMPLATES_DIR
+from core.photos import PHOTOS_DIR
+
+# Caché en disco de recursos remotos (fuentes, imágenes, CSS)
+FETCH_CACHE_DIR = os.path.join(CACHE_DIR, "fetch")
+
+# URLs remotas que ya tenemos empaquetadas en assets/: nunca salen a la red
+LOCAL_ALIASES = {
+    "https://fonts.googleapis.com/css2?family=Roboto:wght@400;700&display=swap":
+        path2url(os.path.join(ASSETS_DIR, "fonts", "roboto.css")),
+}
+
+# Carpetas que puede leer un render con solo_propios (contextos que llegan
+# de fuera de la app, p. ej. core.api)
+RAICES_PROPIAS = (ASSETS_DIR, TEMPLATES_DIR)
+
+MIME_BY_EXT = {
+    ".css": "text/css", ".ttf": "font/ttf", ".otf": "font/otf", ".woff": "font/woff",
+    ".woff2": "font/woff2", ".png": "image/png", ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg", ".svg": "image/svg+xml", ".gif": "image/gif",
+}
+
+_lock = threading.Lock()
+_memoria = {}  # clave -> (url_final, content_type, bytes)
+
+
+def _ruta_local(url):
+    return url2pathname(url.split("?")[0].removeprefix("file:"))
+
+
+def _es_propio(url):
+    path = os.path.realpath(_ruta_local(url))
+    return any(path.startswith(os.path.realpath(raiz) + os.sep) for raiz in RAICES_PROPIAS)
+
+
+def _leer_local(url):
+    path = _ruta_local(url)
+    if os.path.abspath(path).startswith(os.path.abspath(PHOTOS_DIR) + os.sep):
+        # Fotos de evidencia: se usan en un solo documento, no se guardan en memoria
+        with open(path, "rb") as f:
+            return url, "image/jpeg", f.read()
+    st = os.stat(path)
+    # La clave incluye el mtime: si el archivo cambia, se vuelve a leer
+    key = f"{url}|{st.st_mtime_ns}"
+    entry = _memoria.get(key)
+    if entry is None:
+        with open(path, "rb") as f:
+            data = f.read()
+        mime = MIME_BY_EXT.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+        entry = (url, mime, data)
+        _memoria[key] = entry
+    return entry
+
+
+def _rutas_disco(url):
+    nombre = hashlib.sha256(url.encode()).hexdigest()
+    base = os.path.join(FETCH_CACHE_DIR, nombre)
+    return f"{base}.bin", f"{base}.json"
+
+
+def _leer_disco(url):
+    data_path, meta_path = _rutas_disco(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(data_path, "rb") as f:
+            return meta["url"], meta["content_type"], f.read()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _guardar_disco(url, entry):
+    data_path, meta_path = _rutas_disco(url)
+    try:
+        os.makedirs(FETCH_CACHE_DIR, exist_ok=True)
+        with open(data_path, "wb") as f:
+            f.write(entry[2])
+        # El .json se escribe al final: marca la entrada como completa
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"url": entry[0], "content_type": entry[1]}, f)
+    except OSError:
+        pass
+
+
+class CachedURLFetcher(URLFetcher):
+    """URL fetcher de WeasyPrint con caché en memoria y en disco.
+
+    Los archivos locales se leen una vez por mtime; las URLs remotas se
+    descargan como máximo una vez y luego se sirven desde .cache/fetch.
+    Con offline=True nunca se sale a la red. Con solo_propios=True además
+    solo se leen archivos de assets/ y templates/: el HTML puede traer
+    rutas o URLs del contexto (Jinja no escapa) y no deben llegar a otros
+    archivos del servidor ni a la red interna.
+    """
+
+    def __init__(self, offline=False, solo_propios=False, **kwargs):
+        super().__init__(**kwargs)
+        self.offline = offline or solo_propios
+        self.solo_propios = solo_propios
+
+    def fetch(self, url, headers=None):
+        if url.startswith("data:"):
+            return super().fetch(url, headers)
+
+        url = LOCAL_ALIASES.get(url, url)
+        if self.solo_propios and not (url.startswith("file:") and _es_propio(url)):
+            raise ValueError(f"Recurso no permitido: {url}")
+        if url.startswith("file:"):
+            final_url, mime, data = _leer_local(url)
+        else:
+            entry = _memoria.get(url) or _leer_disco(url)
+            if entry is None:
+                with _lock:
+                    entry = _memoria.get(url) or _leer_disco(url)
+                    if entry is None:
+                        if self.offline:
+                            raise ValueError(f"Recurso remoto no disponible sin conexión: {url}")
+                        response = super().fetch(url, headers)
+                        try:
+                            entry = (response.url, response.content_type, response.read())
+                        finally:
+                            response.close()
+                        _guardar_disco(url, entry)
+            _memoria[url] = entry
+            final_url, mime, data = entry
+
+        return URLFetcherResponse(final_url, data, {"Content-Type": mime})
+
+
+def get_url_fetcher(offline=False, solo_propios=False):
+    # Instancia nueva por render (URLFetcher guarda estado de la petición);
+    # la caché es del módulo y se comparte entre todas.
+    return CachedURLFetcher(offline=offline, solo_propios=solo_propios)
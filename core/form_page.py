@@ -0,0 +1,507 @@
+import base64
+from contextlib import nullcontext
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import streamlit as st
+
+from core import drafts
+from core.jobs import ERROR, LISTO, job_info, job_result, start_warmup, submit_render
+from core.memo import context_key, deliver_once
+from core.metrics import Traza
+from core.photos import FORMATOS, MAX_FOTOS_ITEM, ingest_many, thumbnail
+from core.preview import PAGE_PX, cached_page, page_thumbnail, preview_html
+from core.schema import (analytics_rows, archive_record, build_context, fields, file_name, initial_frame, load_schema,
+                         missing_fields, photo_rows)
+from core.signatures import process_signature
+from core.ui import pdf_job, queue_email, rerun_end, rerun_start, start_pdf_job, storage_settings, timed_fragment
+
+# Página genérica: dibuja cualquier esquema de schemas/ (ver core.schema).
+# Cada sección del esquema es un fragmento, así que editar un campo solo
+# vuelve a ejecutar su sección. Los valores quedan en session_state con
+# claves "<form>.<campo>"; las claves "<form>._..." son internas (borrador,
+# vista previa).
+
+MENSAJES = {
+    "listo": "✅ PDF generado correctamente.",
+    "enviando": "Enviando documento...",
+    "enviado": "✅ Documento en cola de envío.",
+    "repetido": "ℹ️ Este documento ya había sido enviado; no se envía de nuevo.",
+    "error_envio": "⚠️ El PDF se generó, pero no se pudo enviar por correo. (Verifica los Secrets)",
+    "archivado": "✅ PDF generado y enviado al archivo documental.",
+}
+
+PREVIEW_HEIGHT = 700
+
+_configs = {}  # (form, tabla, mtime) -> column_config
+_SIN_GUARDAR = object()
+
+
+def _clave(esquema, nombre):
+    return f"{esquema['id']}.{nombre}"
+
+
+def _column_config(esquema, tabla):
+    clave = (esquema["id"], tabla["nombre"], esquema["_mtime"])
+    config = _configs.get(clave)
+    if config is None:
+        config = {}
+        for c in tabla["columnas"]:
+            titulo, tipo = c.get("titulo", c["nombre"]), c.get("tipo", "texto")
+            opciones = dict(width=c.get("ancho"), disabled=c.get("bloqueada", False))
+            if tipo == "opciones":
+                config[c["nombre"]] = st.column_config.SelectboxColumn(
+                    titulo, options=c["opciones"], required=c.get("requerido", False), **opciones)
+            elif tipo == "booleano":
+                config[c["nombre"]] = st.column_config.CheckboxColumn(titulo, default=False, **opciones)
+            elif tipo == "numero":
+                config[c["nombre"]] = st.column_config.NumberColumn(titulo, min_value=0, step=1, **opciones)
+            else:
+                config[c["nombre"]] = st.column_config.TextColumn(titulo, **opciones)
+        _configs[clave] = config
+    return config
+
+
+# --- DIBUJO DE ELEMENTOS ---
+
+def _dibujar(esquema, e):
+    tipo = e["tipo"]
+    key = _clave(esquema, e.get("nombre", ""))
+    etiqueta = e.get("etiqueta", "")
+    v = st.session_state
+    # Si el valor ya está en session_state (p. ej. un borrador reanudado)
+    # no se pasa valor inicial, para que Streamlit no avise del conflicto.
+    # Fechas y horas ponen su valor inicial en session_state antes del
+    # widget y le pasan None: así el widget se puede dejar vacío
+    en_estado = key in v
+    version = v.get(_clave(esquema, "_version"), 0)
+    key_editor = f"{key}#{version}" if version else key
+    if tipo == "fila":
+        columnas = st.columns(e.get("anchos") or len(e["elementos"]))
+        for col, hijo in zip(columnas, e["elementos"]):
+            with col:
+                _dibujar(esquema, hijo)
+    elif tipo == "columna":
+        for hijo in e["elementos"]:
+            _dibujar(esquema, hijo)
+    elif tipo == "texto":
+        st.text_input(etiqueta, "" if en_estado else e.get("valor", ""), placeholder=e.get("placeholder"), key=key)
+    elif tipo == "area":
+        st.text_area(etiqueta, "" if en_estado else e.get("valor", ""), key=key)
+    elif tipo == "fecha":
+        if not en_estado:
+            v[key] = date.today()
+        st.date_input(etiqueta, None, key=key)
+    elif tipo == "hora":
+        if not en_estado:
+            v[key] = datetime.strptime(e.get("valor", "08:00"), "%H:%M").time()
+        st.time_input(etiqueta, None, key=key)
+    elif tipo == "marcas":
+        st.multiselect(etiqueta, e["opciones"], key=key)
+    elif tipo == "tabla":
+        if e.get("ayuda"):
+            st.info(e["ayuda"])
+        v[f"{key}.df"] = st.data_editor(
+            v.get(f"{key}.inicial", initial_frame(esquema, e)), column_config=_column_config(esquema, e),
+            num_rows="dynamic" if e.get("dinamica") else "fixed",
+            hide_index=e.get("ocultar_indice", False), use_container_width=True, key=key_editor,
+        )
+        if e.get("fotos"):
+            _fotos_tabla(e, key, v[f"{key}.df"])
+    elif tipo == "firma":
+        # El componente del canvas se importa al dibujar la primera firma
+        from streamlit_drawable_canvas import st_canvas
+
+        if etiqueta:
+            st.write(etiqueta)
+        v[f"{key}.canvas"] = st_canvas(
+            stroke_width=e.get("trazo", 2), stroke_color=e.get("color", "#000"),
+            background_color=e.get("fondo", "#ffffff"), height=e.get("alto", 100), width=e.get("ancho", 300),
+            drawing_mode="freedraw", initial_drawing=v.get(f"{key}.inicial"), key=key_editor,
+        )
+    elif tipo == "subtitulo":
+        st.subheader(e["texto"])
+    elif tipo == "markdown":
+        st.markdown(e["texto"])
+    elif tipo == "info":
+        st.info(e["texto"])
+    elif tipo == "separador":
+        st.divider()
+    else:
+        raise ValueError(f"Tipo de elemento desconocido: {tipo}")
+
+
+def _fotos_tabla(tabla, key, df):
+    # Un uploader por fila rechazada. Cada foto nueva pasa por core.photos
+    # (en paralelo) una sola vez: se recuerda el sha por file_id
+    v = st.session_state
+    fotos = v.setdefault(f"{key}.fotos", {})       # fila -> [sha]
+    procesadas = v.setdefault(f"{key}.subidas", {})  # file_id -> sha
+    filas = photo_rows(tabla, df)
+    if not filas:
+        return
+    spec = tabla["fotos"]
+    st.caption(spec.get("ayuda", f"📷 Fotos de los ítems rechazados (hasta {MAX_FOTOS_ITEM} por ítem)"))
+    for i in filas:
+        etiqueta = df[spec["etiqueta"]].iloc[i] if spec.get("etiqueta") in df else f"Fila {i + 1}"
+        archivos = st.file_uploader(f"📷 {etiqueta}", type=FORMATOS, accept_multiple_files=True,
+                                    key=f"{key}.foto.{i}")
+        nuevos = [a for a in archivos if a.file_id not in procesadas]
+        if nuevos:
+            with st.spinner("Procesando fotos..."):
+                for archivo, (sha, error) in zip(nuevos, ingest_many(nuevos)):
+                    if error:
+                        st.warning(f"⚠️ {archivo.name}: no se pudo leer la imagen ({error})")
+                    else:
+                        procesadas[archivo.file_id] = sha
+        if archivos:
+            fotos[i] = [procesadas[a.file_id] for a in archivos if a.file_id in procesadas]
+            if len(fotos[i]) > MAX_FOTOS_ITEM:
+                st.warning(f"⚠️ Se incluyen solo las primeras {MAX_FOTOS_ITEM} fotos de este ítem.")
+        elif fotos.get(i) and set(fotos[i]) <= set(procesadas.values()):
+            del fotos[i]  # Se quitaron del uploader todas las fotos subidas en esta sesión
+        if fotos.get(i):
+            # Miniaturas (también las de un borrador reanudado, que no están en el uploader)
+            st.image([thumbnail(sha) for sha in fotos[i][:MAX_FOTOS_ITEM]], width=90)
+
+
+def _dibujar_bloque(esquema, page, nombre, elementos):
+    @timed_fragment(page, esquema["id"], nombre)
+    def bloque():
+        for e in elementos:
+            _dibujar(esquema, e)
+        _autoguardar(esquema, nombre, elementos)
+    bloque()
+
+
+def _dibujar_formulario(esquema, page):
+    # Las secciones van en expanders; los elementos sueltos consecutivos se
+    # agrupan en un solo fragmento
+    sueltos = []
+    for i, e in enumerate(esquema["elementos"] + [None]):
+        if e is not None and e["tipo"] != "seccion":
+            sueltos.append(e)
+            continue
+        if sueltos:
+            _dibujar_bloque(esquema, page, f"bloque{i}", sueltos)
+            sueltos = []
+        if e is not None:
+            with st.expander(e["titulo"], expanded=e.get("expandida", False)):
+                _dibujar_bloque(esquema, page, e.get("nombre", e["titulo"]), e["elementos"])
+
+
+# --- BORRADORES ---
+# Al terminar de dibujarse, cada bloque compara sus valores con lo último
+# guardado y pasa a core.drafts solo los campos y filas de tabla que
+# cambiaron. El borrador se crea con la primera edición.
+
+def _cambios(esquema, campos, guardado):
+    """[(campo, fila, valor)] que difieren de guardado; actualiza guardado."""
+    v = st.session_state
+    cambios = []
+    for c in campos:
+        nombre, key = c["nombre"], _clave(esquema, c["nombre"])
+        if c["tipo"] == "tabla":
+            df = v.get(f"{key}.df")
+            if df is None:
+                continue
+            for i, huella in enumerate(drafts.row_hashes(df)):
+                if guardado.get((nombre, i)) != huella:
+                    guardado[(nombre, i)] = huella
+                    cambios.append((nombre, i, drafts.encode_row(df, i)))
+            if guardado.get((nombre, drafts.CONTEO)) != len(df):
+                guardado[(nombre, drafts.CONTEO)] = len(df)
+                cambios.append((nombre, drafts.CONTEO, len(df)))
+            fotos = {str(i): shas for i, shas in v.get(f"{key}.fotos", {}).items()}
+            if guardado.get((f"{nombre}.fotos", None), {}) != fotos:
+                guardado[(f"{nombre}.fotos", None)] = fotos
+                cambios.append((f"{nombre}.fotos", None, fotos))
+        elif c["tipo"] == "firma":
+            trazos = getattr(v.get(f"{key}.canvas"), "json_data", None)
+            if not trazos or not trazos.get("objects"):
+                continue  # Canvas vacío o todavía sin cargar: se conserva lo guardado
+            huella = len(trazos["objects"]), hash(str(trazos["objects"][-1]))
+            if guardado.get((nombre, None)) != huella:
+                guardado[(nombre, None)] = huella
+                cambios.append((nombre, None, trazos))
+        elif key in v:
+            valor = drafts.encode_value(c["tipo"], v[key])
+            if guardado.get((nombre, None), _SIN_GUARDAR) != valor:
+                guardado[(nombre, None)] = valor
+                cambios.append((nombre, None, valor))
+    return cambios
+
+
+def _resumen(esquema):
+    v = st.session_state
+    textos = [v.get(_clave(esquema, c["nombre"])) for c in fields(esquema, "texto")]
+    return " · ".join(t for t in textos if t)[:80]
+
+
+def _autoguardar(esquema, bloque, elementos):
+    v = st.session_state
+    guardado = v.setdefault(_clave(esquema, "_guardado"), {})
+    base = v.setdefault(_clave(esquema, "_base"), set())
+    cambios = _cambios(esquema, fields({"elementos": elementos}), guardado)
+    if bloque not in base:
+        base.add(bloque)  # Primera vez que se dibuja: son los valores iniciales
+        return
+    if not cambios:
+        return
+
+    draft_id = v.get(_clave(esquema, "_borrador"))
+    if draft_id is None:
+        # Borrador nuevo: la primera escritura lleva el formulario completo
+        draft_id = drafts.new_draft_id()
+        v[_clave(esquema, "_borrador")] = v[_clave(esquema, "_pedido")] = draft_id
+        st.query_params["borrador"] = draft_id
+        guardado = v[_clave(esquema, "_guardado")] = {}
+        cambios = _cambios(esquema, fields(esquema), guardado)
+    drafts.record(draft_id, esquema["id"], cambios, resumen=_resumen(esquema))
+
+
+def _restaurar(esquema, draft_id):
+    datos = drafts.load(draft_id)
+    if datos is None or datos["form"] != esquema["id"]:
+        st.warning(f"⚠️ El borrador {draft_id} no existe, venció o es de otro formulario.")
+        return
+    v = st.session_state
+    for c in fields(esquema):
+        nombre, key = c["nombre"], _clave(esquema, c["nombre"])
+        if c["tipo"] == "tabla":
+            if nombre in datos["tablas"]:
+                v[f"{key}.inicial"] = drafts.table_frame(initial_frame(esquema, c), datos["tablas"][nombre])
+            if datos["campos"].get(f"{nombre}.fotos"):
+                v[f"{key}.fotos"] = {int(i): shas for i, shas in datos["campos"][f"{nombre}.fotos"].items()}
+        elif c["tipo"] == "firma":
+            if datos["campos"].get(nombre):
+                v[f"{key}.inicial"] = datos["campos"][nombre]
+        elif nombre in datos["campos"]:
+            v[key] = drafts.decode_value(c["tipo"], datos["campos"][nombre])
+    # Tablas y canvas se vuelven a crear con otra key para que tomen los datos
+    v[_clave(esquema, "_version")] = v.get(_clave(esquema, "_version"), 0) + 1
+    v[_clave(esquema, "_borrador")] = draft_id
+    v[_clave(esquema, "_guardado")] = {}
+    v[_clave(esquema, "_base")] = set()
+    st.query_params["borrador"] = draft_id
+    st.toast(f"💾 Borrador {draft_id} reanudado")
+
+
+def _panel_borradores(esquema):
+    v = st.session_state
+    # ?borrador=<id> reanuda en cualquier página del formulario
+    pedido = v.pop(_clave(esquema, "_reanudar"), None)
+    if pedido is None and st.query_params.get("borrador") != v.get(_clave(esquema, "_pedido")):
+        pedido = v[_clave(esquema, "_pedido")] = st.query_params.get("borrador")
+    if pedido and pedido != v.get(_clave(esquema, "_borrador")):
+        _restaurar(esquema, pedido)
+
+    actual = v.get(_clave(esquema, "_borrador"))
+    with st.expander(f"💾 Borrador {actual}" if actual else "💾 Borradores"):
+        st.caption("Lo que escribes se guarda solo mientras editas. Con el ID (o el enlace de esta página) "
+                   "puedes retomarlo después, también desde otro equipo.")
+        recientes = {
+            f"{r[0]} · {r[1] or 'sin datos'} · {datetime.fromtimestamp(r[2]):%d/%m %H:%M}": r[0]
+            for r in drafts.recent(esquema["id"]) if r[0] != actual
+        }
+        c1, c2 = st.columns([3, 1])
+        elegido = c1.selectbox("Borradores recientes", list(recientes), index=None, placeholder="Elegir...")
+        escrito = c1.text_input("o ID de borrador").strip()
+        destino = escrito or recientes.get(elegido)
+        if c2.button("Reanudar", disabled=not destino):
+            v[_clave(esquema, "_reanudar")] = destino
+            st.rerun()
+
+
+def _cerrar_borrador(esquema):
+    # Con el PDF ya generado el borrador no hace falta; si se sigue
+    # editando, la próxima edición crea uno nuevo
+    v = st.session_state
+    draft_id = v.pop(_clave(esquema, "_borrador"), None)
+    if draft_id:
+        drafts.discard(draft_id)
+        if st.query_params.get("borrador") == draft_id:
+            del st.query_params["borrador"]
+
+
+# --- GENERACIÓN Y ENVÍO ---
+
+def _firma(esquema, campo):
+    key = _clave(esquema, campo["nombre"])
+    firma = process_signature(st.session_state.get(f"{key}.canvas"))
+    inicial = st.session_state.get(f"{key}.inicial")
+    if firma is None and inicial:
+        # Firma de un borrador reanudado que el canvas todavía no devolvió
+        firma = process_signature(SimpleNamespace(json_data=inicial, image_data=None))
+    return firma
+
+
+def _valores(esquema):
+    v = st.session_state
+    return {c["nombre"]: v.get(_clave(esquema, c["nombre"])) for c in fields(esquema)
+            if c["tipo"] not in ("tabla", "firma")}
+
+
+def _contexto(esquema, valores, traza=None):
+    v = st.session_state
+    with traza.etapa("firma") if traza else nullcontext():
+        firmas = {c["nombre"]: _firma(esquema, c) for c in fields(esquema, "firma")}
+    tablas = {c["nombre"]: v[f"{_clave(esquema, c['nombre'])}.df"] for c in fields(esquema, "tabla")}
+    fotos = {c["nombre"]: v.get(f"{_clave(esquema, c['nombre'])}.fotos", {}) for c in fields(esquema, "tabla")}
+    return build_context(esquema, valores, tablas, firmas, fotos)
+
+
+def _generar(esquema, page):
+    valores = _valores(esquema)
+    faltan = missing_fields(esquema, valores)
+    if faltan:
+        st.error(f"⚠️ Por favor completa: {', '.join(faltan)}.")
+        return
+
+    traza = Traza(page, esquema["id"])
+    contexto = _contexto(esquema, valores, traza)
+
+    correo = esquema.get("correo")
+    meta = {}
+    if correo:
+        datos = dict(valores, hoy=date.today())
+        meta["correo"] = (correo["asunto"].format(**datos), correo["cuerpo"].format(**datos))
+    start_pdf_job(f"job_{esquema['id']}", esquema["template"], contexto, traza=traza,
+                  filename=file_name(esquema, valores),
+                  registro=archive_record(esquema, valores, contexto),
+                  analitica=analytics_rows(esquema, valores, contexto), **meta)
+
+
+def _resultado(esquema):
+    mensajes = dict(MENSAJES, **esquema.get("mensajes", {}))
+    resultado = pdf_job(f"job_{esquema['id']}")
+    if not resultado:
+        return
+    pdf_bytes, meta, nuevo = resultado
+    if nuevo:
+        _cerrar_borrador(esquema)
+
+    # Con un destino que reemplaza al correo (core.sinks) y la subida ya
+    # encolada por pdf_job no se manda el mail para el robot. Si la subida
+    # no se pudo encolar, el documento sale por correo como siempre
+    destino = storage_settings()
+    if destino and destino.get("reemplaza_correo") and meta.get("destino"):
+        st.success(mensajes["archivado"])
+    # Se envía solo la primera vez que llega el PDF y si no se envió antes uno idéntico
+    elif "correo" in meta:
+        if nuevo:
+            asunto, cuerpo = meta["correo"]
+            with st.spinner(mensajes["enviando"]):
+                enviado = deliver_once(
+                    meta["clave"],
+                    lambda: queue_email(pdf_bytes, meta["filename"], asunto, cuerpo, key=meta["clave"]),
+                    meta["filename"],
+                )
+            if enviado is None:
+                st.info(mensajes["repetido"])
+            elif enviado:
+                st.success(mensajes["enviado"])
+                st.balloons()
+            else:
+                st.warning(mensajes["error_envio"])
+    else:
+        st.success(mensajes["listo"])
+
+    descarga = esquema.get("descarga", {})
+    st.download_button(descarga.get("etiqueta", "⬇️ Descargar PDF"), pdf_bytes,
+                       file_name=descarga.get("archivo", meta["filename"]), mime="application/pdf")
+
+
+# --- VISTA PREVIA ---
+# Muestra la plantilla como HTML mientras se edita (sin WeasyPrint). El
+# HTML viaja al navegador solo al abrir la vista previa, en un rerun
+# completo o con "Actualizar" (no en cada edición: las secciones son
+# fragmentos propios), y se vuelve a armar únicamente si cambió el
+# contenido. La miniatura de la primera página es un render normal: si
+# después se genera el PDF con el mismo contenido, sale de la caché.
+
+def _vista_previa(esquema):
+    if not st.toggle("👁️ Vista previa", key=_clave(esquema, "_vista")):
+        return
+
+    @st.fragment
+    def panel():
+        v = st.session_state
+        # El botón solo vuelve a ejecutar este fragmento
+        st.button("🔄 Actualizar vista previa", key=_clave(esquema, "_actualizar"))
+        try:
+            contexto = _contexto(esquema, _valores(esquema))
+            clave = context_key(esquema["template"], contexto)
+            anterior = v.get(_clave(esquema, "_preview"))
+            if anterior is None or anterior[0] != clave:
+                anterior = (clave, preview_html(esquema["template"], contexto))
+                v[_clave(esquema, "_preview")] = anterior
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            st.caption(f"Vista previa no disponible todavía: {e}")
+            return
+        # Como data: URL el iframe queda con origen propio: lo que se escribió
+        # en el formulario no puede tocar la página de la app
+        html = base64.b64encode(anterior[1].encode("utf-8")).decode("ascii")
+        st.iframe(f"data:text/html;charset=utf-8;base64,{html}", height=PREVIEW_HEIGHT)
+        _miniatura(esquema, clave, contexto)
+
+    panel()
+
+
+def _miniatura(esquema, clave, contexto):
+    v = st.session_state
+    png = cached_page(clave)
+    job_key = _clave(esquema, "_miniatura")
+    if png is None and not v.get(job_key):
+        if st.button("🖼️ Miniatura de la primera página", key=f"{job_key}.boton"):
+            v[job_key] = (submit_render(esquema["template"], contexto), clave)
+    if png is None and v.get(job_key):
+        job_id, clave_job = v[job_key]
+        info = job_info(job_id)
+        if info is None or info["estado"] == ERROR:
+            del v[job_key]
+            st.caption("⚠️ No se pudo generar la miniatura.")
+        elif info["estado"] == LISTO:
+            del v[job_key]
+            png = page_thumbnail(clave_job, job_result(job_id))
+            if clave_job != clave:
+                st.caption("La miniatura es de una versión anterior del formulario.")
+        else:
+            _esperar_miniatura(job_id)
+    if png is not None:
+        st.image(png, caption="Primera página (PDF)", width=PAGE_PX)
+
+
+@st.fragment(run_every=1.0)
+def _esperar_miniatura(job_id):
+    # Solo este aviso se refresca mientras espera; al terminar, un rerun
+    # completo dibuja la miniatura (y manda la vista previa una vez)
+    info = job_info(job_id)
+    if info is None or info["estado"] in (LISTO, ERROR):
+        st.rerun()
+    st.caption("⏳ Generando miniatura de la primera página...")
+
+
+def render_form(form_id, page=None, configurar=True):
+    """Dibuja el formulario del esquema schemas/<form_id>.json completo:
+    campos, tablas y firmas, botón de generación, envío y descarga."""
+    esquema = load_schema(form_id)
+    page = page or f"form_{form_id}"
+    if configurar:
+        st.set_page_config(page_title=esquema.get("titulo_pagina", esquema["titulo"]),
+                           page_icon=esquema.get("icono"), layout=esquema.get("layout", "centered"))
+    t0 = rerun_start()
+    start_warmup()
+
+    st.title(esquema["titulo"])
+    if esquema.get("codigo"):
+        st.markdown(esquema["codigo"])
+    _panel_borradores(esquema)
+
+    _dibujar_formulario(esquema, page)
+    _vista_previa(esquema)
+
+    if st.button(esquema.get("boton", "📄 Generar PDF"), type="primary"):
+        _generar(esquema, page)
+    _resultado(esquema)
+    rerun_end(page, form_id, t0)
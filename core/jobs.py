@@ -0,0 +1,277 @@
+import os
+from collections import deque
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from core.memo import context_key, pdf_cache
+from core.pools import spawn_pool
+
+# --- CONFIGURACIÓN ---
+# Procesos de render (por defecto uno por núcleo), renders admitidos a la
+# vez en el pool y tiempo que se guardan los trabajos terminados antes de
+# liberar sus bytes. Los que no entran esperan su turno en orden de
+# llegada y la página muestra su posición en la cola.
+RENDER_WORKERS = int(os.environ.get("RMC_RENDER_WORKERS", os.cpu_count() or 1))
+RENDER_SLOTS = max(1, int(os.environ.get("RMC_RENDER_SLOTS", RENDER_WORKERS)))
+JOB_TTL = float(os.environ.get("RMC_JOB_TTL", 15 * 60))
+# Con RMC_WARMUP=0 los procesos de render no se calientan al crearse
+RENDER_WARMUP = os.environ.get("RMC_WARMUP", "1") == "1"
+
+# Estados de un trabajo
+PENDIENTE = "pendiente"
+PROCESANDO = "procesando"
+LISTO = "listo"
+ERROR = "error"
+
+_lock = threading.Lock()
+_pool = None
+_jobs = {}  # job_id -> {"future", "template", "clave", "creado", "terminado"}
+_activos = 0       # renders admitidos en el pool
+_espera = deque()  # trabajos esperando turno, en orden de llegada
+_calentado = False
+
+
+def get_pool():
+    """Pool de procesos compartido por todas las sesiones del servidor."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            # Los workers no vuelven a ejecutar la página (ver core.pools)
+            _pool = spawn_pool(RENDER_WORKERS, initializer=_calentar if RENDER_WARMUP else None)
+        return _pool
+
+
+# --- CALENTAMIENTO ---
+# El primer PDF de un proceso nuevo paga la importación de WeasyPrint y la
+# inicialización de Pango/fontconfig. Cada worker lo hace al nacer (antes
+# de su primer trabajo) y start_warmup() levanta los workers al abrir la
+# app, así que tras un deploy o una suspensión el primer PDF no espera.
+
+def _calentar():
+    # Corre en cada worker nuevo. Si falla, el worker sigue: el primer render
+    # lo vuelve a intentar y muestra el error (un initializer que lanza
+    # rompería el pool)
+    try:
+        from core.render import warm_up
+
+        warm_up()
+    except Exception:
+        pass
+
+
+def _listo():
+    return os.getpid()
+
+
+def start_warmup():
+    """Crea los workers de render en segundo plano (una vez por servidor).
+
+    No bloquea: los workers se levantan y calientan mientras se carga la
+    página. Devuelve un future por worker, que termina cuando ese worker
+    ya está caliente ([] si ya se llamó antes o con RMC_WARMUP=0).
+    """
+    global _calentado
+    if _calentado or not RENDER_WARMUP:
+        return []
+    _calentado = True
+    pool = get_pool()
+    return [pool.submit(_listo) for _ in range(RENDER_WORKERS)]
+
+
+def _reset_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def purge_expired(now=None):
+    """Libera los trabajos terminados hace más de JOB_TTL segundos."""
+    now = time.time() if now is None else now
+    with _lock:
+        vencidos = [
+            job_id for job_id, job in _jobs.items()
+            if job["terminado"] is not None and now - job["terminado"] > JOB_TTL
+        ]
+        for job_id in vencidos:
+            del _jobs[job_id]
+
+
+def _render(template_name, context, solo_propios=False):
+    # Corre en el pool: devuelve el PDF y los tiempos de cada etapa del render
+    from core.render import render_pdf
+
+    url_fetcher = None
+    if solo_propios:
+        from core.fetcher import get_url_fetcher
+
+        url_fetcher = get_url_fetcher(solo_propios=True)
+    tiempos = {"inicio": time.time()}
+    pdf = render_pdf(template_name, context, url_fetcher=url_fetcher, tiempos=tiempos)
+    return pdf, tiempos
+
+
+def _marcar_terminado(job):
+    def callback(future):
+        job["terminado"] = time.time()
+        if future.exception() is None:
+            pdf_cache.put(job["clave"], future.result()[0])
+    return callback
+
+
+def _en_curso(clave):
+    # Un envío idéntico que todavía se está procesando (doble clic)
+    for job_id, job in _jobs.items():
+        if job["clave"] == clave and not job["future"].done():
+            return job_id
+    return None
+
+
+# --- CONTROL DE ADMISIÓN ---
+
+def _lanzar(job):
+    # El trabajo ya tiene turno: pasa al pool y su future queda "procesando"
+    job["future"].set_running_or_notify_cancel()
+    args = (job["template"], job.pop("context"), job["solo_propios"])
+    try:
+        try:
+            interno = get_pool().submit(_render, *args)
+        except BrokenProcessPool:
+            # Un worker murió (p. ej. sin memoria): se recrea el pool y se reintenta
+            _reset_pool()
+            interno = get_pool().submit(_render, *args)
+    except Exception as e:
+        job["future"].set_exception(e)
+        _liberar_turno()
+        return
+    interno.add_done_callback(_terminar(job))
+
+
+def _terminar(job):
+    def callback(interno):
+        # El turno pasa al siguiente antes de entregar el resultado
+        _liberar_turno()
+        if interno.cancelled():
+            job["future"].set_exception(BrokenProcessPool("El render se canceló al reiniciar el pool"))
+        elif interno.exception() is not None:
+            job["future"].set_exception(interno.exception())
+        else:
+            job["future"].set_result(interno.result())
+    return callback
+
+
+def _liberar_turno():
+    global _activos
+    with _lock:
+        siguiente = _espera.popleft() if _espera else None
+        if siguiente is None:
+            _activos -= 1
+    if siguiente is not None:
+        _lanzar(siguiente)
+
+
+def queue_stats():
+    """Renders en curso y trabajos esperando turno."""
+    with _lock:
+        return {"activos": _activos, "en_espera": len(_espera), "cupos": RENDER_SLOTS}
+
+
+class QueueFull(RuntimeError):
+    """La cola de espera ya tiene max_espera trabajos (ver submit_render)."""
+
+
+def submit_render(template_name, context, solo_propios=False, max_espera=None):
+    """Encola el render y devuelve el id del trabajo.
+
+    Si el mismo contexto ya se renderizó (o se está renderizando), no se
+    vuelve a procesar: se reutilizan los bytes de la caché. Si ya hay
+    RENDER_SLOTS renders en curso, el trabajo queda pendiente hasta que se
+    libere un cupo. Con solo_propios el render solo lee recursos de
+    assets/ y templates/ (ver core.fetcher), para contextos que llegan de
+    fuera de la app; esos PDF tienen su propia clave. Con max_espera, si el
+    trabajo tendría que esperar turno y ya hay esa cantidad esperando, lanza
+    QueueFull sin encolarlo.
+    """
+    global _activos
+    purge_expired()
+    clave = context_key(template_name, context, solo_propios=solo_propios)
+    with _lock:
+        job_id = _en_curso(clave)
+    if job_id is not None:
+        return job_id
+
+    job_id = uuid.uuid4().hex
+    future = Future()
+    job = {"future": future, "template": template_name, "clave": clave,
+           "solo_propios": solo_propios, "creado": time.time(), "terminado": None}
+    future.add_done_callback(_marcar_terminado(job))
+
+    pdf = pdf_cache.get(clave)
+    admitido = False
+    with _lock:
+        if pdf is None and _activos >= RENDER_SLOTS and max_espera is not None and len(_espera) >= max_espera:
+            raise QueueFull(f"{len(_espera)} trabajos esperando turno")
+        _jobs[job_id] = job
+        if pdf is None:
+            job["context"] = context
+            admitido = _activos < RENDER_SLOTS
+            if admitido:
+                _activos += 1
+            else:
+                _espera.append(job)
+    if pdf is not None:
+        future.set_result((pdf, {}))
+    elif admitido:
+        _lanzar(job)
+    return job_id
+
+
+def job_status(job_id):
+    """Estado del trabajo, o None si no existe (o ya venció)."""
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+    future = job["future"]
+    if not future.done():
+        return PROCESANDO if future.running() else PENDIENTE
+    return ERROR if future.exception() is not None else LISTO
+
+
+def job_info(job_id):
+    """Estado y segundos transcurridos, para mostrar progreso en la página.
+
+    "posicion" es el lugar en la cola de admisión (0 si ya tiene turno).
+    "tiempos" trae las etapas (cola, jinja, weasyprint) cuando el PDF se
+    renderizó; queda vacío si salió de la caché.
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+    fin = job["terminado"] or time.time()
+    tiempos = {}
+    future = job["future"]
+    if future.done() and future.exception() is None:
+        etapas = future.result()[1]
+        if "inicio" in etapas:
+            tiempos = {"cola": max(0.0, etapas["inicio"] - job["creado"]),
+                       "jinja": etapas["jinja"], "weasyprint": etapas["weasyprint"]}
+            if "optimizar" in etapas:
+                tiempos["optimizar"] = etapas["optimizar"]
+    with _lock:
+        posicion = next((i + 1 for i, j in enumerate(_espera) if j is job), 0)
+    return {"estado": job_status(job_id), "template": job["template"], "clave": job["clave"],
+            "segundos": fin - job["creado"], "posicion": posicion, "tiempos": tiempos}
+
+
+def job_result(job_id, timeout=None):
+    """Bytes del PDF. Lanza KeyError si el trabajo no existe, TimeoutError si
+    no terminó en `timeout` segundos y la excepción original del render si
+    falló."""
+    job = _jobs.get(job_id)
+    if job is None:
+        raise KeyError(job_id)
+    return job["future"].result(timeout)[0]
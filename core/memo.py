@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from core.assets import file_hash
+from core.config import ROOT_DIR, STATE_DIR
+from core.render import template_files
+
+# Tamaño máximo de la caché de PDFs en memoria (MB)
+PDF_CACHE_MB = float(os.environ.get("RMC_PDF_CACHE_MB", 64))
+
+DELIVERIES_DB = os.path.join(STATE_DIR, "entregas.db")
+
+
+def context_key(template_name, context, solo_propios=False):
+    """Clave del documento: plantilla (nombre + contenido) y contexto completo.
+
+    Dos envíos con los mismos campos, tablas y firmas producen la misma
+    clave; si se edita la plantilla, sus include, su hoja de estilos (o un
+    @import) o el logo, la clave cambia. Un render con solo_propios (ver
+    core.jobs.submit_render) puede omitir recursos: tiene otra clave.
+    """
+    datos = {
+        "template": template_name,
+        "template_hashes": {os.path.relpath(p, ROOT_DIR): file_hash(p) for p in template_files(template_name)},
+        "context": context,
+    }
+    if solo_propios:
+        datos["solo_propios"] = True  # Sin el campo, las claves de la app no cambian
+    payload = json.dumps(datos, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PDFCache:
+    """LRU de PDFs ya generados, acotada por la suma de bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            pdf = self._items.get(key)
+            if pdf is not None:
+                self._items.move_to_end(key)
+            return pdf
+
+    def put(self, key, pdf):
+        if len(pdf) > self.max_bytes:
+            return  # No cabe: no vale la pena vaciar la caché por un solo PDF
+        with self._lock:
+            anterior = self._items.pop(key, None)
+            if anterior is not None:
+                self.total_bytes -= len(anterior)
+            self._items[key] = pdf
+            self.total_bytes += len(pdf)
+            while self.total_bytes > self.max_bytes:
+                _, expulsado = self._items.popitem(last=False)
+                self.total_bytes -= len(expulsado)
+
+    def __len__(self):
+        return len(self._items)
+
+
+pdf_cache = PDFCache(int(PDF_CACHE_MB * 1024 * 1024))
+
+
+# --- REGISTRO DE ENTREGAS ---
+# Persistente: un documento idéntico no se vuelve a enviar aunque se
+# reinicie el servidor.
+
+_db_lock = threading.Lock()
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(DELIVERIES_DB, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entregas ("
+        " clave TEXT PRIMARY KEY, documento TEXT, fecha TEXT)"
+    )
+    return conn
+
+
+def was_delivered(key):
+    with _db_lock, _connect() as conn:
+        row = conn.execute("SELECT 1 FROM entregas WHERE clave = ?", (key,)).fetchone()
+    return row is not None
+
+
+def deliver_once(key, send, documento=""):
+    """Llama a send() solo si la clave no se entregó antes.
+
+    La clave se reserva antes de enviar (dos sesiones con el mismo documento
+    no envían dos veces) y se libera si send() falla. Devuelve True si se
+    envió, False si falló y None si ya estaba entregado.
+    """
+    with _db_lock, _connect() as conn:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO entregas (clave, documento, fecha) VALUES (?, ?, ?)",
+            (key, documento, datetime.now().isoformat(timespec="seconds")),
+        )
+        if cur.rowcount == 0:
+            return None
+
+    ok = False
+    try:
+        ok = bool(send())
+    finally:
+        if not ok:
+            with _db_lock, _connect() as conn:
+                conn.execute("DELETE FROM entregas WHERE clave = ?", (key,))
+    return ok
@@ -0,0 +1,199 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+
+from core.config import STATE_DIR
+
+# --- MÉTRICAS POR ETAPA ---
+# Cada documento genera un evento con los segundos de cada etapa (firma,
+# cola, jinja, weasyprint, archivo, smtp...) bajo un id de solicitud y con
+# la página y el formulario. Los eventos van a un log JSON rotativo
+# (.rmc/metricas/metricas.jsonl) y a ventanas en memoria para el texto
+# Prometheus.
+
+METRICS_DIR = os.path.join(STATE_DIR, "metricas")
+METRICS_LOG = os.path.join(METRICS_DIR, "metricas.jsonl")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+WINDOW = 2000  # muestras recientes por (etapa, formulario) para los percentiles
+QUANTILES = (0.5, 0.95)
+
+_lock = threading.Lock()
+_logger = None
+_muestras = {}   # (etapa, form) -> deque de segundos
+_totales = {}    # (etapa, form) -> [cantidad, suma]
+_por_clave = OrderedDict()  # clave del documento -> (id, page, form), para el smtp
+
+
+def _get_logger():
+    global _logger
+    with _lock:
+        if _logger is None:
+            logger = logging.getLogger("rmc.metricas")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            try:
+                os.makedirs(METRICS_DIR, exist_ok=True)
+                handler = RotatingFileHandler(METRICS_LOG, maxBytes=LOG_MAX_BYTES,
+                                              backupCount=LOG_BACKUPS, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+            except OSError:
+                logger.addHandler(logging.NullHandler())  # Sin disco: solo memoria
+            _logger = logger
+    return _logger
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def record(evento):
+    """Escribe el evento en el log y suma sus etapas a las ventanas en memoria.
+
+    evento: {"id", "page", "form", "etapas": {nombre: segundos}, "bytes": {...}, ...}
+    """
+    evento = dict(evento, ts=round(time.time(), 3))
+    form = evento.get("form", "")
+    with _lock:
+        for etapa, segundos in evento.get("etapas", {}).items():
+            _muestras.setdefault((etapa, form), deque(maxlen=WINDOW)).append(segundos)
+            total = _totales.setdefault((etapa, form), [0, 0.0])
+            total[0] += 1
+            total[1] += segundos
+        if evento.get("clave"):
+            _por_clave[evento["clave"]] = (evento.get("id"), evento.get("page"), form)
+            while len(_por_clave) > WINDOW:
+                _por_clave.popitem(last=False)
+    _get_logger().info(json.dumps(evento, ensure_ascii=False, default=str))
+
+
+def record_for_key(clave, etapas, **extra):
+    """Etapas que ocurren después (p. ej. el envío SMTP) del documento `clave`."""
+    request_id, page, form = _por_clave.get(clave, (None, "", ""))
+    record(dict(extra, id=request_id, page=page, form=form, clave=clave, etapas=etapas))
+
+
+class Traza:
+    """Tiempos de un documento a lo largo de sus etapas.
+
+    traza = Traza("2_Checklist", "checklist")
+    with traza.etapa("firma"):
+        ...
+    traza.emit(clave=...)
+    """
+
+    def __init__(self, page, form, request_id=None):
+        self.id = request_id or new_request_id()
+        self.page = page
+        self.form = form
+        self.etapas = {}
+        self.bytes = {}
+
+    @contextmanager
+    def etapa(self, nombre):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(nombre, time.perf_counter() - t0)
+
+    def add(self, nombre, segundos):
+        self.etapas[nombre] = self.etapas.get(nombre, 0.0) + segundos
+
+    def emit(self, **extra):
+        record(dict(extra, id=self.id, page=self.page, form=self.form,
+                    etapas={k: round(v, 6) for k, v in self.etapas.items()}, bytes=self.bytes))
+
+
+# --- LECTURA Y PERCENTILES ---
+
+def load_events(limit=50000):
+    """Eventos del log (incluye los archivos rotados), del más antiguo al más nuevo."""
+    rotados = [p for p in glob.glob(METRICS_LOG + ".*") if p.rsplit(".", 1)[1].isdigit()]
+    archivos = sorted(rotados, key=lambda p: -int(p.rsplit(".", 1)[1]))
+    if os.path.exists(METRICS_LOG):
+        archivos.append(METRICS_LOG)
+    eventos = deque(maxlen=limit)
+    for path in archivos:
+        with open(path, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    eventos.append(json.loads(linea))
+                except ValueError:
+                    continue  # Línea cortada por una rotación a mitad de escritura
+    return list(eventos)
+
+
+def _quantile(ordenados, q):
+    # Interpolación lineal, igual que pandas/numpy por defecto
+    pos = (len(ordenados) - 1) * q
+    base = int(pos)
+    sig = min(base + 1, len(ordenados) - 1)
+    return ordenados[base] + (ordenados[sig] - ordenados[base]) * (pos - base)
+
+
+def prometheus_text():
+    """Resumen en formato de texto de Prometheus (ventana reciente por proceso)."""
+    lineas = [
+        "# HELP rmc_stage_seconds Segundos por etapa de generación de documentos.",
+        "# TYPE rmc_stage_seconds summary",
+    ]
+    with _lock:
+        claves = sorted(_muestras)
+        datos = {k: (sorted(_muestras[k]), list(_totales[k])) for k in claves}
+    for etapa, form in claves:
+        ordenados, (cantidad, suma) = datos[(etapa, form)]
+        etiquetas = f'stage="{etapa}",form="{form}"'
+        for q in QUANTILES:
+            lineas.append(f'rmc_stage_seconds{{{etiquetas},quantile="{q}"}} {_quantile(ordenados, q):.6f}')
+        lineas.append(f"rmc_stage_seconds_sum{{{etiquetas}}} {suma:.6f}")
+        lineas.append(f"rmc_stage_seconds_count{{{etiquetas}}} {cantidad}")
+    return "\n".join(lineas) + "\n"
+
+
+# --- ENDPOINT /metrics OPCIONAL ---
+# Con RMC_METRICS_PORT definido, un hilo sirve prometheus_text() en /metrics.
+
+_server = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port=None):
+    """Arranca (una vez por proceso) el servidor de /metrics. None si no hay puerto."""
+    global _server
+    port = port or os.environ.get("RMC_METRICS_PORT")
+    if not port:
+        return None
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+            except OSError:
+                return None  # Puerto ocupado (otro proceso ya lo sirve)
+            threading.Thread(target=_server.serve_forever, name="rmc-metricas", daemon=True).start()
+    return _server
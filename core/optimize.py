@@ -0,0 +1,91 @@
+import hashlib
+import io
+import os
+import time
+
+import pymupdf
+from PIL import Image
+
+# --- OPTIMIZACIÓN DEL PDF (después de write_pdf) ---
+# Reduce las imágenes a la resolución de impresión según el tamaño con que
+# se muestran en la página, y guarda con recolección de basura, fusión de
+# objetos idénticos (garbage=4) y object streams. core.render lo aplica
+# con RMC_PDF_OPTIMIZE=1.
+
+PRINT_DPI = int(os.environ.get("RMC_PDF_DPI", 150))
+DPI_MARGIN = 1.25  # solo se reduce si la imagen supera el objetivo en este factor
+
+
+def _dpi_mostrado(doc, xref, ancho_px):
+    # La imagen puede aparecer en varias páginas/tamaños: manda el más grande
+    ancho_pt = 0
+    for page in doc:
+        for rect in page.get_image_rects(xref):
+            ancho_pt = max(ancho_pt, rect.width)
+    return ancho_px / (ancho_pt / 72) if ancho_pt else None
+
+
+def _cargar(doc, xref, smask):
+    info = doc.extract_image(xref)
+    im = Image.open(io.BytesIO(info["image"]))
+    if smask:
+        alfa = Image.open(io.BytesIO(doc.extract_image(smask)["image"])).convert("L")
+        im = im.convert("RGBA")
+        im.putalpha(alfa.resize(im.size))
+    return im, info["ext"]
+
+
+def _codificar(im, ext):
+    buffered = io.BytesIO()
+    if ext in ("jpeg", "jpg") and im.mode != "RGBA":
+        im.convert("RGB").save(buffered, format="JPEG", quality=85, optimize=True)
+    else:
+        if im.mode not in ("1", "L", "LA", "P", "RGBA"):
+            im = im.convert("RGB")
+        im.save(buffered, format="PNG", optimize=True)
+    return buffered.getvalue()
+
+
+def optimize_pdf(pdf_bytes, dpi=PRINT_DPI):
+    """Devuelve (pdf optimizado, reporte).
+
+    reporte: bytes antes/después, imágenes reducidas, imágenes duplicadas
+    (se guardan una vez) y segundos. Si el resultado no es más chico, se
+    devuelve el PDF original.
+    """
+    t0 = time.perf_counter()
+    doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
+    reducidas, vistas, duplicadas = 0, set(), 0
+    firmas = set()
+    for page in doc:
+        for img in page.get_images(full=True):
+            xref, smask, ancho, alto = img[0], img[1], img[2], img[3]
+            if xref in vistas:
+                continue
+            vistas.add(xref)
+            firma = hashlib.sha1(doc.xref_stream_raw(xref) or b"").hexdigest()
+            if firma in firmas:
+                duplicadas += 1  # garbage=4 la fusiona con la anterior
+            firmas.add(firma)
+
+            dpi_actual = _dpi_mostrado(doc, xref, ancho)
+            if not dpi_actual or dpi_actual <= dpi * DPI_MARGIN:
+                continue
+            escala = dpi / dpi_actual
+            nuevo = (max(1, round(ancho * escala)), max(1, round(alto * escala)))
+            try:
+                im, ext = _cargar(doc, xref, smask)
+            except (ValueError, OSError, RuntimeError):
+                continue  # Formato que Pillow no lee (p. ej. JBIG2): se deja igual
+            im = im.resize(nuevo, Image.Resampling.LANCZOS)
+            page.replace_image(xref, stream=_codificar(im, ext))
+            reducidas += 1
+
+    optimizado = doc.tobytes(garbage=4, deflate=True, use_objstms=1)
+    doc.close()
+    if len(optimizado) >= len(pdf_bytes):
+        optimizado = pdf_bytes
+    return optimizado, {
+        "antes": len(pdf_bytes), "despues": len(optimizado), "imagenes": len(vistas),
+        "reducidas": reducidas, "duplicadas": duplicadas, "segundos": time.perf_counter() - t0,
+    }
@@ -0,0 +1,254 @@
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+
+from core.config import STATE_DIR
+from core.metrics import record_for_key
+
+# --- CONFIGURACIÓN ---
+OUTBOX_DB = os.path.join(STATE_DIR, "outbox.db")
+BATCH_SIZE = int(os.environ.get("RMC_OUTBOX_BATCH", 20))
+MAX_INTENTOS = int(os.environ.get("RMC_OUTBOX_MAX_INTENTOS", 8))
+BACKOFF_BASE = 30        # segundos; se duplica en cada intento fallido
+BACKOFF_MAX = 60 * 60
+SMTP_IDLE_TIMEOUT = 120  # cierra la conexión tras este tiempo sin enviar
+
+# Estados de un mensaje
+PENDIENTE = "pendiente"
+ENVIADO = "enviado"
+FALLIDO = "fallido"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mensajes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    clave TEXT UNIQUE,
+    asunto TEXT NOT NULL,
+    cuerpo TEXT NOT NULL,
+    archivo TEXT,
+    pdf BLOB,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento REAL NOT NULL,
+    ultimo_error TEXT,
+    creado REAL NOT NULL,
+    enviado REAL
+);
+CREATE INDEX IF NOT EXISTS idx_mensajes_cola ON mensajes (estado, proximo_intento);
+"""
+
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(OUTBOX_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def build_message(settings, subject, body, pdf_bytes=None, filename=None):
+    # email.mime solo hace falta en el hilo de envío, no al abrir las páginas
+    from email import encoders
+    from email.mime.base import MIMEBase
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['From'] = settings["sender_email"]
+    msg['To'] = settings["receiver_email"]
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+
+    if pdf_bytes is not None:
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(pdf_bytes)
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', f"attachment; filename= {filename}")
+        msg.attach(part)
+    return msg
+
+
+def enqueue(subject, body, pdf_bytes=None, filename=None, key=None):
+    """Guarda el mensaje en la cola y despierta al sender. Devuelve el id.
+
+    Si se entrega una clave que ya está en la cola, no se duplica.
+    """
+    now = time.time()
+    with _connect() as conn:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO mensajes (clave, asunto, cuerpo, archivo, pdf, proximo_intento, creado)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, subject, body, filename, pdf_bytes, now, now),
+        )
+        if cur.rowcount:
+            msg_id = cur.lastrowid
+        else:
+            msg_id = conn.execute("SELECT id FROM mensajes WHERE clave = ?", (key,)).fetchone()[0]
+    _despertar.set()
+    return msg_id
+
+
+def delivery_status(msg_id):
+    """{"estado", "intentos", "ultimo_error", "enviado"} o None si no existe."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT estado, intentos, ultimo_error, enviado FROM mensajes WHERE id = ?", (msg_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("estado", "intentos", "ultimo_error", "enviado"), row))
+
+
+def queue_counts():
+    with _connect() as conn:
+        return dict(conn.execute("SELECT estado, COUNT(*) FROM mensajes GROUP BY estado").fetchall())
+
+
+class SMTPPool:
+    """Una conexión SMTP autenticada que se reutiliza entre envíos.
+
+    Se verifica con NOOP antes de usarla y se cierra si queda ociosa más de
+    SMTP_IDLE_TIMEOUT segundos.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._server = None
+        self._ultimo_uso = 0.0
+
+    def _abrir(self):
+        s = self.settings
+        server = smtplib.SMTP(s["smtp_server"], int(s["smtp_port"]), timeout=30)
+        if s.get("starttls", True):
+            server.starttls()
+        if s.get("sender_password"):
+            server.login(s["sender_email"], s["sender_password"])
+        return server
+
+    def get(self):
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP rechazado")
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._server is None:
+            self._server = self._abrir()
+        self._ultimo_uso = time.time()
+        return self._server
+
+    def close_if_idle(self):
+        if self._server is not None and time.time() - self._ultimo_uso > SMTP_IDLE_TIMEOUT:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._server = None
+
+
+def _backoff(intentos):
+    return min(BACKOFF_BASE * 2 ** (intentos - 1), BACKOFF_MAX)
+
+
+def send_pending(pool, settings, limit=BATCH_SIZE):
+    """Envía un lote de mensajes vencidos con la conexión del pool.
+
+    Devuelve la cantidad de mensajes procesados (enviados o reprogramados).
+    """
+    now = time.time()
+    with _connect() as conn:
+        lote = conn.execute(
+            "SELECT id, clave, asunto, cuerpo, archivo, pdf, intentos FROM mensajes"
+            " WHERE estado = ? AND proximo_intento <= ? ORDER BY id LIMIT ?",
+            (PENDIENTE, now, limit),
+        ).fetchall()
+
+    for msg_id, clave, asunto, cuerpo, archivo, pdf, intentos in lote:
+        t0 = time.perf_counter()
+        try:
+            # Un secreto faltante o un error de MIME cuenta como intento fallido
+            msg = build_message(settings, asunto, cuerpo, pdf, archivo).as_string()
+            t1 = time.perf_counter()
+            server = pool.get()
+            server.sendmail(settings["sender_email"], settings["receiver_email"], msg)
+            t2 = time.perf_counter()
+        except Exception as e:
+            # Un rechazo del servidor (4xx/5xx) deja la conexión usable; las
+            # excepciones de smtplib también son OSError
+            if isinstance(e, OSError) and not isinstance(e, smtplib.SMTPResponseException):
+                pool.close()
+            intentos += 1
+            estado = FALLIDO if intentos >= MAX_INTENTOS else PENDIENTE
+            with _connect() as conn:
+                conn.execute(
+                    "UPDATE mensajes SET estado = ?, intentos = ?, proximo_intento = ?, ultimo_error = ?"
+                    " WHERE id = ?",
+                    (estado, intentos, time.time() + _backoff(intentos), f"{type(e).__name__}: {e}", msg_id),
+                )
+        else:
+            # El PDF ya salió: se libera el blob y queda solo el registro
+            with _connect() as conn:
+                conn.execute(
+                    "UPDATE mensajes SET estado = ?, intentos = ?, enviado = ?, pdf = NULL, ultimo_error = NULL"
+                    " WHERE id = ?",
+                    (ENVIADO, intentos + 1, time.time(), msg_id),
+                )
+            record_for_key(clave, {"mime": t1 - t0, "smtp": t2 - t1}, bytes={"mime": len(msg)})
+    return len(lote)
+
+
+# --- SENDER EN SEGUNDO PLANO ---
+# Un hilo por proceso vacía la cola; enqueue() lo despierta de inmediato.
+
+_despertar = threading.Event()
+_sender_lock = threading.Lock()
+_sender = None
+
+
+class OutboxSender(threading.Thread):
+
+    def __init__(self, settings, poll_interval=15):
+        super().__init__(name="rmc-outbox", daemon=True)
+        self.settings = settings
+        self.poll_interval = poll_interval
+        self.pool = SMTPPool(settings)
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.is_set():
+            _despertar.clear()
+            try:
+                procesados = send_pending(self.pool, self.settings)
+            except Exception:
+                # SQLite ocupado o cualquier error inesperado: el hilo sigue
+                # vivo y reintenta en el próximo sondeo
+                self.pool.close()
+                procesados = 0
+            if procesados:
+                continue  # Puede quedar más cola: siguiente lote sin esperar
+            self.pool.close_if_idle()
+            _despertar.wait(self.poll_interval)
+        self.pool.close()
+
+    def stop(self):
+        self._detener.set()
+        _despertar.set()
+
+
+def start_sender(settings):
+    """Arranca (una sola vez por proceso) el hilo que envía la cola."""
+    global _sender
+    settings = dict(settings)
+    with _sender_lock:
+        if _sender is not None and _sender.is_alive():
+            if _sender.settings == settings:
+                return _sender
+            _sender.stop()
+        _sender = OutboxSender(settings)
+        _sender.start()
+        return _sender
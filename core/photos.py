@@ -0,0 +1,151 @@
+import hashlib
+import io
+import os
+import pathlib
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+from core.config import CACHE_DIR, STATE_DIR
+
+# --- FOTOS DE EVIDENCIA ---
+# Las fotos del celular (3-12 MB) se procesan al subirlas: orientación EXIF
+# aplicada y metadatos fuera (incluido el GPS), reducción a tamaño de
+# impresión y JPEG. Se guardan por sha256 del archivo original, así que
+# subir dos veces la misma foto no la vuelve a procesar. Las plantillas
+# las reciben como file:// (no base64): el contexto que viaja al pool es
+# chico y cada PDF tiene a lo más MAX_FOTOS_DOC fotos de tamaño acotado.
+
+PHOTOS_DIR = os.path.join(STATE_DIR, "fotos")
+THUMBS_DIR = os.path.join(CACHE_DIR, "fotos")
+PRINT_PX = int(os.environ.get("RMC_FOTO_PX", 1200))  # lado mayor: ~10 cm a 300 DPI
+THUMB_PX = 240
+JPEG_QUALITY = 80
+INGEST_WORKERS = min(4, os.cpu_count() or 1)
+MAX_FOTOS_ITEM = 4
+MAX_FOTOS_DOC = 24
+PHOTOS_TTL = 30 * 24 * 3600
+FORMATOS = ["jpg", "jpeg", "png", "webp"]
+
+_ultima_purga = 0.0
+
+
+def photo_path(sha):
+    return os.path.join(PHOTOS_DIR, sha[:2], f"{sha}.jpg")
+
+
+def thumb_path(sha):
+    return os.path.join(THUMBS_DIR, sha[:2], f"{sha}.jpg")
+
+
+def photo_uri(sha):
+    return pathlib.Path(os.path.abspath(photo_path(sha))).as_uri()
+
+
+def _escribir(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _jpeg(im, **opciones):
+    buffered = io.BytesIO()
+    # Sin exif=...: el JPEG sale sin metadatos
+    im.save(buffered, format="JPEG", quality=JPEG_QUALITY, optimize=True, **opciones)
+    return buffered.getvalue()
+
+
+def _miniatura(im):
+    im = im.copy()
+    im.thumbnail((THUMB_PX, THUMB_PX), Image.Resampling.LANCZOS)
+    return _jpeg(im)
+
+
+def _procesar(data):
+    with Image.open(io.BytesIO(data)) as original:
+        # En JPEG decodifica directo a 1/2, 1/4 u 1/8: no se arma el bitmap de 12 MP
+        original.draft("RGB", (PRINT_PX, PRINT_PX))
+        im = ImageOps.exif_transpose(original)
+    if im.mode in ("RGBA", "LA", "P"):
+        im = im.convert("RGBA")
+        fondo = Image.new("RGB", im.size, "white")
+        fondo.paste(im, mask=im.getchannel("A"))
+        im = fondo
+    elif im.mode != "RGB":
+        im = im.convert("RGB")
+    im.thumbnail((PRINT_PX, PRINT_PX), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    return _jpeg(im, progressive=True), _miniatura(im)
+
+
+def ingest(data):
+    """Procesa la foto (bytes) si no estaba y devuelve su sha256."""
+    sha = hashlib.sha256(data).hexdigest()
+    try:
+        os.utime(photo_path(sha))  # Ya estaba: se renueva para que purge_expired no la borre
+    except FileNotFoundError:
+        foto, mini = _procesar(data)
+        _escribir(thumb_path(sha), mini)
+        _escribir(photo_path(sha), foto)
+    return sha
+
+
+def ingest_many(archivos, hilos=INGEST_WORKERS):
+    """Procesa en paralelo bytes o archivos subidos (con getvalue()).
+
+    Devuelve [(sha, None) o (None, error)] en el mismo orden. Pillow suelta
+    el GIL al decodificar y redimensionar, así que los hilos rinden; con
+    pocos hilos quedan pocas fotos decodificadas en memoria a la vez.
+    """
+    purge_expired()
+
+    def uno(archivo):
+        try:
+            data = archivo if isinstance(archivo, bytes) else archivo.getvalue()
+            return ingest(data), None
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=hilos) as ex:
+        return list(ex.map(uno, archivos))
+
+
+def thumbnail(sha):
+    """Bytes JPEG de la miniatura; se regenera desde la foto si se borró la caché."""
+    path = thumb_path(sha)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        with Image.open(photo_path(sha)) as im:
+            mini = _miniatura(im)
+        _escribir(path, mini)
+        return mini
+
+
+def purge_expired(now=None):
+    """Borra fotos y miniaturas de más de PHOTOS_TTL (como mucho una vez por hora).
+
+    El PDF ya generado lleva la foto adentro; el archivo solo hace falta
+    mientras el formulario (o su borrador) sigue abierto.
+    """
+    global _ultima_purga
+    now = time.time() if now is None else now
+    if now - _ultima_purga < 3600:
+        return 0
+    _ultima_purga = now
+    borradas = 0
+    for base in (PHOTOS_DIR, THUMBS_DIR):
+        for raiz, _, nombres in os.walk(base):
+            for nombre in nombres:
+                path = os.path.join(raiz, nombre)
+                try:
+                    if now - os.path.getmtime(path) > PHOTOS_TTL:
+                        os.remove(path)
+                        borradas += 1
+                except OSError:
+                    pass
+    return borradas
@@ -0,0 +1,170 @@
+import glob
+import hashlib
+import os
+import re
+import threading
+
+import pandas as pd
+
+from core.config import CACHE_DIR, DATA_DIR
+from core.pools import spawn_pool
+
+# --- PLANES PERSONALIZADOS DE PREVENCIÓN (data/Plan_*.xlsx) ---
+# Cada planilla se parsea una sola vez a un DataFrame "largo" (una fila por
+# actividad) que queda en .cache/planes, con el mtime y tamaño en la clave.
+
+PLANS_CACHE_DIR = os.path.join(CACHE_DIR, "planes")
+PLANS_GLOB = os.path.join(DATA_DIR, "Plan_*.xlsx")
+PARALLEL_MIN = 8  # a partir de cuántas planillas sin caché se parsea en paralelo
+
+MESES = ["ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO", "JULIO",
+         "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"]
+
+COLUMNS = ["archivo", "trabajador", "cargo", "mes", "anio", "tipo", "n",
+           "actividad", "asignada", "realizada", "medio"]
+
+_lock = threading.Lock()
+_memo = {"firma": None, "df": None}
+
+
+def _texto(v):
+    return str(v).strip() if v is not None else ""
+
+
+def _valor_junto_a(fila, etiqueta):
+    # En la planilla el valor va en la primera celda no vacía a la derecha
+    for i, celda in enumerate(fila):
+        if _texto(celda).upper().startswith(etiqueta):
+            for v in fila[i + 1:]:
+                if _texto(v):
+                    return _texto(v)
+    return ""
+
+
+def parse_plan(path):
+    """Lee un Plan_*.xlsx y devuelve un DataFrame con COLUMNS."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        filas = [list(f) for f in wb.worksheets[0].iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+    trabajador = cargo = mes = ""
+    anio = None
+    registros = []
+    tipo = None
+    cols = {}
+    for fila in filas:
+        primera = _texto(fila[0]).upper() if fila else ""
+        if primera.startswith("NOMBRE:"):
+            trabajador = _valor_junto_a(fila, "NOMBRE:")
+            mes = _valor_junto_a(fila, "MES:").upper()
+        elif primera.startswith("CARGO:"):
+            cargo = _valor_junto_a(fila, "CARGO:")
+        elif primera.startswith("ACTIVIDADES"):
+            tipo = "asignada" if "ASIGNADAS" in primera else "ocasional"
+            m = re.search(r"(\d{4})", primera)
+            anio = int(m.group(1)) if m else anio
+            cols = {}
+        elif primera == "N°":
+            # Encabezado de tabla: ubicamos las columnas por nombre
+            cols = {_texto(c).upper(): i for i, c in enumerate(fila) if _texto(c)}
+        elif tipo and cols and isinstance(fila[0], (int, float)):
+            def col(nombre):
+                i = cols.get(nombre)
+                return fila[i] if i is not None and i < len(fila) else None
+            registros.append({
+                "archivo": os.path.basename(path), "trabajador": trabajador, "cargo": cargo,
+                "mes": mes, "anio": anio, "tipo": tipo, "n": int(fila[0]),
+                "actividad": _texto(col("NOMBRE DE LA ACTIVIDAD")),
+                "asignada": col("CANTIDAD ASIGNADA"), "realizada": col("CANTIDAD REALIZADA"),
+                "medio": _texto(col("MEDIO DE VERIFICACIÓN")),
+            })
+
+    df = pd.DataFrame(registros, columns=COLUMNS)
+    df["asignada"] = pd.to_numeric(df["asignada"], errors="coerce").fillna(0)
+    df["realizada"] = pd.to_numeric(df["realizada"], errors="coerce").fillna(0)
+    return df
+
+
+def _cache_file(path, st):
+    nombre = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(PLANS_CACHE_DIR, f"{nombre}-{st.st_mtime_ns}-{st.st_size}.pkl")
+
+
+def _parse_and_store(path, cache_file):
+    df = parse_plan(path)
+    try:
+        os.makedirs(PLANS_CACHE_DIR, exist_ok=True)
+        # Se borran versiones anteriores de la misma planilla
+        for viejo in glob.glob(cache_file.rsplit("-", 2)[0] + "-*.pkl"):
+            os.remove(viejo)
+        df.to_pickle(cache_file)
+    except OSError:
+        pass
+    return df
+
+
+def load_plans(paths=None):
+    """Todas las planillas en un solo DataFrame.
+
+    Si ningún archivo cambió (mtime/tamaño), devuelve el mismo DataFrame en
+    memoria; si no, lee los .pkl de la caché y parsea solo los nuevos o
+    modificados (en paralelo cuando son muchos).
+    """
+    paths = sorted(paths if paths is not None else glob.glob(PLANS_GLOB))
+    stats = [(p, os.stat(p)) for p in paths]
+    firma = tuple((p, st.st_mtime_ns, st.st_size) for p, st in stats)
+
+    with _lock:
+        if _memo["firma"] == firma:
+            return _memo["df"]
+
+        frames = {}
+        pendientes = []
+        for p, st in stats:
+            cache_file = _cache_file(p, st)
+            try:
+                frames[p] = pd.read_pickle(cache_file)
+            except (OSError, ValueError, EOFError):
+                pendientes.append((p, cache_file))
+
+        if len(pendientes) >= PARALLEL_MIN:
+            # Mismo arranque que los workers de render (ver core.pools)
+            with spawn_pool() as pool:
+                resultados = pool.map(_parse_and_store, *zip(*pendientes))
+                for (p, _), df in zip(pendientes, resultados):
+                    frames[p] = df
+        else:
+            for p, cache_file in pendientes:
+                frames[p] = _parse_and_store(p, cache_file)
+
+        df = pd.concat([frames[p] for p in paths], ignore_index=True) if paths else pd.DataFrame(columns=COLUMNS)
+        df["mes_num"] = df["mes"].map({m: i + 1 for i, m in enumerate(MESES)})
+        _memo.update(firma=firma, df=df)
+        return df
+
+
+# --- CUMPLIMIENTO ---
+# Solo las actividades asignadas tienen meta. El cumplimiento es
+# realizada / asignada, con tope de 100% por actividad.
+
+def _asignadas(df):
+    df = df[(df["tipo"] == "asignada") & (df["asignada"] > 0)]
+    return df.assign(realizada_tope=df["realizada"].clip(upper=df["asignada"]))
+
+
+def compliance_by_worker(df):
+    g = _asignadas(df).groupby(["trabajador", "cargo", "anio", "mes_num", "mes"], as_index=False)
+    out = g[["asignada", "realizada_tope"]].sum()
+    out["cumplimiento"] = out["realizada_tope"] / out["asignada"]
+    return out.rename(columns={"realizada_tope": "realizada"})
+
+
+def compliance_by_activity(df):
+    g = _asignadas(df).groupby(["actividad", "anio", "mes_num", "mes"], as_index=False)
+    out = g[["asignada", "realizada_tope"]].sum()
+    out["cumplimiento"] = out["realizada_tope"] / out["asignada"]
+    return out.rename(columns={"realizada_tope": "realizada"})
@@ -0,0 +1,49 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import context, spawn
+
+# --- POOLS DE PROCESOS (spawn) ---
+# spawn vuelve a ejecutar el __main__ del padre en cada proceso nuevo, y
+# en Streamlit __main__ es la página que se está ejecutando: el worker
+# importaría Streamlit y correría la página en modo bare antes de su
+# primer trabajo. Los procesos de spawn_pool() nacen sin __main__ propio:
+# solo importan los módulos de las funciones que reciben (core.jobs,
+# core.plans). spawn (y no fork) porque el servidor tiene hilos con locks
+# (correo, borradores, subidas, métricas) que fork copiaría tomados.
+
+_local = threading.local()
+
+
+def _preparacion(name, _original=spawn.get_preparation_data):
+    # Lo que spawn manda al proceso nuevo antes de su primer trabajo. Sin
+    # init_main_* el hijo no vuelve a ejecutar __main__. Solo cambia para el
+    # hilo que está lanzando un proceso de spawn_pool(), así que no depende
+    # de qué página tenga cada sesión en sys.modules["__main__"]
+    datos = _original(name)
+    if getattr(_local, "sin_main", False):
+        datos.pop("init_main_from_name", None)
+        datos.pop("init_main_from_path", None)
+    return datos
+
+
+class _Proceso(context.SpawnProcess):
+    @staticmethod
+    def _Popen(process_obj):
+        _local.sin_main = True
+        try:
+            return context.SpawnProcess._Popen(process_obj)
+        finally:
+            _local.sin_main = False
+
+
+class _Contexto(context.SpawnContext):
+    Process = _Proceso
+
+
+spawn.get_preparation_data = _preparacion
+_contexto = _Contexto()
+
+
+def spawn_pool(max_workers=None, initializer=None):
+    """ProcessPoolExecutor con spawn cuyos workers no ejecutan la página."""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_contexto, initializer=initializer)
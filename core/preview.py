@@ -0,0 +1,126 @@
+import base64
+import os
+import re
+import tempfile
+from urllib.parse import unquote, urlparse
+
+from core.config import CACHE_DIR
+from core.photos import PHOTOS_DIR, thumbnail
+from core.render import CSS_DIR, render_html
+
+# --- VISTA PREVIA ---
+# Mientras se llena el formulario se muestra la plantilla como HTML (solo
+# Jinja, sin la diagramación de WeasyPrint), con los estilos de
+# templates/css/ incrustados y las fotos del anexo en miniatura. La
+# miniatura PNG de la primera página sí necesita el PDF: se pide como un
+# render normal (core.jobs), así que queda en la caché de PDFs y el envío
+# final con el mismo contenido no vuelve a renderizar.
+
+PREVIEW_DIR = os.path.join(CACHE_DIR, "preview")
+PAGE_PX = 600  # ancho de la miniatura de la primera página
+
+_IMPORT = re.compile(r'@import\s+url\(["\']?([^"\')]+)["\']?\)\s*;')
+# Marco de hoja A4 para el navegador (las reglas @page solo las usa WeasyPrint)
+_HOJA = ("html { background: #e5e5e5; } "
+         "body { background: white; width: 21cm; min-height: 29.7cm; margin: 0 auto; "
+         "padding: 1.5cm 2cm; box-sizing: border-box; }")
+
+_estilos = {}  # plantilla -> (mtimes, texto)
+
+
+def _leer_css(path, vistos):
+    # Incrusta los @import locales (los navegadores no los resuelven en un srcdoc)
+    path = os.path.normpath(path)
+    if path in vistos or not os.path.exists(path):
+        return ""
+    vistos.add(path)
+    with open(path, encoding="utf-8") as f:
+        texto = f.read()
+    base = os.path.dirname(path)
+    return _IMPORT.sub(lambda m: _leer_css(os.path.join(base, m.group(1)), vistos), texto)
+
+
+def preview_css(template_name):
+    """Texto CSS de la plantilla con sus @import incrustados ("" si no tiene).
+
+    Se vuelve a leer solo si cambia el mtime de alguno de los archivos.
+    """
+    path = os.path.join(CSS_DIR, os.path.splitext(template_name)[0] + ".css")
+    entry = _estilos.get(template_name)
+    if entry is not None:
+        try:
+            if all(os.stat(p).st_mtime_ns == m for p, m in entry[0]):
+                return entry[1]
+        except FileNotFoundError:
+            pass
+    vistos = set()
+    texto = _leer_css(path, vistos)
+    mtimes = tuple((p, os.stat(p).st_mtime_ns) for p in vistos)
+    _estilos[template_name] = (mtimes, texto)
+    return texto
+
+
+def _foto_preview(uri):
+    # file:// de core.photos -> miniatura en base64 (el navegador no lee archivos locales)
+    url = urlparse(uri)
+    path = unquote(url.path)
+    if url.scheme != "file" or not path.startswith(os.path.abspath(PHOTOS_DIR) + os.sep):
+        return uri
+    sha = os.path.splitext(os.path.basename(path))[0]
+    try:
+        return "data:image/jpeg;base64," + base64.b64encode(thumbnail(sha)).decode("ascii")
+    except OSError:
+        return ""
+
+
+def preview_html(template_name, context):
+    """HTML autocontenido de la plantilla para mostrar en el navegador."""
+    if context.get("anexo_fotos"):
+        context = dict(context, anexo_fotos=[
+            dict(grupo, fotos=[_foto_preview(uri) for uri in grupo["fotos"]])
+            for grupo in context["anexo_fotos"]
+        ])
+    html = render_html(template_name, context)
+    estilos = f"<style>{preview_css(template_name)}\n{_HOJA}</style>"
+    if "</head>" in html:
+        return html.replace("</head>", estilos + "</head>", 1)
+    return estilos + html
+
+
+# --- MINIATURA DE LA PRIMERA PÁGINA ---
+
+def _png_path(clave):
+    return os.path.join(PREVIEW_DIR, clave[:2], f"{clave}.png")
+
+
+def cached_page(clave):
+    """PNG de la primera página ya generado para la clave (core.memo.context_key), o None."""
+    try:
+        with open(_png_path(clave), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def first_page_png(pdf_bytes, ancho=PAGE_PX):
+    """Rasteriza la primera página del PDF a PNG de `ancho` píxeles."""
+    import pymupdf  # Solo al pedir una miniatura: la vista previa HTML no lo necesita
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pagina = doc[0]
+        escala = ancho / pagina.rect.width
+        return pagina.get_pixmap(matrix=pymupdf.Matrix(escala, escala), alpha=False).tobytes("png")
+
+
+def page_thumbnail(clave, pdf_bytes):
+    """Miniatura de la primera página, desde la caché en disco o rasterizada y guardada."""
+    png = cached_page(clave)
+    if png is None:
+        png = first_page_png(pdf_bytes)
+        path = _png_path(clave)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+    return png
@@ -0,0 +1,209 @@
+import os
+import re
+import threading
+import time
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
+
+from core.assets import get_logo_b64
+from core.config import CACHE_DIR, LOGO_PATH, TEMPLATES_DIR
+
+# WeasyPrint (y con él Pango y fontconfig) y core.fetcher, que depende de
+# él, se importan recién en el primer render: el proceso de Streamlit solo
+# usa render_html (vista previa) y los PDF se generan en el pool de
+# core.jobs. warm_up() adelanta esa carga.
+
+# Bytecode de las plantillas compiladas: sobrevive a reinicios del servidor
+JINJA_CACHE_DIR = os.path.join(CACHE_DIR, "jinja")
+# Estilos de impresión de cada plantilla: templates/css/<plantilla>.css
+CSS_DIR = os.path.join(TEMPLATES_DIR, "css")
+# Post-proceso opcional con PyMuPDF (ver core.optimize)
+OPTIMIZE_PDF = os.environ.get("RMC_PDF_OPTIMIZE") == "1"
+
+_IMPORT = re.compile(r'@import\s+url\(["\']?([^"\')]+)["\']?\)\s*;')
+
+_env = None
+_font_config = None
+_hojas = {}  # plantilla -> (mtimes de la hoja y sus @import, [CSS])
+_dependencias = {}  # plantilla -> (mtimes, [archivos])
+_lock = threading.Lock()
+
+
+def get_environment():
+    """Environment único por proceso.
+
+    Jinja guarda en memoria las plantillas ya compiladas y, con auto_reload,
+    las vuelve a cargar solo cuando cambia el mtime del .html. El bytecode
+    cache en disco evita recompilar tras un reinicio.
+    """
+    global _env
+    if _env is None:
+        with _lock:
+            if _env is None:
+                try:
+                    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+                    bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+                except OSError:
+                    bytecode_cache = None
+                _env = Environment(
+                    loader=FileSystemLoader(TEMPLATES_DIR),
+                    bytecode_cache=bytecode_cache,
+                    auto_reload=True,
+                )
+    return _env
+
+
+def get_font_config():
+    """FontConfiguration única por proceso: las @font-face se registran una vez."""
+    global _font_config
+    if _font_config is None:
+        with _lock:
+            if _font_config is None:
+                from weasyprint.text.fonts import FontConfiguration
+
+                _font_config = FontConfiguration()
+    return _font_config
+
+
+# --- DEPENDENCIAS DE CADA PLANTILLA ---
+
+def _mtimes(archivos):
+    try:
+        return tuple(os.stat(p).st_mtime_ns for p in archivos)
+    except FileNotFoundError:
+        return None
+
+
+def _con_imports(path, archivos):
+    # La hoja y sus @import locales, recursivamente
+    path = os.path.normpath(path)
+    if path in archivos or not os.path.exists(path):
+        return
+    archivos.append(path)
+    with open(path, encoding="utf-8") as f:
+        texto = f.read()
+    for url in _IMPORT.findall(texto):
+        if "://" not in url:
+            _con_imports(os.path.join(os.path.dirname(path), url), archivos)
+
+
+def stylesheet_files(template_name):
+    """templates/css/<plantilla>.css y sus @import locales ([] si no tiene hoja)."""
+    archivos = []
+    _con_imports(os.path.join(CSS_DIR, os.path.splitext(template_name)[0] + ".css"), archivos)
+    return archivos
+
+
+def _con_includes(template_name, archivos):
+    path = os.path.join(TEMPLATES_DIR, template_name)
+    if path in archivos:
+        return
+    archivos.append(path)
+    with open(path, encoding="utf-8") as f:
+        ast = get_environment().parse(f.read())
+    for incluida in meta.find_referenced_templates(ast):
+        if incluida:  # None: nombre calculado en la plantilla, no se puede seguir
+            _con_includes(incluida, archivos)
+
+
+def template_files(template_name):
+    """Archivos de los que depende el PDF de la plantilla: el .html, sus
+    {% include %}, su hoja con los @import y el logo que agrega render_html.
+
+    Se recalcula solo si cambia el mtime de alguno (core.memo.context_key
+    lo usa en cada envío).
+    """
+    entry = _dependencias.get(template_name)
+    if entry is not None and _mtimes(entry[1]) == entry[0]:
+        return entry[1]
+    archivos = []
+    _con_includes(template_name, archivos)
+    archivos += stylesheet_files(template_name) + [LOGO_PATH]
+    _dependencias[template_name] = (_mtimes(archivos), archivos)
+    return archivos
+
+
+def get_stylesheets(template_name):
+    """Hojas de la plantilla ya parseadas (weasyprint.CSS), o [] si no tiene.
+
+    Se parsean una vez por proceso y se vuelven a leer solo si cambia el
+    mtime del .css o de alguno de sus @import, igual que las plantillas en
+    Jinja.
+    """
+    archivos = stylesheet_files(template_name)
+    if not archivos:
+        return []
+    path, mtimes = archivos[0], _mtimes(archivos)
+    entry = _hojas.get(template_name)
+    if entry is None or entry[0] != mtimes:
+        from weasyprint import CSS
+
+        from core.fetcher import get_url_fetcher
+
+        hoja = CSS(filename=path, url_fetcher=get_url_fetcher(), font_config=get_font_config())
+        entry = (mtimes, [hoja])
+        _hojas[template_name] = entry
+    return entry[1]
+
+
+def render_html(template_name, context):
+    """Renderiza la plantilla a HTML. El logo se agrega si no viene en el contexto."""
+    context = dict(context)
+    context.setdefault("logo_b64", get_logo_b64())
+    template = get_environment().get_template(template_name)
+    return template.render(**context)
+
+
+def render_pdf(template_name, context, url_fetcher=None, tiempos=None, optimize=None):
+    """Renderiza la plantilla y devuelve los bytes del PDF.
+
+    Las rutas relativas de las plantillas se resuelven desde templates/ y
+    se sirven con el fetcher con caché. Los estilos (get_stylesheets) y la
+    configuración de fuentes se reutilizan entre renders. Si se
+    pasa un dict en `tiempos`, se llenan los segundos de "jinja" y "weasyprint".
+    Con optimize (por defecto RMC_PDF_OPTIMIZE=1) el PDF pasa por
+    core.optimize: imágenes a resolución de impresión y object streams.
+    """
+    from weasyprint import HTML
+
+    from core.fetcher import get_url_fetcher
+
+    t0 = time.perf_counter()
+    html = render_html(template_name, context)
+    t1 = time.perf_counter()
+    if url_fetcher is None:
+        url_fetcher = get_url_fetcher()
+    pdf = HTML(string=html, base_url=TEMPLATES_DIR + os.sep, url_fetcher=url_fetcher).write_pdf(
+        stylesheets=get_stylesheets(template_name), font_config=get_font_config())
+    t2 = time.perf_counter()
+    if optimize is None:
+        optimize = OPTIMIZE_PDF
+    if optimize:
+        from core.optimize import optimize_pdf
+
+        pdf, _ = optimize_pdf(pdf)
+    if tiempos is not None:
+        tiempos["jinja"] = t1 - t0
+        tiempos["weasyprint"] = t2 - t1
+        if optimize:
+            tiempos["optimizar"] = time.perf_counter() - t2
+    return pdf
+
+
+def warm_up():
+    """Deja listo el proceso para renderizar: importa WeasyPrint, compila las
+    plantillas, parsea sus estilos (con las @font-face), carga el logo y
+    genera un PDF mínimo, que es cuando Pango y fontconfig se inicializan y
+    fontconfig arma su caché en disco. Devuelve los segundos que tomó.
+    """
+    from weasyprint import HTML
+
+    t0 = time.perf_counter()
+    get_logo_b64()  # Variante de impresión: en disco la primera vez, luego en memoria
+    hojas = []
+    for nombre in sorted(os.listdir(TEMPLATES_DIR)):
+        if nombre.endswith(".html") and not nombre.startswith("_"):
+            get_environment().get_template(nombre)
+            hojas += get_stylesheets(nombre)
+    HTML(string="<p>RMC <b>RMC</b> <i>RMC</i></p>").write_pdf(stylesheets=hojas, font_config=get_font_config())
+    return time.perf_counter() - t0
@@ -0,0 +1,270 @@
+import glob
+import json
+import os
+import threading
+
+import pandas as pd
+
+from core.config import ROOT_DIR
+from core.photos import MAX_FOTOS_DOC, MAX_FOTOS_ITEM, photo_uri
+
+# --- ESQUEMAS DE FORMULARIOS (schemas/*.json) ---
+# Cada formulario SIGOP se describe en un JSON: campos, tablas, firmas,
+# plantilla, correo y datos para el archivo. core.form_page lo dibuja en
+# Streamlit y este módulo convierte lo ingresado en el contexto de la
+# plantilla. Un formulario nuevo es solo un JSON nuevo.
+
+SCHEMAS_DIR = os.path.join(ROOT_DIR, "schemas")
+
+# Elementos que contienen otros elementos
+CONTENEDORES = ("seccion", "fila", "columna")
+# Elementos que aportan un valor al contexto
+CAMPOS = ("texto", "area", "fecha", "hora", "marcas", "tabla", "firma")
+
+_lock = threading.Lock()
+_cache = {}  # path -> (mtime_ns, esquema)
+_frames = {}  # (form, tabla, mtime_ns) -> DataFrame inicial
+
+
+def schema_path(form_id):
+    return os.path.join(SCHEMAS_DIR, f"{form_id}.json")
+
+
+def list_schemas():
+    """{id: título} de todos los esquemas, en orden de "orden" y luego id."""
+    esquemas = [load_schema(os.path.basename(p)[:-5]) for p in glob.glob(os.path.join(SCHEMAS_DIR, "*.json"))]
+    esquemas.sort(key=lambda e: (e.get("orden", 99), e["id"]))
+    return {e["id"]: e["titulo"] for e in esquemas}
+
+
+def _validar(esquema, path):
+    for clave in ("id", "titulo", "template", "elementos"):
+        if clave not in esquema:
+            raise ValueError(f"{path}: falta '{clave}'")
+    nombres = [e["nombre"] for e in iter_elements(esquema["elementos"]) if e["tipo"] in CAMPOS]
+    repetidos = {n for n in nombres if nombres.count(n) > 1}
+    if repetidos:
+        raise ValueError(f"{path}: nombres repetidos {sorted(repetidos)}")
+
+
+def load_schema(form_id):
+    """Esquema parseado y validado; se relee solo si cambia el mtime del JSON."""
+    path = schema_path(form_id)
+    mtime = os.stat(path).st_mtime_ns
+    with _lock:
+        cacheado = _cache.get(path)
+        if cacheado is not None and cacheado[0] == mtime:
+            return cacheado[1]
+    with open(path, encoding="utf-8") as f:
+        esquema = json.load(f)
+    esquema.setdefault("id", form_id)
+    _validar(esquema, path)
+    esquema["_mtime"] = mtime
+    with _lock:
+        _cache[path] = (mtime, esquema)
+    return esquema
+
+
+def iter_elements(elementos):
+    """Recorre los elementos en orden, entrando en secciones y filas."""
+    for e in elementos:
+        yield e
+        if e["tipo"] in CONTENEDORES:
+            yield from iter_elements(e["elementos"])
+
+
+def fields(esquema, tipo=None):
+    return [e for e in iter_elements(esquema["elementos"])
+            if e["tipo"] in CAMPOS and (tipo is None or e["tipo"] == tipo)]
+
+
+# --- TABLAS ---
+
+def initial_frame(esquema, tabla):
+    """DataFrame inicial de la tabla, construido una vez por versión del esquema.
+
+    st.data_editor no modifica el DataFrame que recibe, así que se comparte.
+    """
+    clave = (esquema["id"], tabla["nombre"], esquema["_mtime"])
+    df = _frames.get(clave)
+    if df is None:
+        columnas = [c["nombre"] for c in tabla["columnas"]]
+        df = pd.DataFrame(tabla.get("filas", []), columns=columnas)
+        for c in tabla["columnas"]:
+            if c.get("tipo") == "booleano":
+                df[c["nombre"]] = df[c["nombre"]].fillna(False).astype(bool)
+            elif c.get("tipo") == "numero":
+                df[c["nombre"]] = pd.to_numeric(df[c["nombre"]], errors="coerce").fillna(0).astype(int)
+            else:
+                df[c["nombre"]] = df[c["nombre"]].fillna("")
+        _frames[clave] = df
+    return df
+
+
+def _texto(serie):
+    return serie.fillna("").astype(str).replace({"None": "", "nan": ""})
+
+
+def extract_table(tabla, df):
+    """Filas editadas -> lista de dicts para la plantilla, columna por columna.
+
+    Cada columna se convierte de una vez según su tipo (texto, opciones,
+    booleano, numero) y se renombra a su "clave". Con "omitir_vacias" se
+    descartan las filas sin texto en esas columnas.
+    """
+    salida = {}
+    for c in tabla["columnas"]:
+        serie = df[c["nombre"]] if c["nombre"] in df else pd.Series(None, index=df.index, dtype=object)
+        tipo = c.get("tipo", "texto")
+        if tipo == "booleano":
+            serie = serie.fillna(False).astype(bool)
+        elif tipo == "numero":
+            serie = pd.to_numeric(serie, errors="coerce").fillna(0).astype(int)
+        else:
+            serie = _texto(serie)
+        salida[c.get("clave", c["nombre"])] = serie
+    out = pd.DataFrame(salida, index=df.index)
+
+    omitir = tabla.get("omitir_vacias")
+    if omitir:
+        con_datos = pd.Series(False, index=df.index)
+        for nombre in omitir:
+            if nombre in df:
+                con_datos |= _texto(df[nombre]).str.strip() != ""
+        out = out[con_datos]
+    return out.to_dict("records")
+
+
+# --- CONTEXTO ---
+
+def _marcas(campo, seleccion):
+    marcas = [{"label": op, "checked": op in seleccion} for op in campo["opciones"]]
+    por_fila = campo.get("por_fila")
+    return [marcas[i:i + por_fila] for i in range(0, len(marcas), por_fila)] if por_fila else marcas
+
+
+def photo_rows(tabla, df):
+    """Posiciones de las filas que admiten fotos según "fotos" de la tabla
+    (por defecto, las marcadas "R")."""
+    spec = tabla.get("fotos")
+    if not spec or spec["columna"] not in df:
+        return []
+    valor = spec.get("valor", "R")
+    return [i for i, x in enumerate(df[spec["columna"]].tolist()) if x == valor]
+
+
+def _anexo_fotos(tabla, df, filas, fotos, anexo):
+    # Agrega al anexo las fotos de las filas rechazadas y marca en cada fila
+    # su número de anexo. Solo si la tabla no descartó filas (omitir_vacias)
+    spec = tabla["fotos"]
+    if len(filas) != len(df):
+        return
+    for i in photo_rows(tabla, df):
+        shas = fotos.get(i, [])[:MAX_FOTOS_ITEM]
+        shas = shas[:max(0, MAX_FOTOS_DOC - sum(len(a["fotos"]) for a in anexo))]
+        if not shas:
+            continue
+        n = len(anexo) + 1
+        filas[i]["anexo"] = n
+        etiqueta = str(df[spec["etiqueta"]].iloc[i]) if spec.get("etiqueta") in df else f"Fila {i + 1}"
+        anexo.append({"n": n, "item": etiqueta, "obs": filas[i].get(spec.get("obs", "")) or "",
+                      "fotos": [photo_uri(sha) for sha in shas]})
+
+
+def build_context(esquema, valores, tablas, firmas, fotos=None):
+    """Contexto de la plantilla a partir de lo ingresado.
+
+    valores: {nombre: valor del widget}, tablas: {nombre: DataFrame editado},
+    firmas: {nombre: data URI o None}, fotos: {tabla: {fila: [sha de
+    core.photos]}}. Las fotos van a "anexo_fotos".
+    """
+    contexto = dict(esquema.get("contexto", {}))
+    anexo = []
+    for campo in fields(esquema):
+        nombre, tipo = campo["nombre"], campo["tipo"]
+        clave = campo.get("clave", nombre)
+        if tipo == "tabla":
+            contexto[clave] = extract_table(campo, tablas[nombre])
+            if campo.get("fotos"):
+                _anexo_fotos(campo, tablas[nombre], contexto[clave], (fotos or {}).get(nombre, {}), anexo)
+        elif tipo == "firma":
+            contexto[clave] = firmas.get(nombre)
+        elif tipo == "marcas":
+            contexto[clave] = _marcas(campo, valores.get(nombre) or [])
+        elif tipo in ("fecha", "hora"):
+            # Vacío si se borró el widget (la vista previa se dibuja igual;
+            # missing_fields no deja generar el PDF así)
+            valor = valores.get(nombre)
+            formato = campo.get("formato", "%d/%m/%Y" if tipo == "fecha" else "%H:%M")
+            contexto[clave] = valor.strftime(formato) if valor is not None else ""
+        else:
+            texto = valores.get(nombre) or ""
+            contexto[clave] = texto.replace("\n", "<br>") if campo.get("saltos_html") else texto
+    if anexo:
+        contexto["anexo_fotos"] = anexo
+    return contexto
+
+
+def missing_fields(esquema, valores):
+    """Etiquetas de los campos requeridos que quedaron vacíos y de las
+    fechas y horas borradas (siempre van en el documento)."""
+    return [c["etiqueta"] for c in fields(esquema)
+            if (c.get("requerido") or c["tipo"] in ("fecha", "hora")) and not valores.get(c["nombre"])]
+
+
+def file_name(esquema, valores):
+    # El patrón usa los valores crudos: {fecha:%d%m%Y} funciona con fechas
+    try:
+        return esquema.get("archivo", "{form}.pdf").format(form=esquema["id"], **valores)
+    except (KeyError, IndexError, ValueError):
+        return f"{esquema['id']}.pdf"
+
+
+def archive_record(esquema, valores, contexto):
+    """Datos para core.archive.store_document según "registro" del esquema."""
+    spec = esquema.get("registro", {})
+    fecha = valores.get(spec["fecha"]) if spec.get("fecha") else None
+    registro = {"form": esquema["id"], "fecha": fecha.isoformat() if fecha else ""}
+    for campo in ("lugar", "trabajador", "id_equipo"):
+        if spec.get(campo):
+            registro[campo] = valores.get(spec[campo]) or ""
+    rechazos = spec.get("rechazos")
+    if rechazos:
+        filas = contexto[rechazos["tabla"]]
+        registro["rechazos"] = sum(1 for f in filas if f.get(rechazos["columna"]) == rechazos.get("valor", "R"))
+    return registro
+
+
+def _resultado(valor):
+    if isinstance(valor, bool):
+        return "Sí" if valor else "No"
+    return str(valor if valor is not None else "").strip()
+
+
+def analytics_rows(esquema, valores, contexto):
+    """Filas de resultados para core.analytics según "analitica" del esquema.
+
+    Cada entrada toma una tabla del contexto (columnas por su clave:
+    "item", "resultado" y opcionales "categoria" y "cantidad") o un campo
+    de "marcas" (una fila por opción, resultado Sí/No y cantidad 1 si se
+    marcó). Sin "cantidad", cada fila de tabla cuenta 1.
+    """
+    filas = []
+    for spec in esquema.get("analitica", []):
+        if "marcas" in spec:
+            campo = next(c for c in fields(esquema, "marcas") if c["nombre"] == spec["marcas"])
+            seleccion = valores.get(spec["marcas"]) or []
+            filas.extend({"tabla": spec["marcas"], "fila": i, "categoria": spec.get("categoria", ""),
+                          "item": op, "resultado": _resultado(op in seleccion), "cantidad": int(op in seleccion)}
+                         for i, op in enumerate(campo["opciones"]))
+            continue
+        for i, f in enumerate(contexto[spec["tabla"]]):
+            cantidad = f.get(spec["cantidad"]) if spec.get("cantidad") else 1
+            filas.append({
+                "tabla": spec["tabla"], "fila": i,
+                "categoria": _resultado(f.get(spec["categoria"])) if spec.get("categoria") else "",
+                "item": _resultado(f.get(spec["item"])),
+                "resultado": _resultado(f.get(spec["resultado"])),
+                "cantidad": int(cantidad or 0),
+            })
+    return filas
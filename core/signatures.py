@@ -0,0 +1,138 @@
+import base64
+import io
+
+import numpy as np
+from PIL import Image
+
+# --- FIRMAS DIGITALES ---
+# El canvas entrega la imagen completa (300x100 RGBA con todo el fondo).
+# Aquí se recorta al trazo y se comprime, o se genera un SVG con los trazos.
+
+PADDING = 4          # px alrededor del trazo al recortar
+PALETTE_COLORS = 8   # niveles de gris en el PNG con paleta
+
+
+def ink_bbox(img_data):
+    """(x0, y0, x1, y1) de la tinta en un arreglo RGBA, o None si está vacío.
+
+    El fondo se toma de la esquina superior izquierda (el canvas se pinta
+    con background_color, o queda transparente). Cada pixel RGBA se compara
+    como un solo uint32, sin recorrer canales.
+    """
+    rgba = np.ascontiguousarray(img_data, dtype=np.uint8)
+    pixeles = rgba.view(np.uint32)[..., 0]
+    mask = pixeles != pixeles[0, 0]
+    filas = np.flatnonzero(mask.any(axis=1))
+    if filas.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    h, w = mask.shape
+    return (
+        max(int(cols[0]) - PADDING, 0), max(int(filas[0]) - PADDING, 0),
+        min(int(cols[-1]) + 1 + PADDING, w), min(int(filas[-1]) + 1 + PADDING, h),
+    )
+
+
+def encode_png(img_data, bits=None):
+    """Recorta al trazo y codifica como PNG pequeño.
+
+    bits=1 produce un PNG de 1 bit (blanco/negro); por defecto se usa una
+    paleta de PALETTE_COLORS grises, que conserva el antialiasing.
+    """
+    bbox = ink_bbox(img_data)
+    if bbox is None:
+        return None
+    x0, y0, x1, y1 = bbox
+    recorte = img_data[y0:y1, x0:x1].astype(np.float32)
+
+    # Aplanar sobre blanco (las celdas de firma del PDF son blancas) y pasar a gris
+    alpha = recorte[..., 3] / 255.0
+    gris = recorte[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    gris = gris * alpha + 255.0 * (1.0 - alpha)
+
+    if bits == 1:
+        im = Image.fromarray(gris > 160)
+    else:
+        # Cuantización uniforme a PALETTE_COLORS grises, sin pasar por Image.quantize
+        niveles = np.rint(gris * ((PALETTE_COLORS - 1) / 255.0)).astype(np.uint8)
+        im = Image.fromarray(niveles)
+        paleta = np.linspace(0, 255, PALETTE_COLORS).astype(np.uint8)
+        im.putpalette(np.repeat(paleta, 3).tobytes())  # L -> P con paleta de grises
+
+    buffered = io.BytesIO()
+    im.save(buffered, format="PNG", bits=4 if bits is None else 1)
+    return buffered.getvalue()
+
+
+def _fmt(v):
+    return f"{v:.1f}".rstrip("0").rstrip(".")
+
+
+def encode_svg(json_data):
+    """SVG con los trazos del canvas (objetos "path" de Fabric.js).
+
+    Las coordenadas se redondean a pixeles del canvas y se escriben
+    relativas al punto anterior (m/l/q), que es lo que más reduce el tamaño.
+    """
+    objetos = [o for o in (json_data or {}).get("objects", []) if o.get("type") == "path" and o.get("path")]
+    if not objetos:
+        return None
+
+    paths = []
+    xs, ys = [], []
+    ancho_max = 0
+    for obj in objetos:
+        partes = []
+        cx = cy = 0
+        for cmd in obj["path"]:
+            nums = [round(n) for n in cmd[1:]]
+            if not nums:
+                partes.append(cmd[0])
+                continue
+            xs.extend(nums[0::2])
+            ys.extend(nums[1::2])
+            rel = []
+            for i in range(0, len(nums), 2):
+                rel += [nums[i] - cx, nums[i + 1] - cy]
+            cx, cy = nums[-2], nums[-1]
+            partes.append(cmd[0].lower() + " ".join(str(n) for n in rel))
+        ancho = obj.get("strokeWidth", 2)
+        ancho_max = max(ancho_max, ancho)
+        paths.append(
+            f'<path d="{"".join(partes)}" stroke="{obj.get("stroke") or "#000"}" '
+            f'stroke-width="{_fmt(ancho)}"/>'
+        )
+
+    pad = ancho_max + 1
+    x0, y0 = min(xs) - pad, min(ys) - pad
+    w, h = max(xs) + pad - x0, max(ys) + pad - y0
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{_fmt(x0)} {_fmt(y0)} {_fmt(w)} {_fmt(h)}" '
+        f'width="{_fmt(w)}" height="{_fmt(h)}">'
+        f'<g fill="none" stroke-linecap="round" stroke-linejoin="round">{"".join(paths)}</g></svg>'
+    )
+    return svg.encode("utf-8")
+
+
+def process_signature(canvas_result, formato="svg"):
+    """Data URI de la firma, o None si el canvas está vacío.
+
+    formato: "svg" (vectorial, desde json_data), "png" (paleta de grises)
+    o "png1" (1 bit). Si no hay trazos en json_data se usa el PNG.
+    """
+    if formato == "svg":
+        svg = encode_svg(canvas_result.json_data)
+        if svg is not None:
+            return f"data:image/svg+xml;base64,{base64.b64encode(svg).decode()}"
+
+    try:
+        img_data = canvas_result.image_data
+    except RuntimeError:
+        img_data = None  # El canvas no devolvió imagen
+    if img_data is None:
+        return None
+
+    png = encode_png(img_data, bits=1 if formato == "png1" else None)
+    if png is None:
+        return None
+    return f"data:image/png;base64,{base64.b64encode(png).decode()}"
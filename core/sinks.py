@@ -0,0 +1,323 @@
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from core.archive import document_path
+from core.config import STATE_DIR
+from core.metrics import record_for_key
+
+# --- DESTINOS DE ARCHIVO ---
+# Alternativa al correo con "ROBOT DRIVE LO DETECTARÁ": los PDF ya
+# archivados (core.archive) se suben directo a una carpeta o a un bucket
+# S3 compatible (AWS, MinIO), ordenados por formulario y fecha. Se sube
+# en streaming desde el archivo local y se verifica el sha256.
+#
+# Configuración ([storage] en secrets o variables de entorno):
+#   tipo = "local" | "s3"
+#   carpeta = "/mnt/drive/SIGOP"                 (local)
+#   bucket, endpoint_url, region, access_key, secret_key, prefijo   (s3)
+#   ruta = "{form}/{anio}/{mes}/{archivo}"
+#   hilos = 4                 subidas en paralelo
+#   reemplaza_correo = false  si es true, las páginas no envían el correo
+
+SINK_DB = os.path.join(STATE_DIR, "subidas.db")
+RUTA_DEFAULT = "{form}/{anio}/{mes}/{archivo}"
+HILOS_DEFAULT = 4
+CHUNK = 8 * 1024 * 1024  # tamaño de parte del multipart y de copia local
+MAX_INTENTOS = 8
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+
+# Estados de una subida
+PENDIENTE = "pendiente"
+SUBIDO = "subido"
+FALLIDO = "fallido"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subidas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sha256 TEXT NOT NULL,
+    ruta TEXT NOT NULL,
+    clave TEXT,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento REAL NOT NULL,
+    ultimo_error TEXT,
+    uri TEXT,
+    creado REAL NOT NULL,
+    subido REAL,
+    UNIQUE (sha256, ruta)
+);
+CREATE INDEX IF NOT EXISTS idx_subidas_cola ON subidas (estado, proximo_intento);
+"""
+
+
+class ChecksumError(Exception):
+    pass
+
+
+def settings_from_env():
+    """[storage] desde RMC_SINK, RMC_SINK_DIR, RMC_S3_*; None si no hay destino."""
+    tipo = os.environ.get("RMC_SINK", "")
+    if not tipo:
+        return None
+    return {
+        "tipo": tipo,
+        "carpeta": os.environ.get("RMC_SINK_DIR", ""),
+        "bucket": os.environ.get("RMC_S3_BUCKET", ""),
+        "endpoint_url": os.environ.get("RMC_S3_ENDPOINT") or None,
+        "prefijo": os.environ.get("RMC_S3_PREFIX", ""),
+        "ruta": os.environ.get("RMC_SINK_RUTA", RUTA_DEFAULT),
+        "hilos": int(os.environ.get("RMC_SINK_HILOS", HILOS_DEFAULT)),
+        "reemplaza_correo": os.environ.get("RMC_SINK_REEMPLAZA_CORREO") == "1",
+    }
+
+
+def route(settings, form, fecha, archivo):
+    """Ruta del documento en el destino según el patrón "ruta"."""
+    try:
+        dia = date.fromisoformat(fecha) if fecha else date.today()
+    except ValueError:
+        dia = date.today()
+    ruta = settings.get("ruta", RUTA_DEFAULT).format(
+        form=form, archivo=archivo, fecha=dia.isoformat(), anio=f"{dia:%Y}", mes=f"{dia:%m}", dia=f"{dia:%d}")
+    # Sin "..", barras invertidas ni caracteres que Drive/Windows rechazan
+    partes = [re.sub(r'[\\:*?"<>|]+', "-", p).strip() for p in ruta.split("/")]
+    return "/".join(p for p in partes if p and p not in (".", ".."))
+
+
+def _sha256_archivo(fileobj):
+    h = hashlib.sha256()
+    for bloque in iter(lambda: fileobj.read(CHUNK), b""):
+        h.update(bloque)
+    return h.hexdigest()
+
+
+# --- BACKENDS ---
+
+class LocalSink:
+    """Carpeta local o montada (Drive para escritorio, SMB, NFS)."""
+
+    def __init__(self, carpeta):
+        if not carpeta:
+            raise ValueError("storage.carpeta es obligatorio para tipo='local'")
+        self.carpeta = carpeta
+
+    def put(self, ruta, fileobj, sha256):
+        destino = os.path.join(self.carpeta, *ruta.split("/"))
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Se copia a un temporal hasheando en el camino y se renombra solo si coincide
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".part")
+        try:
+            h = hashlib.sha256()
+            with os.fdopen(fd, "wb") as out:
+                for bloque in iter(lambda: fileobj.read(CHUNK), b""):
+                    h.update(bloque)
+                    out.write(bloque)
+            if h.hexdigest() != sha256:
+                raise ChecksumError(f"{ruta}: sha256 {h.hexdigest()} != {sha256}")
+            os.replace(tmp, destino)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return destino
+
+
+class S3Sink:
+    """Bucket S3 o compatible (MinIO con endpoint_url="http://localhost:9000").
+
+    Requiere boto3 (pip install boto3). Sobre CHUNK bytes la subida es
+    multipart, con las partes en paralelo; S3 valida el SHA-256 de cada
+    parte y el sha256 del documento queda en la metadata, que se compara
+    después con un HEAD.
+    """
+
+    def __init__(self, bucket, endpoint_url=None, region=None, access_key=None, secret_key=None, prefijo="",
+                 hilos=HILOS_DEFAULT):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+        except ImportError as e:
+            raise RuntimeError("storage.tipo='s3' requiere boto3 (pip install boto3)") from e
+        if not bucket:
+            raise ValueError("storage.bucket es obligatorio para tipo='s3'")
+        self.bucket = bucket
+        self.prefijo = prefijo.strip("/")
+        # Un cliente por destino: es thread-safe y reutiliza las conexiones
+        self.client = boto3.session.Session().client(
+            "s3", endpoint_url=endpoint_url, region_name=region,
+            aws_access_key_id=access_key, aws_secret_access_key=secret_key,
+        )
+        self.transfer = TransferConfig(multipart_threshold=CHUNK, multipart_chunksize=CHUNK,
+                                       max_concurrency=hilos)
+
+    def put(self, ruta, fileobj, sha256):
+        key = f"{self.prefijo}/{ruta}" if self.prefijo else ruta
+        self.client.upload_fileobj(
+            fileobj, self.bucket, key, Config=self.transfer,
+            ExtraArgs={"ContentType": "application/pdf", "ChecksumAlgorithm": "SHA256",
+                       "Metadata": {"sha256": sha256}},
+        )
+        cabecera = self.client.head_object(Bucket=self.bucket, Key=key)
+        tamano = fileobj.seek(0, os.SEEK_END)
+        if cabecera["Metadata"].get("sha256") != sha256 or cabecera["ContentLength"] != tamano:
+            raise ChecksumError(f"s3://{self.bucket}/{key}: el objeto subido no coincide")
+        return f"s3://{self.bucket}/{key}"
+
+
+def make_sink(settings):
+    tipo = settings.get("tipo")
+    if tipo == "local":
+        return LocalSink(settings.get("carpeta"))
+    if tipo == "s3":
+        return S3Sink(settings.get("bucket"), settings.get("endpoint_url"), settings.get("region"),
+                      settings.get("access_key"), settings.get("secret_key"), settings.get("prefijo", ""),
+                      int(settings.get("hilos", HILOS_DEFAULT)))
+    raise ValueError(f"storage.tipo desconocido: {tipo!r} (use 'local' o 's3')")
+
+
+def upload_file(sink, ruta, path, sha256=None):
+    """Sube un archivo en streaming y devuelve su URI en el destino."""
+    with open(path, "rb") as f:
+        if sha256 is None:
+            sha256 = _sha256_archivo(f)
+            f.seek(0)
+        return sink.put(ruta, f, sha256)
+
+
+def upload_many(sink, archivos, hilos=HILOS_DEFAULT):
+    """Sube [(ruta, path)] en paralelo. Devuelve [(ruta, uri o None, error o None)] en el mismo orden."""
+    def subir(item):
+        ruta, path = item
+        try:
+            return ruta, upload_file(sink, ruta, path), None
+        except Exception as e:
+            return ruta, None, f"{type(e).__name__}: {e}"
+
+    with ThreadPoolExecutor(max_workers=hilos) as ex:
+        return list(ex.map(subir, archivos))
+
+
+# --- COLA DE SUBIDAS ---
+# Igual que core.outbox: la cola vive en SQLite (sobrevive a reinicios) y
+# un hilo por proceso la vacía apenas se encola algo, sin esperar a un
+# sondeo. El PDF no se copia a la cola: se lee del archivo local.
+
+def _connect():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    conn = sqlite3.connect(SINK_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue_upload(sha256, ruta, clave=None):
+    """Encola la subida del documento archivado y despierta al uploader."""
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO subidas (sha256, ruta, clave, proximo_intento, creado) VALUES (?, ?, ?, ?, ?)",
+            (sha256, ruta, clave, now, now),
+        )
+    _despertar.set()
+
+
+def upload_status(sha256):
+    """[{"ruta", "estado", "uri", "ultimo_error"}] de las subidas del documento."""
+    with _connect() as conn:
+        filas = conn.execute(
+            "SELECT ruta, estado, uri, ultimo_error FROM subidas WHERE sha256 = ? ORDER BY id", (sha256,)
+        ).fetchall()
+    return [dict(zip(("ruta", "estado", "uri", "ultimo_error"), f)) for f in filas]
+
+
+def _backoff(intentos):
+    return min(BACKOFF_BASE * 2 ** (intentos - 1), BACKOFF_MAX)
+
+
+def upload_pending(sink, hilos=HILOS_DEFAULT, limit=50):
+    """Sube en paralelo un lote de la cola. Devuelve la cantidad procesada."""
+    with _connect() as conn:
+        lote = conn.execute(
+            "SELECT id, sha256, ruta, clave, intentos FROM subidas"
+            " WHERE estado = ? AND proximo_intento <= ? ORDER BY id LIMIT ?",
+            (PENDIENTE, time.time(), limit),
+        ).fetchall()
+
+    def subir(fila):
+        subida_id, sha256, ruta, clave, intentos = fila
+        t0 = time.perf_counter()
+        try:
+            uri = upload_file(sink, ruta, document_path(sha256), sha256)
+        except Exception as e:
+            intentos += 1
+            estado = FALLIDO if intentos >= MAX_INTENTOS or isinstance(e, FileNotFoundError) else PENDIENTE
+            with _connect() as conn:
+                conn.execute(
+                    "UPDATE subidas SET estado = ?, intentos = ?, proximo_intento = ?, ultimo_error = ? WHERE id = ?",
+                    (estado, intentos, time.time() + _backoff(intentos), f"{type(e).__name__}: {e}", subida_id),
+                )
+            return
+        with _connect() as conn:
+            conn.execute(
+                "UPDATE subidas SET estado = ?, intentos = ?, uri = ?, subido = ?, ultimo_error = NULL WHERE id = ?",
+                (SUBIDO, intentos + 1, uri, time.time(), subida_id),
+            )
+        if clave:
+            record_for_key(clave, {"subida": time.perf_counter() - t0})
+
+    with ThreadPoolExecutor(max_workers=hilos) as ex:
+        list(ex.map(subir, lote))
+    return len(lote)
+
+
+_despertar = threading.Event()
+_uploader_lock = threading.Lock()
+_uploader = None
+
+
+class SinkUploader(threading.Thread):
+
+    def __init__(self, settings, poll_interval=60):
+        super().__init__(name="rmc-subidas", daemon=True)
+        self.settings = settings
+        self.poll_interval = poll_interval  # solo para los reintentos con backoff
+        self.sink = make_sink(settings)
+        self._detener = threading.Event()
+
+    def run(self):
+        hilos = int(self.settings.get("hilos", HILOS_DEFAULT))
+        while not self._detener.is_set():
+            _despertar.clear()
+            try:
+                procesados = upload_pending(self.sink, hilos)
+            except sqlite3.Error:
+                procesados = 0
+            if procesados:
+                continue
+            _despertar.wait(self.poll_interval)
+
+    def stop(self):
+        self._detener.set()
+        _despertar.set()
+
+
+def start_uploader(settings):
+    """Arranca (una sola vez por proceso) el hilo que sube la cola."""
+    global _uploader
+    settings = dict(settings)
+    with _uploader_lock:
+        if _uploader is not None and _uploader.is_alive():
+            if _uploader.settings == settings:
+                return _uploader
+            _uploader.stop()
+        _uploader = SinkUploader(settings)
+        _uploader.start()
+        return _uploader
@@ -0,0 +1,187 @@
+import functools
+import os
+import time
+
+import streamlit as st
+
+from core.archive import store_document
+from core.jobs import ERROR, LISTO, job_info, job_result, submit_render
+from core.metrics import record, start_metrics_server
+from core.outbox import enqueue, start_sender
+from core.sinks import enqueue_upload, route, settings_from_env, start_uploader
+
+# Ayudas de Streamlit compartidas por las páginas. Junto con
+# core.form_page, son los únicos módulos de core/ que importan streamlit.
+
+
+def start_pdf_job(state_key, template_name, context, **meta):
+    """Encola el render y guarda el id (y datos como el nombre de archivo)
+    en session_state para seguirlo en los próximos reruns.
+
+    Si meta incluye registro=dict(form, fecha, lugar, ...), el PDF se
+    guarda en core.archive cuando está listo, y las filas de analitica=[...]
+    en core.analytics. Con traza=core.metrics.Traza se registran los
+    tiempos de cada etapa del documento.
+    """
+    start_metrics_server()
+    st.session_state[state_key] = submit_render(template_name, context)
+    st.session_state[f"{state_key}_meta"] = meta
+
+
+def pdf_job(state_key, poll_interval=1.0):
+    """Sigue el trabajo guardado en session_state[state_key].
+
+    Mientras se procesa muestra el progreso en un fragmento que se refresca
+    solo, sin bloquear el resto de la página. Cuando termina devuelve
+    (pdf_bytes, meta, nuevo): `nuevo` es True solo en el primer rerun que
+    recibe el resultado, meta["clave"] identifica el contenido del documento
+    (ver core.memo.deliver_once) y, con registro, meta["destino"] es la ruta
+    encolada en core.sinks (None si no hay destino o no se pudo iniciar).
+    """
+    job_id = st.session_state.get(state_key)
+    if job_id is None:
+        return None
+
+    info = job_info(job_id)
+    if info is None:
+        # Venció el TTL: se olvida el trabajo
+        del st.session_state[state_key]
+        return None
+
+    if info["estado"] == ERROR:
+        del st.session_state[state_key]
+        try:
+            job_result(job_id)
+        except Exception as e:
+            st.error(f"Error al generar PDF: {e}")
+        return None
+
+    if info["estado"] == LISTO:
+        entregado_key = f"{state_key}_entregado"
+        nuevo = st.session_state.get(entregado_key) != job_id
+        st.session_state[entregado_key] = job_id
+        meta = dict(st.session_state.get(f"{state_key}_meta", {}), clave=info["clave"])
+        pdf_bytes = job_result(job_id)
+        traza = meta.get("traza")
+        if nuevo and meta.get("registro"):
+            # Cada documento generado queda en el archivo local indexado
+            t0 = time.perf_counter()
+            sha = store_document(pdf_bytes, archivo=meta.get("filename", ""), **meta["registro"])
+            # Filas de resultados para la página de tendencias (pyarrow se carga recién acá)
+            from core.analytics import append_results
+
+            append_results(sha, meta["registro"], meta.get("analitica"))
+            if traza is not None:
+                traza.add("archivo", time.perf_counter() - t0)
+            # La ruta en el destino (o None si no se pudo encolar) queda en
+            # meta["destino"] también para los reruns siguientes
+            meta["destino"] = st.session_state[f"{state_key}_meta"]["destino"] = upload_archived(
+                sha, meta["registro"]["form"], meta["registro"].get("fecha"),
+                meta.get("filename") or f"{sha}.pdf", clave=info["clave"])
+        if nuevo and traza is not None:
+            for etapa, segundos in info["tiempos"].items():
+                traza.add(etapa, segundos)
+            traza.add("total", info["segundos"])
+            traza.bytes["pdf"] = len(pdf_bytes)
+            traza.emit(clave=info["clave"], cache=not info["tiempos"])
+        return pdf_bytes, meta, nuevo
+
+    @st.fragment(run_every=poll_interval)
+    def _progreso():
+        actual = job_info(job_id)
+        if actual is None or actual["estado"] in (LISTO, ERROR):
+            st.rerun()  # Rerun completo: la página recoge el resultado
+        if actual["posicion"]:
+            # Sin cupo de render: espera su turno en vez de cargar más el servidor
+            st.info(f"🕒 En cola: {actual['posicion'] - 1} documento(s) antes que el tuyo "
+                    f"({actual['segundos']:.0f}s). Puedes seguir editando el formulario.")
+        else:
+            st.info(f"⏳ Generando PDF ({actual['estado']}, {actual['segundos']:.0f}s)... "
+                    "Puedes seguir editando el formulario.")
+
+    _progreso()
+    return None
+
+
+def storage_settings():
+    """[storage] de los secrets (o RMC_SINK y compañía); None si no hay destino."""
+    try:
+        return dict(st.secrets["storage"])
+    except (FileNotFoundError, KeyError):
+        return settings_from_env()
+
+
+def upload_archived(sha, form, fecha, filename, clave=None):
+    """Encola la subida del documento archivado al destino de core.sinks.
+
+    Devuelve la ruta en el destino, o None si no hay destino configurado o
+    no se pudo iniciar (p. ej. falta boto3).
+    """
+    settings = storage_settings()
+    if not settings:
+        return None
+    try:
+        start_uploader(settings)
+    except (RuntimeError, ValueError) as e:
+        st.warning(f"⚠️ No se pudo iniciar la subida al archivo documental: {e}")
+        return None
+    ruta = route(settings, form, fecha, filename)
+    enqueue_upload(sha, ruta, clave=clave)
+    return ruta
+
+
+def queue_email(pdf_bytes, filename, subject, body, key=None):
+    """Deja el correo en el outbox y vuelve de inmediato.
+
+    El envío real (conexión SMTP reutilizada, lotes y reintentos) lo hace
+    el hilo de core.outbox con los secretos de [email].
+    """
+    try:
+        settings = dict(st.secrets["email"])
+    except (FileNotFoundError, KeyError):
+        st.error("⚠️ No se encontraron los secretos de correo. Configúralos en .streamlit/secrets.toml o en la nube.")
+        return False
+    start_sender(settings)
+    enqueue(subject, body, pdf_bytes, filename, key=key)
+    return True
+
+
+# --- PERFIL DE RERUNS ---
+# Con RMC_PERFIL=1 (o ?perfil=1 en la URL) se mide cada rerun completo de
+# la página y cada rerun de sus fragmentos; los tiempos se muestran bajo
+# cada sección y quedan en core.metrics (tipo "rerun").
+
+def perfil_activo():
+    return os.environ.get("RMC_PERFIL") == "1" or st.query_params.get("perfil") == "1"
+
+
+def _registrar_rerun(page, form, nombre, segundos):
+    record({"tipo": "rerun", "page": page, "form": form, "etapas": {f"rerun:{nombre}": segundos}})
+    st.caption(f"⏱️ {nombre}: {segundos * 1000:.0f} ms")
+
+
+def timed_fragment(page, form, nombre):
+    """Como st.fragment: la sección se vuelve a ejecutar sola al interactuar
+    con sus widgets. Con el perfil activo, además mide cada ejecución."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not perfil_activo():
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            resultado = fn(*args, **kwargs)
+            _registrar_rerun(page, form, nombre, time.perf_counter() - t0)
+            return resultado
+        return st.fragment(wrapper)
+    return decorador
+
+
+def rerun_start():
+    """Marca el inicio de un rerun completo (llamar al comienzo de la página)."""
+    return time.perf_counter()
+
+
+def rerun_end(page, form, t0):
+    """Cierra la medición de rerun_start() si el perfil está activo."""
+    if perfil_activo():
+        _registrar_rerun(page, form, "página", time.perf_counter() - t0)
@@ -0,0 +1,77 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+from core.archive import search, store_document
+from core.bundle import build_bundle, form_label
+from core.memo import deliver_once
+from core.ui import queue_email, upload_archived
+
+st.set_page_config(page_title="Paquete de Turno", page_icon="📦", layout="wide")
+
+st.title("📦 Paquete de Turno")
+st.markdown("Une los documentos ya generados de un turno en **un solo PDF** con índice y marcadores.")
+
+# --- DOCUMENTOS DEL TURNO ---
+c1, c2 = st.columns(2)
+fecha = c1.date_input("Fecha del turno", date.today())
+lugar = c2.text_input("Proyecto / Lugar (opcional)").strip()
+
+documentos, cursor = [], None
+while True:
+    # Un turno son decenas de documentos: se leen todas las páginas del archivo
+    filas, cursor = search(cursor=cursor, limit=200, desde=fecha.isoformat(), hasta=fecha.isoformat(), lugar=lugar)
+    documentos += [f for f in filas if f["form"] != "paquete"]
+    if cursor is None:
+        break
+
+if not documentos:
+    st.info("No hay documentos archivados para ese turno.")
+    st.stop()
+
+tabla = pd.DataFrame({
+    "Incluir": True,
+    "Formulario": [form_label(d["form"]) for d in documentos],
+    "Trabajador": [d["trabajador"] for d in documentos],
+    "Equipo": [d["id_equipo"] for d in documentos],
+    "Lugar": [d["lugar"] for d in documentos],
+    "Archivo": [d["archivo"] for d in documentos],
+    "KB": [round(d["bytes"] / 1024) for d in documentos],
+})
+editada = st.data_editor(tabla, disabled=list(tabla.columns[1:]), hide_index=True, use_container_width=True)
+elegidos = [d for d, incluir in zip(documentos, editada["Incluir"]) if incluir]
+
+# --- ARMAR PAQUETE ---
+titulo = f"Turno {fecha.strftime('%d/%m/%Y')}" + (f" - {lugar}" if lugar else "")
+if st.button("📦 Armar paquete", type="primary", disabled=not elegidos):
+    with st.spinner("Uniendo documentos..."):
+        pdf = build_bundle(elegidos, titulo)
+    nombre = f"Paquete_{lugar or 'Turno'}_{fecha.isoformat()}.pdf"
+    sha = store_document(pdf, "paquete", fecha.isoformat(), nombre, lugar=lugar)
+    upload_archived(sha, "paquete", fecha.isoformat(), nombre)
+    st.session_state["paquete"] = dict(pdf=pdf, nombre=nombre, sha=sha, partes=sum(d["bytes"] for d in elegidos),
+                                       n=len(elegidos))
+
+paquete = st.session_state.get("paquete")
+if paquete:
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Documentos", paquete["n"])
+    m2.metric("Suma de los PDF", f"{paquete['partes'] / 1024:,.0f} KB")
+    m3.metric("Paquete", f"{len(paquete['pdf']) / 1024:,.0f} KB",
+              f"{len(paquete['pdf']) / paquete['partes'] - 1:.0%}" if paquete["partes"] else None, delta_color="inverse")
+
+    d1, d2 = st.columns(2)
+    d1.download_button("⬇️ Descargar paquete", paquete["pdf"], file_name=paquete["nombre"], mime="application/pdf")
+    if d2.button("✉️ Enviar paquete a Control Documental"):
+        enviado = deliver_once(
+            paquete["sha"],
+            lambda: queue_email(paquete["pdf"], paquete["nombre"], f"PAQUETE TURNO: {titulo}",
+                                f"Adjunto paquete del turno con {paquete['n']} documentos.\n\nAtte,\nSistema Digital RMC",
+                                key=paquete["sha"]),
+            paquete["nombre"],
+        )
+        if enviado is None:
+            st.info("ℹ️ Este paquete ya había sido enviado; no se envía de nuevo.")
+        elif enviado:
+            st.success("✅ Paquete en cola de envío.")
+        else:
+            st.warning("⚠️ No se pudo enviar el paquete por correo. (Verifica los Secrets)")
@@ -0,0 +1,126 @@
+import streamlit as st
+import plotly.express as px
+from core.analytics import document_counts, load_aggregates, load_rows
+from core.schema import list_schemas
+
+st.set_page_config(page_title="Tendencias", page_icon="📈", layout="wide")
+
+st.title("📈 Tendencias de Inspecciones")
+st.markdown("Resultados ítem por ítem de cada documento generado. Los totales por mes se actualizan al "
+            "generar cada documento, así que la página no recorre el historial completo.")
+
+
+# Los totales se releen como mucho cada minuto por sesión de servidor
+@st.cache_data(ttl=60, show_spinner=False)
+def _documentos():
+    return document_counts()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _agregados(form):
+    return load_aggregates(form)
+
+
+def tasa_rechazo(df, por):
+    """Ítems revisados (A + R), rechazados y % de rechazo agrupados por `por`."""
+    t = (df[df["resultado"].isin(["A", "R"])]
+         .pivot_table(index=por, columns="resultado", values="n", aggfunc="sum", fill_value=0)
+         .reindex(columns=["A", "R"], fill_value=0))
+    t["revisados"] = t["A"] + t["R"]
+    t["tasa"] = t["R"] / t["revisados"] * 100
+    return t.rename(columns={"R": "rechazados"}).drop(columns="A").reset_index()
+
+
+# --- DATOS ---
+documentos = _documentos()
+if documentos.empty:
+    st.info("Todavía no hay resultados: genera algún checklist, AST o entrega de EPP.")
+    st.stop()
+
+titulos = list_schemas()
+c1, c2, c3 = st.columns([1, 1, 2])
+form = c1.selectbox("Formulario", sorted(documentos["form"].unique()), format_func=lambda f: titulos.get(f, f))
+df = _agregados(form)
+docs = documentos[documentos["form"] == form]
+
+lugares = c2.multiselect("Proyecto / Lugar", sorted(l for l in docs["lugar"].unique() if l))
+meses = sorted(docs["mes"].unique())
+if len(meses) > 1:
+    desde, hasta = c3.select_slider("Meses", meses, value=(meses[max(0, len(meses) - 12)], meses[-1]))
+else:
+    desde = hasta = meses[0]
+
+df = df[df["mes"].between(desde, hasta)]
+docs = docs[docs["mes"].between(desde, hasta)]
+if lugares:
+    df = df[df["lugar"].isin(lugares)]
+    docs = docs[docs["lugar"].isin(lugares)]
+if df.empty:
+    st.info("Sin resultados para los filtros seleccionados.")
+    st.stop()
+
+# --- APROBADO / RECHAZADO (checklists) ---
+if df["resultado"].isin(["A", "R"]).any():
+    total = tasa_rechazo(df.assign(todo=""), "todo").iloc[0]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Documentos", int(docs["documentos"].sum()))
+    m2.metric("Ítems revisados", int(total["revisados"]))
+    m3.metric("Rechazados", int(total["rechazados"]))
+    m4.metric("Tasa de rechazo", f"{total['tasa']:.1f}%")
+
+    st.subheader("% de rechazo por mes")
+    por_mes = tasa_rechazo(df, ["mes", "lugar"] if len(lugares) > 1 else "mes")
+    fig = px.line(por_mes, x="mes", y="tasa", color="lugar" if len(lugares) > 1 else None, markers=True,
+                  hover_data=["revisados", "rechazados"], labels={"tasa": "% rechazo"})
+    st.plotly_chart(fig, use_container_width=True)
+
+    g1, g2 = st.columns(2)
+    if (df["categoria"] != "").any():
+        g1.subheader("% de rechazo por categoría")
+        por_categoria = tasa_rechazo(df, "categoria").sort_values("tasa")
+        g1.plotly_chart(px.bar(por_categoria, x="tasa", y="categoria", orientation="h",
+                               hover_data=["revisados", "rechazados"], labels={"tasa": "% rechazo"}),
+                        use_container_width=True)
+    if (df["lugar"] != "").any():
+        g2.subheader("% de rechazo por proyecto")
+        por_lugar = tasa_rechazo(df[df["lugar"] != ""], "lugar").sort_values("tasa")
+        g2.plotly_chart(px.bar(por_lugar, x="tasa", y="lugar", orientation="h",
+                               hover_data=["revisados", "rechazados"], labels={"tasa": "% rechazo"}),
+                        use_container_width=True)
+
+    st.subheader("Ítems más rechazados")
+    por_item = tasa_rechazo(df, ["categoria", "item"] if (df["categoria"] != "").any() else "item")
+    st.dataframe(
+        por_item[por_item["rechazados"] > 0].sort_values("rechazados", ascending=False).head(20),
+        column_config={"tasa": st.column_config.NumberColumn("% rechazo", format="%.1f")},
+        hide_index=True, use_container_width=True,
+    )
+
+# --- MARCAS Y CANTIDADES (riesgos de la AST, entregas de EPP) ---
+else:
+    m1, m2 = st.columns(2)
+    m1.metric("Documentos", int(docs["documentos"].sum()))
+    m2.metric("Cantidad total", int(df["cantidad"].sum()))
+
+    por_item = df.groupby("item", as_index=False)["cantidad"].sum().sort_values("cantidad", ascending=False)
+    principales = por_item["item"].head(8).tolist()
+
+    st.subheader("Cantidad por mes (8 ítems principales)")
+    por_mes = df[df["item"].isin(principales)].groupby(["mes", "item"], as_index=False)["cantidad"].sum()
+    st.plotly_chart(px.line(por_mes, x="mes", y="cantidad", color="item", markers=True), use_container_width=True)
+
+    st.subheader("Cantidad por ítem")
+    st.plotly_chart(px.bar(por_item.head(20).sort_values("cantidad"), x="cantidad", y="item", orientation="h"),
+                    use_container_width=True)
+
+# --- DETALLE ---
+# Las filas de cada documento están en parquet por mes: solo se leen los del período
+with st.expander("Detalle por documento del período"):
+    if st.button("Cargar detalle"):
+        detalle = load_rows(desde, hasta, form)
+        if lugares:
+            detalle = detalle[detalle["lugar"].isin(lugares)]
+        st.dataframe(detalle.drop(columns=["sha256", "mes", "tabla", "fila"]), hide_index=True,
+                     use_container_width=True)
+        st.download_button("⬇️ Descargar CSV", detalle.to_csv(index=False).encode("utf-8"),
+                           file_name=f"resultados_{form}_{desde}_{hasta}.csv", mime="text/csv")
@@ -0,0 +1,63 @@
+import streamlit as st
+import plotly.express as px
+from core.plans import compliance_by_activity, compliance_by_worker, load_plans
+
+st.set_page_config(page_title="Planes de Prevención", page_icon="📊", layout="wide")
+
+st.title("📊 Cumplimiento Planes Personalizados de Prevención")
+st.markdown("Fuente: planillas `data/Plan_*.xlsx` (se leen una vez y quedan en caché hasta que cambian).")
+
+# --- DATOS ---
+df = load_plans()
+if df.empty:
+    st.info("No hay planillas de plan de prevención en la carpeta data/.")
+    st.stop()
+
+periodos = (
+    df[["anio", "mes_num", "mes"]].drop_duplicates()
+    .sort_values(["anio", "mes_num"], ascending=False)
+)
+etiquetas = [f"{r.mes} {r.anio}" for r in periodos.itertuples()]
+c1, c2 = st.columns(2)
+periodo = c1.selectbox("Período", etiquetas)
+cargos = c2.multiselect("Cargo", sorted(df["cargo"].unique()))
+
+sel = periodos.iloc[etiquetas.index(periodo)]
+df_mes = df[(df["anio"] == sel["anio"]) & (df["mes_num"] == sel["mes_num"])]
+if cargos:
+    df_mes = df_mes[df_mes["cargo"].isin(cargos)]
+
+por_trabajador = compliance_by_worker(df_mes)
+por_actividad = compliance_by_activity(df_mes)
+
+# --- RESUMEN ---
+m1, m2, m3 = st.columns(3)
+total_asignado = por_trabajador["asignada"].sum()
+m1.metric("Trabajadores", len(por_trabajador))
+m2.metric("Actividades asignadas", int(total_asignado))
+m3.metric("Cumplimiento global",
+          f"{por_trabajador['realizada'].sum() / total_asignado:.0%}" if total_asignado else "—")
+
+# --- POR TRABAJADOR ---
+st.subheader("Cumplimiento por trabajador")
+fig = px.bar(
+    por_trabajador.sort_values("cumplimiento"), x="cumplimiento", y="trabajador",
+    orientation="h", hover_data=["cargo", "asignada", "realizada"], range_x=[0, 1],
+)
+fig.update_layout(xaxis_tickformat=".0%", height=max(300, 40 * len(por_trabajador)))
+st.plotly_chart(fig, use_container_width=True)
+
+# --- POR ACTIVIDAD ---
+st.subheader("Cumplimiento por actividad")
+st.dataframe(
+    por_actividad[["actividad", "asignada", "realizada", "cumplimiento"]],
+    column_config={"cumplimiento": st.column_config.ProgressColumn("Cumplimiento", min_value=0, max_value=1, format="percent")},
+    use_container_width=True, hide_index=True,
+)
+
+# --- DETALLE ---
+with st.expander("Detalle de actividades (incluye ocasionales)"):
+    st.dataframe(
+        df_mes[["trabajador", "tipo", "n", "actividad", "asignada", "realizada", "medio"]],
+        use_container_width=True, hide_index=True,
+    )
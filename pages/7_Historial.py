@@ -0,0 +1,76 @@
+import streamlit as st
+from datetime import date, timedelta
+from core.archive import PAGE_SIZE, count, last_inspection, read_document, search
+from core.schema import list_schemas
+
+st.set_page_config(page_title="Historial de Documentos", page_icon="🗂️", layout="wide")
+
+st.title("🗂️ Historial de Documentos Generados")
+
+# Todos los formularios de schemas/, también los agregados después
+titulos = list_schemas()
+
+# --- FILTROS ---
+c1, c2, c3, c4 = st.columns(4)
+form = c1.selectbox("Formulario", [None, *titulos], format_func=lambda f: "Todos" if f is None else titulos[f])
+id_equipo = c2.text_input("ID Equipo / Código Arnés").strip()
+lugar = c3.text_input("Proyecto / Lugar").strip()
+trabajador = c4.text_input("Trabajador / Inspector").strip()
+
+c5, c6 = st.columns([2, 1])
+rango = c5.date_input("Rango de fechas", (date.today() - timedelta(days=365), date.today()))
+solo_rechazos = c6.checkbox("Solo con ítems rechazados (R)")
+
+filtros = dict(form=form, id_equipo=id_equipo, lugar=lugar, trabajador=trabajador, solo_rechazos=solo_rechazos)
+if isinstance(rango, tuple) and len(rango) == 2:
+    filtros.update(desde=rango[0].isoformat(), hasta=rango[1].isoformat())
+
+# --- RESPUESTA RÁPIDA POR EQUIPO ---
+if id_equipo:
+    ultima = last_inspection(id_equipo)
+    if ultima is None:
+        st.warning(f"No hay inspecciones registradas para el equipo {id_equipo}.")
+    elif ultima["rechazos"]:
+        st.error(f"Última inspección de {id_equipo}: {ultima['fecha']} por {ultima['trabajador']} "
+                 f"— {ultima['rechazos']} ítem(s) RECHAZADO(S).")
+    else:
+        st.success(f"Última inspección de {id_equipo}: {ultima['fecha']} por {ultima['trabajador']} — sin rechazos.")
+
+# --- PAGINACIÓN ---
+# Se guarda la pila de cursores; si cambian los filtros se vuelve a la página 1
+clave_filtros = repr(sorted(filtros.items()))
+if st.session_state.get("hist_filtros") != clave_filtros:
+    st.session_state["hist_filtros"] = clave_filtros
+    st.session_state["hist_cursores"] = [None]
+cursores = st.session_state["hist_cursores"]
+
+filas, siguiente = search(cursor=cursores[-1], limit=PAGE_SIZE, **filtros)
+total = count(**filtros)
+st.caption(f"{total:,} documento(s) — página {len(cursores)} de {max(1, -(-total // PAGE_SIZE))}")
+
+if filas:
+    st.dataframe(
+        [{k: f[k] for k in ("fecha", "form", "lugar", "trabajador", "id_equipo", "rechazos", "archivo")} for f in filas],
+        use_container_width=True, hide_index=True,
+    )
+else:
+    st.info("Sin resultados para los filtros seleccionados.")
+
+p1, p2, _ = st.columns([1, 1, 4])
+if p1.button("⬅️ Anterior", disabled=len(cursores) == 1):
+    cursores.pop()
+    st.rerun()
+if p2.button("Siguiente ➡️", disabled=siguiente is None):
+    cursores.append(siguiente)
+    st.rerun()
+
+# --- DESCARGA ---
+if filas:
+    st.subheader("Descargar copia")
+    opciones = {f"{f['fecha']} · {f['archivo']}": f for f in filas}
+    elegido = opciones[st.selectbox("Documento", list(opciones))]
+    try:
+        st.download_button("⬇️ Descargar PDF", read_document(elegido["sha256"]),
+                           file_name=elegido["archivo"], mime="application/pdf")
+    except FileNotFoundError:
+        st.error("El archivo PDF ya no está en el archivo local (.rmc/archivo).")
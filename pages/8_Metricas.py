@@ -0,0 +1,75 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime, timedelta, timezone
+from core.metrics import METRICS_LOG, load_events, prometheus_text
+
+st.set_page_config(page_title="Métricas", page_icon="⏱️", layout="wide")
+
+st.title("⏱️ Tiempos por Etapa de Generación")
+st.markdown(f"Fuente: `{METRICS_LOG}` (log rotativo). Cada documento registra firma, cola, "
+            "jinja, weasyprint, archivo y total; el correo registra mime y smtp.")
+
+# --- DATOS ---
+eventos = load_events()
+filas = [
+    {"ts": e["ts"], "id": e.get("id"), "page": e.get("page") or "", "form": e.get("form") or "",
+     "etapa": etapa, "segundos": segundos}
+    for e in eventos for etapa, segundos in e.get("etapas", {}).items()
+]
+if not filas:
+    st.info("Todavía no hay métricas: genera algún documento.")
+    st.stop()
+
+df = pd.DataFrame(filas)
+df["fecha"] = pd.to_datetime(df["ts"], unit="s", utc=True)  # ts es epoch: comparar en UTC
+
+c1, c2 = st.columns(2)
+ventanas = {"Última hora": timedelta(hours=1), "Último día": timedelta(days=1),
+            "Últimos 7 días": timedelta(days=7), "Todo": None}
+ventana = ventanas[c1.selectbox("Período", list(ventanas), index=1)]
+forms = c2.multiselect("Formulario", sorted(f for f in df["form"].unique() if f))
+if ventana is not None:
+    df = df[df["fecha"] >= datetime.now(timezone.utc) - ventana]
+if forms:
+    df = df[df["form"].isin(forms)]
+if df.empty:
+    st.info("Sin métricas para los filtros seleccionados.")
+    st.stop()
+
+# --- PERCENTILES ---
+resumen = (
+    df.groupby(["etapa", "form"])["segundos"]
+    .agg(n="count", p50=lambda s: s.quantile(0.5), p95=lambda s: s.quantile(0.95))
+    .reset_index()
+)
+resumen[["p50", "p95"]] = resumen[["p50", "p95"]] * 1000
+
+m1, m2 = st.columns(2)
+totales = df[df["etapa"] == "total"]["segundos"]
+m1.metric("Documentos", df["id"].nunique())
+m2.metric("Total p95", f"{totales.quantile(0.95):.1f}s" if not totales.empty else "—")
+
+st.subheader("p95 por etapa (ms)")
+fig = px.bar(resumen[resumen["etapa"] != "total"], x="etapa", y="p95", color="form", barmode="group",
+             hover_data=["n", "p50"])
+st.plotly_chart(fig, use_container_width=True)
+
+st.dataframe(
+    resumen.rename(columns={"p50": "p50 (ms)", "p95": "p95 (ms)"}),
+    column_config={"p50 (ms)": st.column_config.NumberColumn(format="%.1f"),
+                   "p95 (ms)": st.column_config.NumberColumn(format="%.1f")},
+    use_container_width=True, hide_index=True,
+)
+
+# --- DETALLE ---
+with st.expander("Últimos documentos"):
+    detalle = df.pivot_table(index=["id", "page", "form"], columns="etapa", values="segundos", aggfunc="sum")
+    ultimos = df.groupby("id")["fecha"].max().sort_values(ascending=False).head(50).index
+    st.dataframe(detalle[detalle.index.get_level_values("id").isin(ultimos)], use_container_width=True)
+
+with st.expander("Formato Prometheus (este proceso)"):
+    texto = prometheus_text()
+    st.code(texto, language="text")
+    st.download_button("⬇️ Descargar", texto, file_name="metrics.txt", mime="text/plain")
+    st.caption("Con la variable RMC_METRICS_PORT definida, el mismo texto se sirve en http://<host>:<puerto>/metrics.")
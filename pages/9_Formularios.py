@@ -0,0 +1,16 @@
+import streamlit as st
+from core.form_page import render_form
+from core.schema import list_schemas
+
+st.set_page_config(page_title="Formularios SIGOP", page_icon="🗂️", layout="wide")
+
+# Cualquier esquema de schemas/*.json, sin página propia. Se puede enlazar
+# directo con ?form=<id>.
+esquemas = list_schemas()
+ids = list(esquemas)
+actual = st.query_params.get("form")
+form_id = st.sidebar.selectbox("Formulario", ids, index=ids.index(actual) if actual in ids else 0,
+                               format_func=esquemas.get)
+st.query_params["form"] = form_id
+
+render_form(form_id, configurar=False)